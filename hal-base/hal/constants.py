@@ -85,6 +85,7 @@ class UsageReporting:
     kFramework_Iterative = 1
     kFramework_Sample = 2
     kFramework_CommandControl = 3
+    kFramework_Timed = 4
 
     kRobotDrive_ArcadeStandard = 1
     kRobotDrive_ArcadeButtonSpin = 2
@@ -3,7 +3,8 @@ import os
 import sys
 import time
 
-__all__ = ["_dll", "_RETFUNC", "_VAR", "sleep"]
+__all__ = ["_dll", "_RETFUNC", "_VAR", "sleep", "waitForCondition", "notifyCondition",
+           "registerThread", "joinThread"]
 
 _module_path = os.path.dirname(sys.modules['hal_impl'].__file__)
 
@@ -11,6 +12,18 @@ C.CDLL(os.path.join(_module_path, "libwpiutil.so"))
 _dll = C.CDLL(os.path.join(_module_path, "libwpiHal.so"), use_errno=True)
 sleep = time.sleep
 
+def waitForCondition(cond, timeout=None):
+    return cond.wait(timeout)
+
+def notifyCondition(cond):
+    cond.notify_all()
+
+def registerThread(thread=None):
+    pass
+
+def joinThread(thread, timeout=None):
+    thread.join(timeout)
+
 def _RETFUNC(name, restype, *params, out=None, library=_dll,
              errcheck=None, handle_missing=False, c_name=None):
     prototype = C.CFUNCTYPE(restype, *tuple(param[1] for param in params))
@@ -0,0 +1,259 @@
+'''
+    Sample-accurate simulation of the roboRIO's analog inputs.
+
+    The real FPGA samples each analog input at ``analog_sample_rate``,
+    feeds the samples through the oversample and average engine, and
+    integrates the output of that engine in the accumulator. Normally the
+    simulator just sets the ``value``, ``avg_value`` and ``accumulator_*``
+    fields of ``hal_data['analog_in']`` directly, so the averaging,
+    oversampling and accumulator settings have no effect.
+
+    :class:`AnalogEngine` generates the samples instead, from a function
+    of time, and runs them through the same processing as the FPGA. The
+    samples since the last update are generated in one chunk using NumPy,
+    so it is cheap to call :meth:`AnalogEngine.update` once per loop::
+
+        import numpy as np
+        from hal_impl.analog import AnalogEngine
+
+        rng = np.random.RandomState(0)
+        engine = AnalogEngine()
+        engine.set_signal(0, lambda t: 2.5 + 0.01*rng.standard_normal(len(t)))
+
+        ...
+
+        engine.update()
+
+    If an :class:`.AnalogGyro` is attached to a simulated channel, its
+    angle and rate are computed from the accumulator in the same way as
+    the real HAL does.
+
+    .. note:: All channels are sampled at the same time, the FPGA actually
+              samples them one after another.
+'''
+
+import math
+
+from . import data
+
+__all__ = ["AnalogEngine"]
+
+#: Number of bits produced by the ADC
+kADCBits = 12
+
+#: Calibration of a typical roboRIO analog input, in nanovolts
+kDefaultLSBWeight = 1220703
+kDefaultOffset = 0
+
+
+class _Channel:
+
+    def __init__(self, np, signal):
+        self.signal = signal
+        self.bits = None
+        self.carry = np.zeros(0, dtype=np.int64)
+
+        self.value = 0
+        self.avg_value = 0
+
+        self.acc_value = 0
+        self.acc_count = 0
+
+        # last values written to hal_data, used to notice accumulator resets
+        self.written = None
+
+
+class AnalogEngine:
+    '''
+        Generates samples for simulated analog inputs, and applies the
+        FPGA's oversampling, averaging and accumulator to them
+    '''
+
+    #: Maximum number of samples per channel that are generated at once
+    max_chunk = 65536
+
+    def __init__(self, hal_data=None):
+        '''
+            :param hal_data: Data to update, defaults to ``data.hal_data``
+        '''
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("AnalogEngine requires NumPy to be installed") from e
+
+        self._np = np
+        self.hal_data = data.hal_data if hal_data is None else hal_data
+        self.channels = {}
+
+        # FPGA time of the first sample at the current rate, and the number
+        # of samples taken since then
+        self._start = None
+        self._rate = None
+        self._n = 0
+
+    def set_signal(self, channel, signal,
+                   lsb_weight=kDefaultLSBWeight, offset=kDefaultOffset):
+        '''
+            Simulates an analog input using a signal
+
+            :param channel: Analog input channel
+            :param signal: Voltage on the input. Either a number, or a
+                           function that is called with a NumPy array of
+                           sample times (FPGA time in seconds) and returns
+                           an array of voltages
+            :param lsb_weight: Calibration of the channel, in nanovolts
+            :param offset: Calibration of the channel, in nanovolts
+        '''
+        if not callable(signal):
+            signal = float(signal)
+            signal = lambda t, v=signal: v
+
+        d = self.hal_data['analog_in'][channel]
+        d['has_source'] = True
+        d['lsb_weight'] = lsb_weight
+        d['offset'] = offset
+
+        ch = self.channels.get(channel)
+        if ch is None:
+            self.channels[channel] = _Channel(self._np, signal)
+        else:
+            ch.signal = signal
+
+    def remove_signal(self, channel):
+        '''Stops simulating an analog input'''
+        if self.channels.pop(channel, None) is not None:
+            self.hal_data['analog_in'][channel]['has_source'] = False
+
+    def update(self, now=None):
+        '''
+            Generates the samples up to now, and updates hal_data
+
+            :param now: FPGA time (in microseconds), defaults to
+                        ``hooks.getFPGATime()``
+            :returns: the number of samples taken on each channel
+        '''
+        if now is None:
+            now = data.hooks.getFPGATime()
+
+        rate = float(self.hal_data['analog_sample_rate'])
+        if rate <= 0:
+            return 0
+
+        if self._start is None:
+            self._start = now
+            self._rate = rate
+            self._n = 0
+        elif rate != self._rate:
+            # the next sample is taken when it would have been, after that
+            # the new rate is used
+            self._start += self._n * 1000000.0 / self._rate
+            self._rate = rate
+            self._n = 0
+
+        # number of samples taken at or before now
+        total = math.floor((now - self._start) * rate / 1000000.0 + 1e-9) + 1 - self._n
+        if total <= 0:
+            return 0
+
+        np = self._np
+        analog_in = self.hal_data['analog_in']
+        channels = [(ch, analog_in[c]) for c, ch in self.channels.items()]
+
+        for ch, d in channels:
+            self._check_reset(ch, d)
+
+        remaining = total
+        while remaining > 0:
+            n = min(remaining, self.max_chunk)
+            t = (self._start + (self._n + np.arange(n)) * (1000000.0 / rate)) / 1000000.0
+            for ch, d in channels:
+                self._process(ch, d, t)
+
+            self._n += n
+            remaining -= n
+
+        for ch, d in channels:
+            self._write(ch, d)
+
+        self._update_gyros(rate)
+        return total
+
+    def _check_reset(self, ch, d):
+        # If something else changed the accumulator (resetAccumulator),
+        # continue from there
+        if d['accumulator_initialized'] and \
+           ch.written != (d['accumulator_value'], d['accumulator_count']):
+            ch.acc_value = d['accumulator_value']
+            ch.acc_count = 0
+
+    def _process(self, ch, d, t):
+        np = self._np
+
+        lsb = d['lsb_weight'] * 1.0e-9
+        offset = d['offset'] * 1.0e-9
+
+        v = np.broadcast_to(np.asarray(ch.signal(t), dtype=np.float64), t.shape)
+        raw = np.clip(np.rint((v + offset) / lsb), 0, (1 << kADCBits) - 1).astype(np.int64)
+        ch.value = int(raw[-1])
+
+        oversample_bits = d['oversample_bits']
+        avg_bits = d['avg_bits']
+
+        # changing the configuration restarts the average engine
+        bits = (oversample_bits, avg_bits)
+        if ch.bits != bits:
+            ch.bits = bits
+            ch.carry = raw[:0]
+
+        if len(ch.carry):
+            raw = np.concatenate((ch.carry, raw))
+
+        size = 1 << (oversample_bits + avg_bits)
+        blocks = len(raw) // size
+        ch.carry = raw[blocks*size:]
+
+        if not blocks:
+            return
+
+        # averaging drops the average bits, oversampling keeps the rest
+        avg = raw[:blocks*size].reshape(blocks, size).sum(axis=1) >> avg_bits
+        ch.avg_value = int(avg[-1])
+
+        if d['accumulator_initialized']:
+            avg -= d['accumulator_center']
+            deadband = d['accumulator_deadband']
+            if deadband:
+                avg[np.abs(avg) < deadband] = 0
+
+            ch.acc_value += int(avg.sum())
+            ch.acc_count += blocks
+
+    def _write(self, ch, d):
+        lsb = d['lsb_weight'] * 1.0e-9
+        offset = d['offset'] * 1.0e-9
+
+        d['value'] = ch.value
+        d['voltage'] = ch.value * lsb - offset
+        d['avg_value'] = ch.avg_value
+        d['avg_voltage'] = ch.avg_value * lsb / (1 << d['oversample_bits']) - offset
+
+        if d['accumulator_initialized']:
+            d['accumulator_value'] = ch.acc_value
+            d['accumulator_count'] = ch.acc_count
+            ch.written = (ch.acc_value, ch.acc_count)
+
+    def _update_gyros(self, rate):
+        # Same as HAL_GetAnalogGyroAngle and HAL_GetAnalogGyroRate
+        for pin, g in enumerate(self.hal_data['analog_gyro']):
+            ch = self.channels.get(pin)
+            if ch is None or not g['initialized'] or not g['volts_per_degree']:
+                continue
+
+            d = self.hal_data['analog_in'][pin]
+            lsb = d['lsb_weight'] * 1.0e-9
+            vpd = g['volts_per_degree']
+
+            value = ch.acc_value - int(ch.acc_count * g['offset'])
+            g['angle'] = value * lsb * (1 << d['avg_bits']) / (rate * vpd)
+            g['rate'] = (ch.avg_value - (g['center'] + g['offset'])) * lsb / \
+                        ((1 << d['oversample_bits']) * vpd)
@@ -5,6 +5,7 @@
 from hal import constants
 import sys
 import copy
+import threading
 
 import logging
 logger = logging.getLogger('hal.data')
@@ -25,6 +26,20 @@ hal_in_data = {
 hooks = None
 
 
+#: Notifications from callbacks registered with ``coalesce=True`` that
+#: haven't been delivered yet, see :func:`flush_notifications`
+_pending = {}
+_pending_lock = threading.Lock()
+
+class _BatchState(threading.local):
+    #: While :func:`batch_notifications` is active, all notifications caused
+    #: by the thread are queued here instead of being delivered
+    batch = None
+    depth = 0
+
+_batch_state = _BatchState()
+
+
 class NotifyDict(dict):
     '''
         Allows us to listen to changes in the dictionary -- 
@@ -33,13 +48,17 @@ class NotifyDict(dict):
         
         We only use these for some keys in the hal_data dict, 
         as not all keys are useful to listen to
+        
+        Until a callback is registered, setting an item is a plain
+        dict.__setitem__. Registering a callback switches the dictionary
+        to a subclass that looks up the callbacks for the key being set.
     '''
     __slots__ = ['cbs']
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.cbs = {}
         
-    def register(self, k, cb, notify=False):
+    def register(self, k, cb, notify=False, coalesce=False):
         '''
             register a function to be called when an item is set 
             with in this dictionary. We raise a key error if the 
@@ -50,13 +69,23 @@ class NotifyDict(dict):
             :param cb:       Function to be called if k is set. This function needs 
                              to take at least 2 parameters
             :param notify:   Calls the function cb after registering k                
+            :param coalesce: If True, cb isn't called when k is set. Instead,
+                             it is called once with the last value that was set
+                             when :func:`flush_notifications` is called, no
+                             matter how many times k was set before that
         '''
         if k not in self:
             raise KeyError("Cannot register for non-existant key '%s'" % k)
-        self.cbs.setdefault(k, []).append(cb)
+        _add_callback(self, self.cbs, k, cb, coalesce)
+        self.__class__ = _NotifyingDict
         if notify:
             cb(k, self[k])
-        
+
+
+class _NotifyingDict(NotifyDict):
+    '''A NotifyDict that has at least one callback registered'''
+    __slots__ = ()
+    
     def __setitem__(self, k, v):
         '''
            Overrides __setitem__. If k has any callback functions defined they are
@@ -64,15 +93,92 @@ class NotifyDict(dict):
            
            :param k: key to be set
            :param v: value to be set
-        '''     
-        super().__setitem__(k, v)
+        '''
+        dict.__setitem__(self, k, v)
+        
+        cbs = self.cbs.get(k)
+        if cbs is not None:
+            _call_callbacks(self, cbs, k, v)
+
+
+def _add_callback(d, cbs, k, cb, coalesce):
+    if coalesce:
+        # Notifications are keyed so that only the last one for each
+        # callback/record/key is kept
+        key = (cb, id(d), k)
+        def _queue(k, v):
+            with _pending_lock:
+                _pending[key] = (cb, k, v)
+        cbs[k] = cbs.get(k, ()) + (_queue,)
+    else:
+        cbs[k] = cbs.get(k, ()) + (cb,)
+
+def _call_callbacks(d, cbs, k, v):
+    batch = _batch_state.batch
+    if batch is not None:
+        for cb in cbs:
+            batch[(cb, id(d), k)] = (cb, k, v)
+        return
+    
+    for cb in cbs:
+        try:
+            cb(k, v)
+        except:
+            logger.exception("BAD INTERNAL ERROR")
+
+def flush_notifications():
+    '''
+        Delivers the notifications for callbacks that were registered with
+        ``coalesce=True``. Each callback is called once for each key that
+        was set since the last flush, with the last value that was set.
+        
+        A simulator would typically call this once per tick.
+    '''
+    global _pending
+    with _pending_lock:
+        pending, _pending = _pending, {}
+    for cb, k, v in pending.values():
+        try:
+            cb(k, v)
+        except:
+            logger.exception("BAD INTERNAL ERROR")
+
+class _BatchNotifications:
+    __slots__ = ()
+    
+    def __enter__(self):
+        state = _batch_state
+        state.depth += 1
+        if state.batch is None:
+            state.batch = {}
+    
+    def __exit__(self, *exc_info):
+        state = _batch_state
+        state.depth -= 1
+        if state.depth:
+            return
         
-        # Call the callbacks
-        for cb in self.cbs.get(k, []):
+        batch, state.batch = state.batch, None
+        for cb, k, v in batch.values():
             try:
                 cb(k, v)
             except:
                 logger.exception("BAD INTERNAL ERROR")
+
+_batch_notifications = _BatchNotifications()
+
+def batch_notifications():
+    '''
+        Returns a context manager that holds back all notifications until
+        it exits, so that something that sets many values at once only
+        causes a single round of notifications. Each callback is called
+        once for each key that was set, with the last value that was set.
+        
+        Only notifications caused by the calling thread are held back,
+        values set by other threads are delivered as usual. Nested calls
+        are delivered when the outermost one exits.
+    '''
+    return _batch_notifications
     
 
 class IN:
@@ -112,6 +218,8 @@ def _reset_hal_data(current_hooks):
     
     hal_data.clear()
     hal_in_data.clear()
+    with _pending_lock:
+        _pending.clear()
     
     hal_data.update({
 
@@ -305,7 +413,7 @@ def _reset_hal_data(current_hooks):
             'value':        IN(False), # technically both
             'pulse_length': OUT(None),
             'is_input':     OUT(False),
-            'filter_idx':   OUT(None), # is None or filter number
+            'filterIndex':  OUT(None), # is None or filter number
             
         }) for _ in range(26)],
         
@@ -319,7 +427,9 @@ def _reset_hal_data(current_hooks):
             'has_source':         IN(False),
             'initialized':        OUT(False),
             'config':             OUT({}), # dictionary of pins/modules
+            'encoding_type':      OUT(constants.EncoderEncodingType.k4X),
             'count':              IN(0),
+            'raw':                IN(0),  # count * encoding scale
             'period':             IN(sys.float_info.max),
             'max_period':         OUT(0),
             'direction':          IN(False),
@@ -474,3 +584,120 @@ def update_hal_data(in_dict, out_dict=hal_data):
                     v_out[i] = vv
         else:
             out_dict[k] = v
+
+
+class CompiledUpdate:
+    '''
+        A precompiled version of :func:`update_hal_data` for a particular
+        shape of input dictionary. Create these using
+        :func:`compile_hal_data_update`.
+        
+        .. warning:: This holds references to the containers in hal_data,
+                     so it must be compiled again after the HAL is reset.
+    '''
+    
+    def __init__(self, template, out_dict, diff):
+        
+        #: list of paths (tuples of keys) to each value that is set
+        self.paths = []
+        
+        #: list of (container, key) for each value that is set
+        self.setters = []
+        
+        self.diff = diff
+        
+        _compile_leaves(template, out_dict, (), self.paths, self.setters)
+        
+        #: update(in_dict): Sets the values in hal_data from in_dict, which
+        #: must contain every value that was in the template. Returns the
+        #: number of values that were set.
+        self.update = self._gen_update()
+    
+    def _gen_update(self):
+        lines = ['def update(in_dict):',
+                 '    n = 0']
+        env = {}
+        names = {(): 'in_dict'}
+        
+        for i, (path, (container, key)) in enumerate(zip(self.paths, self.setters)):
+            # share lookups of the same prefix between values
+            for j in range(1, len(path)):
+                prefix = path[:j]
+                if prefix not in names:
+                    names[prefix] = 'd%d' % len(names)
+                    lines.append('    %s = %s[%r]' % (names[prefix], names[path[:j-1]], path[j-1]))
+            
+            env['c%d' % i] = container
+            lines.append('    v = %s[%r]' % (names[path[:-1]], path[-1]))
+            if self.diff:
+                lines.append('    if c%d[%r] != v:' % (i, key))
+                lines.append('        c%d[%r] = v' % (i, key))
+                lines.append('        n += 1')
+            else:
+                lines.append('    c%d[%r] = v' % (i, key))
+        
+        if not self.diff:
+            lines.append('    n = %d' % len(self.paths))
+        lines.append('    return n')
+        
+        exec('\n'.join(lines), env)
+        return env['update']
+    
+    def set_values(self, values):
+        '''
+            Sets the values in hal_data from a flat sequence of values,
+            in the same order as :attr:`paths`
+            
+            :returns: the number of values that were set
+        '''
+        n = 0
+        if self.diff:
+            for (container, key), v in zip(self.setters, values):
+                if container[key] != v:
+                    container[key] = v
+                    n += 1
+        else:
+            for (container, key), v in zip(self.setters, values):
+                container[key] = v
+                n += 1
+        return n
+
+def _compile_leaves(in_dict, out_dict, path, paths, setters):
+    # follows the same rules as update_hal_data
+    for k, v in in_dict.items():
+        p = path + (k,)
+        if isinstance(v, dict):
+            _compile_leaves(v, out_dict[k], p, paths, setters)
+        elif isinstance(v, list):
+            v_out = out_dict[k]
+            for i, vv in enumerate(v):
+                if isinstance(vv, dict):
+                    _compile_leaves(vv, v_out[i], p + (i,), paths, setters)
+                else:
+                    paths.append(p + (i,))
+                    setters.append((v_out, i))
+        else:
+            paths.append(p)
+            setters.append((out_dict, k))
+
+def compile_hal_data_update(template, out_dict=hal_data, diff=True):
+    '''
+        Precompiles :func:`update_hal_data` for input dictionaries that
+        have the same shape as template, so a simulator that sets the same
+        values each tick doesn't need to walk the nested dictionaries
+        each time::
+        
+            updater = compile_hal_data_update(template)
+            
+            # each tick
+            updater.update(in_dict)
+        
+        :param template: An input dictionary, in the format accepted by
+                         :func:`update_hal_data`
+        :param out_dict: The dictionary to update
+        :param diff: If True, values are only set if they changed, so
+                     that listeners are not notified of unchanged values
+        
+        :returns: a :class:`CompiledUpdate`
+    '''
+    return CompiledUpdate(template, out_dict, diff)
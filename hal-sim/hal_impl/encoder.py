@@ -0,0 +1,339 @@
+'''
+    Simulation of quadrature encoders and counters driven by the position
+    of a shaft.
+
+    Normally the simulator sets the ``count`` and ``period`` fields of
+    ``hal_data['encoder']`` and ``hal_data['counter']`` directly. Instead,
+    :class:`EncoderEngine` takes a continuous position (or velocity) for
+    each device, and derives the count, raw count, period, direction,
+    rate and stopped state from it the same way the FPGA does, including
+    the encoding type, reversed direction, ``samples_to_average`` and
+    ``max_period``::
+
+        from hal_impl.encoder import EncoderEngine
+
+        engine = EncoderEngine()
+
+        ...
+
+        # in the physics update, in encoder cycles (pulses)
+        engine.set_encoder_position(0, l_position * kPulsesPerFoot)
+        engine.set_counter_velocity(0, shooter_rps * kPulsesPerRev)
+        engine.update()
+
+    All of the devices are updated at once using NumPy, once per call to
+    :meth:`EncoderEngine.update`. Within an update, the shaft is assumed to
+    move at a constant speed, which determines when each edge happened.
+
+    Counters count edges of the configured up source, and count down when
+    the shaft moves backwards if a down source or external direction mode
+    is configured. Semi-period and pulse length modes are not simulated.
+'''
+
+import sys
+
+from hal import constants
+
+from . import data
+from .functions import _encodingScales
+
+__all__ = ["EncoderEngine"]
+
+#: Largest value of samples_to_average supported by the FPGA
+kMaxSamplesToAverage = 127
+
+#: Period of a stopped device
+kStoppedPeriod = sys.float_info.max
+
+def _clamp_samples(samples_to_average):
+    return min(max(samples_to_average, 1), kMaxSamplesToAverage)
+
+# what the device is driven by
+_NONE = 0
+_POSITION = 1
+_VELOCITY = 2
+
+
+class EncoderEngine:
+    '''
+        Computes the state of the simulated encoders and counters from the
+        position of their shafts. Positions are in cycles of the encoder
+        (the number of pulses on the A channel), velocities are in cycles
+        per second.
+    '''
+
+    def __init__(self, hal_data=None):
+        '''
+            :param hal_data: Data to update, defaults to ``data.hal_data``
+        '''
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("EncoderEngine requires NumPy to be installed") from e
+
+        self._np = np
+        self.hal_data = data.hal_data if hal_data is None else hal_data
+
+        # encoders come first, then counters
+        self.num_encoders = len(self.hal_data['encoder'])
+        n = self.num_encoders + len(self.hal_data['counter'])
+
+        self._driven = np.zeros(n, dtype=np.int8)
+        self._pos = np.zeros(n)
+        self._vel = np.zeros(n)
+
+        # effective position (after reversing) at the last update, NaN
+        # when the device wasn't being simulated
+        self._prev = np.full(n, np.nan)
+
+        self._raw = np.zeros(n, dtype=np.int64)
+        self._written = [None]*n
+        self._direction = np.zeros(n, dtype=bool)
+        self._last_edge = np.full(n, np.nan)
+
+        # ring buffer of the periods between edges
+        self._ring = np.zeros((n, kMaxSamplesToAverage))
+        self._ring_idx = np.zeros(n, dtype=np.int64)
+        self._ring_len = np.zeros(n, dtype=np.int64)
+        self._ring_size = np.ones(n, dtype=np.int64)
+        self._ring_cols = np.arange(kMaxSamplesToAverage)
+
+        self._last_time = None
+        self._slots = None
+
+    def _drive(self, slot, kind, value, how):
+        self._driven[slot] = how
+        if how == _POSITION:
+            self._pos[slot] = value
+        else:
+            self._vel[slot] = value
+        self.hal_data[kind][slot if kind == 'encoder' else slot - self.num_encoders]['has_source'] = True
+
+    def set_encoder_position(self, index, position):
+        '''Sets the position of an encoder's shaft, in cycles'''
+        self._drive(index, 'encoder', position, _POSITION)
+
+    def set_encoder_velocity(self, index, velocity):
+        '''Sets the velocity of an encoder's shaft, in cycles per second'''
+        self._drive(index, 'encoder', velocity, _VELOCITY)
+
+    def set_counter_position(self, index, position):
+        '''Sets the position of a counter's shaft, in pulses'''
+        self._drive(self.num_encoders + index, 'counter', position, _POSITION)
+
+    def set_counter_velocity(self, index, velocity):
+        '''Sets the velocity of a counter's shaft, in pulses per second'''
+        self._drive(self.num_encoders + index, 'counter', velocity, _VELOCITY)
+
+    def get_position(self, kind, index):
+        ''':returns: the position of the shaft of an 'encoder' or 'counter' '''
+        if kind == 'counter':
+            index += self.num_encoders
+        return float(self._pos[index])
+
+    def _config(self):
+        # Returns the slots of the devices that are being simulated, their
+        # configuration, and their hal_data records
+        slots = []
+        config = []
+        records = []
+
+        num_encoders = self.num_encoders
+        driven = self._driven
+
+        for i, enc in enumerate(self.hal_data['encoder']):
+            if driven[i] and enc['initialized']:
+                slots.append(i)
+                config.append((_encodingScales[enc['encoding_type']],
+                               -1 if enc['reverse_direction'] else 1,
+                               True, _clamp_samples(enc['samples_to_average']),
+                               enc['max_period'], True))
+                records.append(enc)
+
+        for i, cnt in enumerate(self.hal_data['counter']):
+            if not driven[num_encoders + i] or not cnt['initialized']:
+                continue
+
+            mode = cnt['mode']
+            scale = cnt['up_rising_edge'] + cnt['up_falling_edge']
+            if not scale or mode in (constants.CounterMode.kSemiperiod,
+                                     constants.CounterMode.kPulseLength):
+                continue
+
+            signed = bool(mode == constants.CounterMode.kExternalDirection or
+                          cnt['down_rising_edge'] or cnt['down_falling_edge'])
+
+            slots.append(num_encoders + i)
+            config.append((scale, -1 if cnt['reverse_direction'] else 1,
+                           signed, _clamp_samples(cnt['samples_to_average']),
+                           cnt['max_period'], False))
+            records.append(cnt)
+
+        return slots, config, records
+
+    def update(self, now=None):
+        '''
+            Moves the shafts to their current positions, and updates
+            hal_data
+
+            :param now: FPGA time (in microseconds), defaults to
+                        ``hooks.getFPGATime()``
+        '''
+        if now is None:
+            now = data.hooks.getFPGATime()
+
+        np = self._np
+        t = now / 1000000.0
+
+        last = self._last_time
+        self._last_time = t
+        dt = 0.0 if last is None else t - last
+
+        velocity = self._driven == _VELOCITY
+        self._pos[velocity] += self._vel[velocity] * dt
+
+        slots, config, records = self._config()
+
+        # devices that aren't being simulated start over next time
+        if slots != self._slots:
+            inactive = np.ones(len(self._prev), dtype=bool)
+            inactive[slots] = False
+            self._prev[inactive] = np.nan
+            self._slots = slots
+
+        if not slots:
+            return
+
+        scales, sign, signed, size, max_period, encoders = zip(*config)
+
+        # robot code reset the count
+        raw = self._raw
+        written = self._written
+        for slot, rec, scale, is_encoder in zip(slots, records, scales, encoders):
+            count = rec['count']
+            if written[slot] != count:
+                raw[slot] = count * scale if is_encoder else count
+
+        idx = np.array(slots)
+        scale = np.array(scales)
+        signed = np.array(signed)
+        size = np.array(size)
+
+        cur = self._pos[idx] * np.array(sign)
+        prev = self._prev[idx]
+        new = np.isnan(prev)
+        prev[new] = cur[new]
+        self._prev[idx] = cur
+
+        # edges crossed since the last update
+        p0 = prev * scale
+        p1 = cur * scale
+        d = (np.floor(p1) - np.floor(p0)).astype(np.int64)
+        k = np.abs(d)
+        raw[idx] += np.where(signed, d, k)
+
+        moved = d != 0
+        direction = self._direction
+        direction[idx[moved]] = (d[moved] > 0) | ~signed[moved]
+
+        self._update_period(idx, p0, p1, k, size, last, dt)
+
+        # stopped devices forget their periods, the next edge starts over
+        since = t - self._last_edge[idx]
+        stopped = ~(since <= np.array(max_period))
+        self._ring_len[idx[stopped]] = 0
+        self._last_edge[idx[stopped]] = np.nan
+
+        ring_len = self._ring_len[idx]
+        mask = self._ring_cols < ring_len[:, None]
+        period = (self._ring[idx] * mask).sum(axis=1) / np.maximum(ring_len, 1)
+
+        # encoders report the period of a whole cycle
+        period = np.where(encoders, period * scale, period)
+        period[stopped | (ring_len == 0)] = kStoppedPeriod
+
+        # write everything back to hal_data
+        for slot, rec, scale, is_encoder, c, p, forward in \
+                zip(slots, records, scales, encoders, raw[idx].tolist(),
+                    period.tolist(), direction[idx].tolist()):
+            if is_encoder:
+                rec['raw'] = c
+                c = int(c / scale)
+                if p == kStoppedPeriod:
+                    rec['rate'] = 0.0
+                elif forward:
+                    rec['rate'] = rec['distance_per_pulse'] / p
+                else:
+                    rec['rate'] = -rec['distance_per_pulse'] / p
+
+            rec['count'] = c
+            rec['period'] = p
+            rec['direction'] = forward
+            written[slot] = c
+
+    def _update_period(self, idx, p0, p1, k, size, last, dt):
+        # Adds the periods between the edges since the last update to the
+        # ring buffers. The shaft moved at a constant speed, so all of the
+        # edges after the first one are the same distance apart.
+        np = self._np
+
+        moved = k > 0
+        if last is None or not moved.any():
+            return
+
+        ring = self._ring
+        ring_idx = self._ring_idx
+        ring_len = self._ring_len
+
+        # changing samples_to_average clears the buffer
+        resized = self._ring_size[idx] != size
+        ring_len[idx[resized]] = 0
+        ring_idx[idx[resized]] = 0
+        self._ring_size[idx] = size
+
+        idx = idx[moved]
+        k = k[moved]
+        size = size[moved]
+        p0 = p0[moved]
+        p1 = p1[moved]
+
+        up = p1 > p0
+        spacing = dt / np.abs(p1 - p0)
+        first = np.where(up, np.floor(p0) + 1 - p0, p0 - np.floor(p0))
+        first_time = last + first * spacing
+
+        last_edge = self._last_edge[idx]
+        first_period = first_time - last_edge
+        has_first = ~np.isnan(first_period)
+
+        self._last_edge[idx] = first_time + (k - 1) * spacing
+
+        # all of the samples are replaced
+        full = k - 1 >= size
+        fidx = idx[full]
+        ring[fidx] = spacing[full][:, None]
+        ring_len[fidx] = size[full]
+        ring_idx[fidx] = 0
+
+        part = ~full
+        if not part.any():
+            return
+
+        idx = idx[part]
+        size = size[part]
+        counts = (k[part] - 1) + has_first[part]
+        total = int(counts.sum())
+        if not total:
+            return
+
+        # one entry per period: the device, and its position in the buffer
+        dev = np.repeat(np.arange(len(idx)), counts)
+        offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        values = np.where(offset < has_first[part][dev],
+                          first_period[part][dev], spacing[part][dev])
+
+        pos = (ring_idx[idx][dev] + offset) % size[dev]
+        ring[idx[dev], pos] = values
+
+        ring_idx[idx] = (ring_idx[idx] + counts) % size
+        ring_len[idx] = np.minimum(ring_len[idx] + counts, size)
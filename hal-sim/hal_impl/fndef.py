@@ -7,12 +7,55 @@ import collections
 import ctypes as C
 import inspect
 import os
+import types
 
 from . import functions as _dll
 
-__all__ = ["_dll", "_RETFUNC", "_VAR", "sleep"]
+__all__ = ["_dll", "_RETFUNC", "_VAR", "sleep", "waitForCondition", "notifyCondition",
+           "registerThread", "joinThread"]
 
 sleep = _dll.sleep
+waitForCondition = _dll.waitForCondition
+notifyCondition = _dll.notifyCondition
+registerThread = _dll.registerThread
+joinThread = _dll.joinThread
+
+#: How much checking is done on the parameters and return values of HAL
+#: functions, see :func:`set_validation_level`
+validation_level = 'strict'
+
+#: When the validation level is 'sampled', this many calls to each function
+#: are checked before the implementation is bound directly
+validation_sample_calls = 64
+
+VALIDATION_LEVELS = ('strict', 'sampled', 'off')
+
+def set_validation_level(level, sample_calls=None):
+    '''
+        Selects how much checking the simulated HAL functions do on their
+        parameters and return values. Only HAL functions that are defined
+        after this is called are affected, so this should be called before
+        the hal module is imported. The default can also be set using the
+        HALSIM_VALIDATION environment variable.
+        
+        * 'strict': every call is checked (the default)
+        * 'sampled': the first ``sample_calls`` calls to each function are
+          checked, after that the implementation is called directly
+        * 'off': the implementation is called directly without any checks
+        
+        :param level: 'strict', 'sampled', or 'off'
+        :param sample_calls: If not None, sets :data:`validation_sample_calls`
+    '''
+    global validation_level, validation_sample_calls
+    if level not in VALIDATION_LEVELS:
+        raise ValueError("Invalid validation level '%s'" % level)
+    if sample_calls is not None:
+        if sample_calls < 1:
+            raise ValueError("Invalid number of sampled calls %s" % sample_calls)
+        validation_sample_calls = int(sample_calls)
+    validation_level = level
+
+set_validation_level(os.environ.get('HALSIM_VALIDATION', 'strict'))
 
 FuncData = collections.namedtuple('FuncData', [
     'name',         # internal name
@@ -73,7 +116,7 @@ def gen_check(pname, ptype):
         return None
 
 
-def gen_func(f, name, restype, params, out, _thunk):
+def gen_func(f, name, restype, params, out, _thunk, level='strict'):
 
     args = []
     callargs = []
@@ -98,7 +141,7 @@ def gen_func(f, name, restype, params, out, _thunk):
 
         if pname not in out:
             check = gen_check(pname, ptype)
-            
+
             if check is not None:
                 # the check is an assert, but we provide a better error message
                 # otherwise these things will be impossible to debug
@@ -132,26 +175,82 @@ def gen_func(f, name, restype, params, out, _thunk):
         retchecks.append('assert isinstance(return_value, tuple), "Internal Error: Invalid return value from %s (expected tuple, got %%s)" %% (return_value,)' % name)
         
         for i, r in enumerate(retvals):
-            
+
             check = gen_check('return_value[%s]' % i, r)
             if check is not None:
                 retchecks.append('assert %s, "Internal Error: Invalid return value from %s (check was: %s); value=%%s, type=%%s" %% (return_value, type(return_value).__name__)' % (check, name, check))
     
     # Create the function body to be exec'ed
     # -> optimization: store the function first, instead of looking it up in _dll each time
+    template = inspect.cleandoc('''
+        def %s(%s):
+            %s
+            return_value = %s(%s)
+            %s
+            return return_value
+    ''')
+    
+    if level == 'strict':
+        return init + '\n' + template % (name, ', '.join(args),
+                                         '\n    '.join(checks),
+                                         fn_call, ', '.join(callargs),
+                                         '\n    '.join(retchecks))
+    
+    # Without validation, the only thing left to do is unpack the thunk
+    if _thunk:
+        unpack, checks = checks[0], checks[1:]
+    else:
+        unpack = ''
+    
+    if level == 'off':
+        return init + '\n' + template % (name, ', '.join(args), unpack,
+                                         fn_call, ', '.join(callargs), '')
+    
+    # sampled: the same checks as strict, but the helpers are passed in as
+    # keyword-only arguments, so that the code doesn't depend on the globals
+    # of the function. After enough calls, _RETFUNC's function replaces its
+    # own code with the code that doesn't check anything.
+    if not _thunk:
+        fn_call = '_impl'
     return inspect.cleandoc('''
-        %s
         def %s(%s):
+            %s
             %s
             return_value = %s(%s)
             %s
+            _remaining[0] -= 1
+            if _remaining[0] <= 0:
+                _self.__code__ = _direct
+                _self.__kwdefaults__ = None
             return return_value
-    ''') % (init, name, ', '.join(args),
-            '\n    '.join(checks),
-            fn_call, ', '.join(args),
+    ''') % (name, ', '.join(args + ['*', '_impl=None', '_C=None', '_self=None',
+                                      '_direct=None', '_remaining=None']),
+            unpack, '\n    '.join(checks),
+            fn_call, ', '.join(callargs),
             '\n    '.join(retchecks))
 
 
+def _can_bind_directly(fn, params, out, _thunk):
+    '''True if the implementation can be used as the HAL function'''
+    if _thunk:
+        return False
+    
+    # defaults must match, since the implementation is called with them
+    defaults = tuple(p[2] for p in params if p[0] not in (out or []) and len(p) == 3)
+    return defaults == (inspect.getfullargspec(fn).defaults or ())
+
+
+def _exec_func(name, fn_body, _thunk):
+    # TODO: give it a filename?
+    if _thunk:
+        elocals = {'_C': C}
+    else:
+        elocals = {'_dll': _dll, '_C': C}
+    
+    exec(fn_body, elocals)
+    return elocals[name]
+
+
 def _RETFUNC(name, restype, *params, out=None, library=_dll,
              errcheck=None, handle_missing=False, _thunk=False,
              c_name=None):
@@ -165,24 +264,41 @@ def _RETFUNC(name, restype, *params, out=None, library=_dll,
             return
         raise
 
+    level = validation_level
+    
     try:
-        fn_body = gen_func(fn, name, restype, params, out, _thunk)
+        fn_body = gen_func(fn, name, restype, params, out, _thunk, level)
     except AssertionError:
         if os.environ.get('HAL_NOSTRICT'):
             return
         raise
     
-    # exec:
-    # TODO: give it a filename?
-    if _thunk:
-        elocals = {'_C': C}
+    if level == 'strict':
+        retfunc = _exec_func(name, fn_body, _thunk)
     else:
-        elocals = {'_dll': _dll, '_C': C}
+        if _can_bind_directly(fn, params, out, _thunk):
+            # Nothing to check, so there's no need for a wrapper. A copy of
+            # the implementation is used, so that changing it (such as
+            # setting fndata) doesn't change the implementation
+            direct = types.FunctionType(fn.__code__, fn.__globals__, name,
+                                        fn.__defaults__, fn.__closure__)
+        else:
+            if level != 'off':
+                fn_body_off = gen_func(fn, name, restype, params, out, _thunk, 'off')
+            else:
+                fn_body_off = fn_body
+            direct = _exec_func(name, fn_body_off, _thunk)
         
-    exec(fn_body, elocals)
-
-    # return the created func
-    retfunc = elocals[name]
+        if level == 'off':
+            retfunc = direct
+        else:
+            # check the first calls, then become the direct function
+            check = _exec_func(name, fn_body, _thunk)
+            retfunc = types.FunctionType(check.__code__, direct.__globals__, name,
+                                         direct.__defaults__, direct.__closure__)
+            retfunc.__kwdefaults__ = {'_impl': fn, '_C': C, '_self': retfunc,
+                                      '_direct': direct.__code__,
+                                      '_remaining': [validation_sample_calls]}
     
     if c_name is None:
         c_name = 'HAL_%s%s' % (name[0].upper(), name[1:])
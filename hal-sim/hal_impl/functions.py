@@ -6,6 +6,8 @@ import operator
 
 from . import data
 from .data import hal_data, NotifyDict
+from .interrupts import InterruptManager
+from .notifier import NotifierManager
 from hal_impl.sim_hooks import SimHooks
 
 import logging
@@ -15,8 +17,16 @@ hooks = SimHooks()
 
 _initialized = False
 
+_notifiers = NotifierManager()
+
 def reset_hal():
+    global _interrupts, _notifiers
+    _interrupts.shutdown()
+    _notifiers.shutdown()
+    _notifiers = NotifierManager()
+    
     data._reset_hal_data(hooks)
+    _interrupts = InterruptManager(kNumInterrupts, _getAnalogTriggerOutput)
     globals()['_initialized'] = False
     initialize()
 
@@ -124,6 +134,18 @@ def _initport(name, idx, status, root=hal_data):
 def sleep(s):
     hooks.delaySeconds(s)
 
+def waitForCondition(cond, timeout=None):
+    return hooks.waitForCondition(cond, timeout)
+
+def notifyCondition(cond):
+    hooks.notifyCondition(cond)
+
+def registerThread(thread=None):
+    hooks.registerThread(thread)
+
+def joinThread(thread, timeout=None):
+    hooks.joinThread(thread, timeout)
+
 def getPort(channel):
     return getPortWithModule(0, channel)
 
@@ -315,7 +337,6 @@ def initAccumulator(analogPortHandle, status):
 
 def resetAccumulator(analogPortHandle, status):
     status.value = 0
-    hal_data['analog_in'][analogPortHandle.pin]['accumulator_center'] = 0
     hal_data['analog_in'][analogPortHandle.pin]['accumulator_count'] = 1
     hal_data['analog_in'][analogPortHandle.pin]['accumulator_value'] = 0
 
@@ -344,6 +365,10 @@ def getAccumulatorOutput(analogPortHandle, status):
 # AnalogGyro.h
 #############################################################################
 
+kGyroOversampleBits = 10
+kGyroAverageBits = 0
+kGyroSamplesPerSecond = 50000.0
+
 def initializeAnalogGyro(handle, status):
     handle = types.GyroHandle(handle)
     
@@ -358,11 +383,19 @@ def initializeAnalogGyro(handle, status):
     data['angle'] = 0
     data['rate'] = 0
     
+    hal_data['analog_in'][handle.pin]['accumulator_initialized'] = True
+    
     return handle
 
 def setupAnalogGyro(handle, status):
     status.value = 0
     assert hal_data['analog_gyro'][handle.pin]['initialized']
+    
+    # same configuration as the real HAL, used by hal_impl.analog
+    analog = hal_data['analog_in'][handle.pin]
+    analog['avg_bits'] = kGyroAverageBits
+    analog['oversample_bits'] = kGyroOversampleBits
+    hal_data['analog_sample_rate'] = kGyroSamplesPerSecond
 
 def freeAnalogGyro(handle):
     hal_data['analog_gyro'][handle.pin]['initialized'] = False
@@ -373,6 +406,7 @@ def setAnalogGyroParameters(handle, voltsPerDegreePerSecond, offset, center, sta
     data['volts_per_degree'] = voltsPerDegreePerSecond
     data['offset'] = offset
     data['center'] = center
+    hal_data['analog_in'][handle.pin]['accumulator_center'] = center
 
 def setAnalogGyroVoltsPerDegreePerSecond(handle, voltsPerDegreePerSecond, status):
     status.value = 0
@@ -383,6 +417,7 @@ def resetAnalogGyro(handle, status):
     data = hal_data['analog_gyro'][handle.pin]
     data['rate'] = 0.0
     data['angle'] = 0.0
+    resetAccumulator(handle, status)
 
 def calibrateAnalogGyro(handle, status):
     status.value = 0
@@ -391,6 +426,9 @@ def calibrateAnalogGyro(handle, status):
 def setAnalogGyroDeadband(handle, volts, status):
     status.value = 0
     hal_data['analog_gyro'][handle.pin]['deadband'] = volts 
+    analog = hal_data['analog_in'][handle.pin]
+    analog['accumulator_deadband'] = \
+        int(volts * 1e9 / analog['lsb_weight'] * (1 << analog['oversample_bits']))
 
 def getAnalogGyroAngle(handle, status):
     status.value = 0
@@ -504,11 +542,11 @@ def freeAnalogOutputPort(analogOutputHandle):
 
 def setAnalogOutput(analogOutputHandle, voltage, status):
     status.value = 0
-    hal_data['analog_out'][analogOutputHandle.pin]['output'] = voltage
+    hal_data['analog_out'][analogOutputHandle.pin]['voltage'] = voltage
 
 def getAnalogOutput(analogOutputHandle, status):
     status.value = 0
-    return hal_data['analog_out'][analogOutputHandle.pin]['output']
+    return hal_data['analog_out'][analogOutputHandle.pin]['voltage']
 
 def checkAnalogOutputChannel(channel):
     return channel < kNumAnalogOutputs and channel >= 0
@@ -605,6 +643,20 @@ def getAnalogTriggerOutput(analogTriggerHandle, type, status):
         status.value = ANALOG_TRIGGER_PULSE_OUTPUT_ERROR
         return False
 
+class _Status:
+    __slots__ = ['value']
+
+def _getAnalogTriggerOutput(analogTriggerHandle, analogTriggerType):
+    # Used by the interrupt manager to detect edges on analog triggers. The
+    # pulse outputs are routed using the trigger state instead
+    atr = hal_data['analog_trigger'][analogTriggerHandle.index]
+    if atr['trig_lower'] is None or atr['trig_upper'] is None:
+        return False
+    
+    if analogTriggerType == constants.AnalogTriggerType.kInWindow:
+        return getAnalogTriggerInWindow(analogTriggerHandle, _Status())
+    return getAnalogTriggerTriggerState(analogTriggerHandle, _Status())
+
 
 #############################################################################
 # Compressor.h
@@ -1089,6 +1141,8 @@ def initializeEncoder(digitalSourceHandleA, analogTriggerTypeA, digitalSourceHan
             enc['config'] = {"ASource_Channel": digitalSourceHandleA.pin, "ASource_AnalogTrigger": analogTriggerTypeA,
                              "BSource_Channel": digitalSourceHandleB.pin, "BSource_AnalogTrigger": analogTriggerTypeB}
             enc['reverse_direction'] = reverseDirection
+            enc['encoding_type'] = encodingType
+            enc['max_period'] = 0.5
             return types.EncoderHandle(idx)
     status.value = NO_AVAILABLE_RESOURCES
     return None
@@ -1103,15 +1157,22 @@ def getEncoder(encoderHandle, status):
 
 def getEncoderRaw(encoderHandle, status):
     status.value = 0
-    assert False
+    return hal_data['encoder'][encoderHandle.idx]['raw']
+
+_encodingScales = {
+    constants.EncoderEncodingType.k1X: 1,
+    constants.EncoderEncodingType.k2X: 2,
+    constants.EncoderEncodingType.k4X: 4,
+}
 
 def getEncoderEncodingScale(encoderHandle, status):
     status.value = 0
-    assert False
+    return _encodingScales[hal_data['encoder'][encoderHandle.idx]['encoding_type']]
 
 def resetEncoder(encoderHandle, status):
     status.value = 0
     hal_data['encoder'][encoderHandle.idx]['count'] = 0
+    hal_data['encoder'][encoderHandle.idx]['raw'] = 0
 
 def getEncoderPeriod(encoderHandle, status):
     status.value = 0
@@ -1141,7 +1202,10 @@ def getEncoderRate(encoderHandle, status):
 
 def setEncoderMinRate(encoderHandle, minRate, status):
     status.value = 0
-    hal_data['encoder'][encoderHandle.idx]['min_rate'] = minRate
+    enc = hal_data['encoder'][encoderHandle.idx]
+    enc['min_rate'] = minRate
+    if minRate:
+        enc['max_period'] = enc['distance_per_pulse'] / minRate
 
 def setEncoderDistancePerPulse(encoderHandle, distancePerPulse, status):
     status.value = 0
@@ -1171,7 +1235,7 @@ def getEncoderFPGAIndex(encoderHandle, status):
 
 def getEncoderDecodingScaleFactor(encoderHandle, status):
     status.value = 0
-    assert False
+    return 1.0 / getEncoderEncodingScale(encoderHandle, status)
 
 def getEncoderDistancePerPulse(encoderHandle, status):
     status.value = 0
@@ -1179,7 +1243,7 @@ def getEncoderDistancePerPulse(encoderHandle, status):
 
 def getEncoderEncodingType(encoderHandle, status):
     status.value = 0
-    assert False
+    return hal_data['encoder'][encoderHandle.idx]['encoding_type']
 
 
 #############################################################################
@@ -1227,60 +1291,86 @@ def closeI2C(port):
 # Interrupts
 #############################################################################
 
+# Edges are detected by listening to hal_data, see interrupts.py
+
 def initializeInterrupts(watcher, status):
-    assert False # TODO
+    status.value = 0
+    handle = _interrupts.initialize(watcher)
+    if handle is None:
+        status.value = NO_AVAILABLE_RESOURCES
+    return handle
 
 def cleanInterrupts(interruptHandle, status):
-    assert False # TODO
+    status.value = 0
+    _interrupts.clean(interruptHandle)
 
 def waitForInterrupt(interruptHandle, timeout, ignorePrevious, status):
-    assert False # TODO
+    status.value = 0
+    return _interrupts.wait(interruptHandle, timeout, ignorePrevious)
 
 def enableInterrupts(interruptHandle, status):
-    assert False # TODO
+    status.value = 0
+    _interrupts.enable(interruptHandle)
 
 def disableInterrupts(interruptHandle, status):
-    assert False # TODO
+    status.value = 0
+    _interrupts.disable(interruptHandle)
 
 def readInterruptRisingTimestamp(interruptHandle, status):
-    assert False # TODO
+    status.value = 0
+    return _interrupts.readRisingTimestamp(interruptHandle)
 
 def readInterruptFallingTimestamp(interruptHandle, status):
-    assert False # TODO
+    status.value = 0
+    return _interrupts.readFallingTimestamp(interruptHandle)
 
 def requestInterrupts(interruptHandle, digitalSourceHandle, analogTriggerType, status):
     status.value = 0
-    assert False
+    _interrupts.request(interruptHandle, digitalSourceHandle, analogTriggerType)
 
 def attachInterruptHandler(interruptHandle, handler, param, status):
-    assert False # TODO
+    status.value = 0
+    _interrupts.attachHandler(interruptHandle, handler, param)
 
 def attachInterruptHandlerThreaded(interruptHandle, handler, param, status):
     status.value = 0
-    assert False
+    _interrupts.attachHandler(interruptHandle, handler, param)
 
 def setInterruptUpSourceEdge(interruptHandle, risingEdge, fallingEdge, status):
-    assert False # TODO
+    status.value = 0
+    _interrupts.setUpSourceEdge(interruptHandle, risingEdge, fallingEdge)
 
 
 #############################################################################
 # Notifier
 #############################################################################
 
-# def initializeNotifier(processQueue, param, status):
-#     assert False # TODO
-# 
-# def cleanNotifier(notifier, status):
-#     assert False # TODO
-#     
-# def getNotifierParam(notifier, status):
-#     assert False # TODO
-# 
-# def updateNotifierAlarm(notifier, triggerTime, status):
-#     assert False # TODO
-# 
-# def stopNotifierAlarm(notifier, status):
-#     assert False # TODO
+# Alarms are serviced by a single thread, see notifier.py
+
+def initializeNotifier(status):
+    status.value = 0
+    return _notifiers.initialize()
+
+def stopNotifier(notifierHandle, status):
+    status.value = 0
+    _notifiers.stop(notifierHandle)
+
+def cleanNotifier(notifierHandle, status):
+    status.value = 0
+    _notifiers.clean(notifierHandle)
+
+def updateNotifierAlarm(notifierHandle, triggerTime, status):
+    status.value = 0
+    if not _notifiers.update(notifierHandle, triggerTime):
+        status.value = HAL_HANDLE_ERROR
+
+def cancelNotifierAlarm(notifierHandle, status):
+    status.value = 0
+    _notifiers.cancel(notifierHandle)
+
+def waitForNotifierAlarm(notifierHandle, status):
+    status.value = 0
+    return _notifiers.wait(notifierHandle)
 
 #############################################################################
 # PDP
@@ -1873,3 +1963,4 @@ def fireOneShot(solenoidPortHandle, status):
 
 # This needs to be here otherwise tests will fail, as hal.initialize() does not call this
 data._reset_hal_data(hooks)
+_interrupts = InterruptManager(kNumInterrupts, _getAnalogTriggerOutput)
@@ -1,12 +1,14 @@
 
 from . import data
+from .register_map import buffer_view, ADXL345Registers
 hal_data = data.hal_data
 
 class I2CSimBase:
     '''
         Base class to use for i2c protocol simulators.
         
-        Not particularly useful at the moment
+        Devices that are a set of registers should use
+        :class:`I2CRegisterSim` instead.
     '''
     
     def initializeI2C(self, port, status):
@@ -38,3 +40,54 @@ class I2CSimBase:
     def closeI2C(self, port):
         pass
     
+
+class I2CRegisterSim(I2CSimBase):
+    '''
+        Simulates an i2c device that is a :class:`.RegisterMap`. The first
+        byte of a write selects the register, the rest of the bytes are
+        written starting at that register. Reads start at the selected
+        register, and the register pointer moves past the bytes that were
+        read or written.
+    '''
+    
+    def __init__(self, registers):
+        self.registers = registers
+        self.pointer = 0
+    
+    def transactionI2C(self, port, deviceAddress, dataToSend, sendSize, dataReceived, receiveSize):
+        if sendSize:
+            self.writeI2C(port, deviceAddress, dataToSend, sendSize)
+        return self.readI2C(port, deviceAddress, dataReceived, receiveSize)
+    
+    def writeI2C(self, port, deviceAddress, dataToSend, sendSize):
+        if sendSize:
+            view = buffer_view(dataToSend)[:sendSize]
+            self.pointer = view[0]
+            if sendSize > 1:
+                self.registers.write(self.pointer, view[1:])
+                self.pointer = (self.pointer + sendSize - 1) % self.registers.size
+        return sendSize
+    
+    def readI2C(self, port, deviceAddress, buffer, count):
+        if count:
+            buffer_view(buffer)[:count] = self.registers.read(self.pointer, count)
+            self.pointer = (self.pointer + count) % self.registers.size
+        return count
+
+
+class ADXL345_I2C_Sim(I2CRegisterSim):
+    '''
+        Simulates an ADXL345 on the i2c bus. The acceleration in g is the
+        value of::
+        
+            hal_data['robot']['adxl345_i2c_%d_x']
+        
+        (and y, z), where %d is the i2c port number.
+    '''
+    
+    def __init__(self, accel):
+        super().__init__(None)
+    
+    def initializeI2C(self, port, status):
+        super().initializeI2C(port, status)
+        self.registers = ADXL345Registers('adxl345_i2c_%d_' % port)
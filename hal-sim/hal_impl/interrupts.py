@@ -0,0 +1,265 @@
+'''
+    Simulated interrupts. Edges are detected by listening to changes in
+    hal_data, so whenever a simulator sets a DIO value (or an analog value
+    that causes an analog trigger to change state), any interrupts
+    attached to that source will fire.
+'''
+
+import collections
+import threading
+
+from . import data
+from . import types
+
+import logging
+logger = logging.getLogger('hal.interrupts')
+
+
+class _InterruptData:
+    __slots__ = [
+        'watcher', 'enabled',
+        'source', 'last_value',
+        'rising_edge', 'falling_edge',
+        'rising_timestamp', 'falling_timestamp',
+        'pending',
+        'handler', 'param',
+    ]
+
+    def __init__(self, watcher):
+        # synchronous interrupts are always enabled
+        self.watcher = watcher
+        self.enabled = watcher
+        self.source = None
+        self.last_value = None
+        self.rising_edge = True
+        self.falling_edge = False
+        self.rising_timestamp = 0
+        self.falling_timestamp = 0
+        self.pending = 0
+        self.handler = None
+        self.param = None
+
+
+class InterruptManager:
+    '''
+        Keeps track of all interrupts, and detects edges on their sources.
+
+        Waiters are woken via a condition variable, and handlers attached
+        to asynchronous interrupts are called from a single worker thread
+        shared by all interrupts.
+    '''
+
+    def __init__(self, num_interrupts, read_trigger):
+        '''
+            :param num_interrupts: Number of interrupts available
+            :param read_trigger: Called with (analogTriggerHandle, analogTriggerType),
+                                 returns the current output of the trigger
+        '''
+        self.cond = threading.Condition()
+        self.interrupts = [None]*num_interrupts
+        self.read_trigger = read_trigger
+
+        # key: (hal_data key, index), value: list of interrupt indices
+        self.sources = {}
+
+        self.queue = collections.deque()
+        self.worker = None
+        self.running = True
+
+    def initialize(self, watcher):
+        with self.cond:
+            for idx, interrupt in enumerate(self.interrupts):
+                if interrupt is None:
+                    self.interrupts[idx] = _InterruptData(watcher)
+                    return types.InterruptHandle(idx)
+
+    def clean(self, handle):
+        with self.cond:
+            interrupt = self.interrupts[handle.idx]
+            if interrupt is None:
+                return
+            self._unroute(handle.idx, interrupt)
+            self.interrupts[handle.idx] = None
+            data.hooks.notifyCondition(self.cond)
+
+    def request(self, handle, digitalSourceHandle, analogTriggerType):
+        with self.cond:
+            interrupt = self.interrupts[handle.idx]
+            self._unroute(handle.idx, interrupt)
+
+            if isinstance(digitalSourceHandle, types.AnalogTriggerHandle):
+                source = (digitalSourceHandle, analogTriggerType)
+                ain = data.hal_data['analog_in'][digitalSourceHandle.pin]
+                self._route(handle.idx, ('analog_in', digitalSourceHandle.pin),
+                            ain, ('value', 'avg_value'))
+            else:
+                source = digitalSourceHandle
+                dio = data.hal_data['dio'][digitalSourceHandle.pin]
+                self._route(handle.idx, ('dio', digitalSourceHandle.pin),
+                            dio, ('value',))
+
+            interrupt.source = source
+            interrupt.last_value = self._read_source(source)
+
+    def setUpSourceEdge(self, handle, risingEdge, fallingEdge):
+        with self.cond:
+            interrupt = self.interrupts[handle.idx]
+            interrupt.rising_edge = risingEdge
+            interrupt.falling_edge = fallingEdge
+
+    def enable(self, handle):
+        with self.cond:
+            interrupt = self.interrupts[handle.idx]
+            interrupt.enabled = True
+            if interrupt.source is not None:
+                interrupt.last_value = self._read_source(interrupt.source)
+
+    def disable(self, handle):
+        with self.cond:
+            self.interrupts[handle.idx].enabled = False
+
+    def attachHandler(self, handle, handler, param):
+        with self.cond:
+            interrupt = self.interrupts[handle.idx]
+            interrupt.handler = handler
+            interrupt.param = param
+
+            if self.worker is None and self.running:
+                self.worker = threading.Thread(target=self._run_handlers,
+                                               name='HALInterrupts', daemon=True)
+                data.hooks.registerThread(self.worker)
+                self.worker.start()
+
+    def readRisingTimestamp(self, handle):
+        with self.cond:
+            return self.interrupts[handle.idx].rising_timestamp * 1e-6
+
+    def readFallingTimestamp(self, handle):
+        with self.cond:
+            return self.interrupts[handle.idx].falling_timestamp * 1e-6
+
+    def wait(self, handle, timeout, ignorePrevious):
+        '''
+            Waits for an edge to occur.
+
+            :returns: mask of edges that occurred, or 0 on timeout
+        '''
+        hooks = data.hooks
+        idx = handle.idx
+        end = hooks.getTime() + timeout
+
+        with self.cond:
+            interrupt = self.interrupts[idx]
+            if interrupt is None:
+                return 0
+
+            if ignorePrevious:
+                interrupt.pending = 0
+
+            while interrupt.pending == 0:
+                remaining = end - hooks.getTime()
+                if remaining <= 0 or self.interrupts[idx] is not interrupt:
+                    return 0
+                hooks.waitForCondition(self.cond, remaining)
+
+            pending = interrupt.pending
+            interrupt.pending = 0
+            return pending
+
+    def shutdown(self):
+        '''Wakes up all waiters and stops the handler thread. Once shut
+           down, this object cannot be used again'''
+        with self.cond:
+            self.interrupts = [None]*len(self.interrupts)
+            self.sources.clear()
+            self.queue.clear()
+            self.running = False
+            data.hooks.notifyCondition(self.cond)
+
+    #
+    # Internal functions, must be called with cond held
+    #
+
+    def _route(self, idx, key, d, keys):
+        listeners = self.sources.get(key)
+        if listeners is None:
+            listeners = self.sources[key] = []
+            cb = lambda k, v: self._on_change(key)
+            for k in keys:
+                d.register(k, cb)
+        listeners.append(idx)
+
+    def _unroute(self, idx, interrupt):
+        if interrupt.source is None:
+            return
+        for listeners in self.sources.values():
+            if idx in listeners:
+                listeners.remove(idx)
+        interrupt.source = None
+
+    def _read_source(self, source):
+        if isinstance(source, tuple):
+            return bool(self.read_trigger(*source))
+        return bool(data.hal_data['dio'][source.pin]['value'])
+
+    def _on_change(self, key):
+        # Called from NotifyDict, whenever a source value is set
+        with self.cond:
+            listeners = self.sources.get(key)
+            if not listeners:
+                return
+
+            now = None
+            notify = False
+
+            for idx in listeners:
+                interrupt = self.interrupts[idx]
+                value = self._read_source(interrupt.source)
+                last_value = interrupt.last_value
+                interrupt.last_value = value
+
+                if value == last_value or not interrupt.enabled:
+                    continue
+
+                if now is None:
+                    now = data.hooks.getFPGATime()
+
+                if value:
+                    if not interrupt.rising_edge:
+                        continue
+                    interrupt.rising_timestamp = now
+                    mask = 1 << idx
+                else:
+                    if not interrupt.falling_edge:
+                        continue
+                    interrupt.falling_timestamp = now
+                    mask = 1 << (8 + idx)
+
+                if interrupt.watcher:
+                    interrupt.pending |= mask
+                    notify = True
+                elif interrupt.handler is not None:
+                    self.queue.append((interrupt.handler, mask, interrupt.param))
+                    notify = True
+
+            if notify:
+                data.hooks.notifyCondition(self.cond)
+
+    def _run_handlers(self):
+        cond = self.cond
+        queue = self.queue
+
+        while True:
+            with cond:
+                while not queue:
+                    if not self.running:
+                        self.worker = None
+                        return
+                    data.hooks.waitForCondition(cond, None)
+
+                handler, mask, param = queue.popleft()
+
+            try:
+                handler(mask, param)
+            except Exception:
+                logger.exception("Unhandled exception in interrupt handler")
@@ -0,0 +1,152 @@
+'''
+    Simulated notifier alarms. All alarms are kept in a single heap that is
+    serviced by one thread, using the current SimHooks for time.
+'''
+
+import heapq
+import itertools
+import threading
+
+from . import data
+from . import types
+
+import logging
+logger = logging.getLogger('hal.notifier')
+
+
+class _NotifierData:
+    __slots__ = ['trigger_time', 'fired_time', 'active']
+
+    def __init__(self):
+        self.trigger_time = None
+        self.fired_time = None
+        self.active = True
+
+
+class NotifierManager:
+    '''
+        Keeps track of all notifier alarms. Alarm times are in FPGA time
+        (microseconds), and are compared against ``hooks.getFPGATime()``
+    '''
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.notifiers = {}
+        self.heap = []
+        self.ids = itertools.count()
+        self.seq = itertools.count()
+        self.thread = None
+        self.running = True
+
+    def initialize(self):
+        with self.cond:
+            idx = next(self.ids)
+            self.notifiers[idx] = _NotifierData()
+
+            if self.thread is None and self.running:
+                self.thread = threading.Thread(target=self._run, name='HALNotifier',
+                                               daemon=True)
+                data.hooks.registerThread(self.thread)
+                self.thread.start()
+
+            return types.NotifierHandle(idx)
+
+    def stop(self, handle):
+        '''Causes any waiters to return 0'''
+        with self.cond:
+            n = self.notifiers.get(handle.idx)
+            if n is not None:
+                n.active = False
+                n.trigger_time = None
+                data.hooks.notifyCondition(self.cond)
+
+    def clean(self, handle):
+        self.stop(handle)
+        with self.cond:
+            self.notifiers.pop(handle.idx, None)
+
+    def update(self, handle, trigger_time):
+        with self.cond:
+            n = self.notifiers.get(handle.idx)
+            if n is None or not n.active:
+                return False
+
+            n.trigger_time = trigger_time
+            heapq.heappush(self.heap, (trigger_time, next(self.seq), handle.idx))
+            data.hooks.notifyCondition(self.cond)
+            return True
+
+    def cancel(self, handle):
+        with self.cond:
+            n = self.notifiers.get(handle.idx)
+            if n is not None:
+                n.trigger_time = None
+
+    def wait(self, handle):
+        '''
+            Blocks until the alarm fires, and returns the time that it
+            fired. Returns 0 if the notifier is stopped.
+        '''
+        with self.cond:
+            while True:
+                n = self.notifiers.get(handle.idx)
+                if n is None or not n.active:
+                    return 0
+
+                if n.fired_time is not None:
+                    fired_time = n.fired_time
+                    n.fired_time = None
+                    return fired_time
+
+                data.hooks.waitForCondition(self.cond, None)
+
+    def shutdown(self):
+        '''Stops all notifiers and the alarm thread. Once shut down, this
+           object cannot be used again'''
+        with self.cond:
+            for n in self.notifiers.values():
+                n.active = False
+                n.trigger_time = None
+
+            self.notifiers.clear()
+            self.heap.clear()
+            self.running = False
+            data.hooks.notifyCondition(self.cond)
+
+    def _run(self):
+        cond = self.cond
+        heap = self.heap
+        notifiers = self.notifiers
+
+        with cond:
+            while self.running:
+
+                # discard alarms that were cancelled or updated
+                while heap:
+                    trigger_time, _, idx = heap[0]
+                    n = notifiers.get(idx)
+                    if n is not None and n.trigger_time == trigger_time:
+                        break
+                    heapq.heappop(heap)
+
+                hooks = data.hooks
+
+                if not heap:
+                    hooks.waitForCondition(cond, None)
+                    continue
+
+                trigger_time, _, idx = heap[0]
+                now = hooks.getFPGATime()
+
+                if trigger_time > now:
+                    hooks.waitForCondition(cond, (trigger_time - now) / 1000000.0)
+                    continue
+
+                heapq.heappop(heap)
+                n = notifiers[idx]
+                n.trigger_time = None
+                # 0 is returned to waiters when the notifier is stopped
+                n.fired_time = max(now, 1)
+                hooks.notifyCondition(cond)
+
+            self.thread = None
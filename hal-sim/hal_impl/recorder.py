@@ -0,0 +1,404 @@
+'''
+    Records the contents of hal_data over time into a compact binary log,
+    and replays the recorded inputs back into hal_data. This allows a match
+    (or a test run) to be re-run against new robot code.
+
+    To record, call :meth:`Recorder.record` once per loop::
+
+        recorder = Recorder('match.halrec')
+        ...
+        recorder.record()
+        ...
+        recorder.close()
+
+    To replay the inputs::
+
+        replayer = Replayer('match.halrec')
+        while replayer.step() is not None:
+            ...     # run a loop of robot code
+
+    Log format
+    ----------
+
+    The log starts with a header, followed by records. Each record starts
+    with a single byte that identifies its type:
+
+    * Path definition: ``P id:varint is_input:byte len:varint json-path``
+    * Frame: ``F dt:varint count:varint (id:varint value)*``, where ``dt``
+      is the number of microseconds since the previous frame
+
+    A frame only contains the values that changed since the previous frame.
+    Integers are stored as zigzag varints, and everything that isn't a
+    number, bool, string or None is stored as JSON.
+'''
+
+import io
+import json
+import struct
+
+from collections.abc import Mapping
+
+from . import data
+
+import logging
+logger = logging.getLogger('hal.recorder')
+
+__all__ = ["Recorder", "Replayer"]
+
+_MAGIC = b'HALREC\x00\x01'
+
+_PATH = b'P'[0]
+_FRAME = b'F'[0]
+
+# value tags
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_JSON = 6
+
+_double = struct.Struct('<d')
+
+
+def _write_varint(buf, value):
+    while value > 0x7f:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+def _read_varint(f):
+    result = 0
+    shift = 0
+    while True:
+        b = f.read(1)
+        if not b:
+            raise EOFError()
+        b = b[0]
+        result |= (b & 0x7f) << shift
+        if b < 0x80:
+            return result
+        shift += 7
+
+def _write_value(buf, value):
+    if value is None:
+        buf.append(_NONE)
+    elif value is True:
+        buf.append(_TRUE)
+    elif value is False:
+        buf.append(_FALSE)
+    elif isinstance(value, int):
+        buf.append(_INT)
+        _write_varint(buf, (value << 1) if value >= 0 else ((-value << 1) - 1))
+    elif isinstance(value, float):
+        buf.append(_FLOAT)
+        buf += _double.pack(value)
+    elif isinstance(value, str):
+        buf.append(_STR)
+        b = value.encode('utf-8')
+        _write_varint(buf, len(b))
+        buf += b
+    else:
+        buf.append(_JSON)
+        b = json.dumps(value).encode('utf-8')
+        _write_varint(buf, len(b))
+        buf += b
+
+def _read_value(f):
+    tag = f.read(1)[0]
+    if tag == _NONE:
+        return None
+    elif tag == _TRUE:
+        return True
+    elif tag == _FALSE:
+        return False
+    elif tag == _INT:
+        v = _read_varint(f)
+        return (v >> 1) if not v & 1 else -((v + 1) >> 1)
+    elif tag == _FLOAT:
+        return _double.unpack(f.read(8))[0]
+    elif tag == _STR:
+        return f.read(_read_varint(f)).decode('utf-8')
+    elif tag == _JSON:
+        return json.loads(f.read(_read_varint(f)).decode('utf-8'))
+    else:
+        raise ValueError("Invalid value tag %d" % tag)
+
+
+def _is_record_list(v):
+    return isinstance(v, list) and v and all(isinstance(i, Mapping) for i in v)
+
+def _walk(d, path, seen):
+    '''Yields (path, value) for each leaf of hal_data'''
+    for k, v in d.items():
+        p = path + (k,)
+        if isinstance(v, Mapping) or _is_record_list(v):
+            # some things are in hal_data twice (hal_data['pcm'][0] is
+            # hal_data['solenoid']), only record them once
+            if id(v) in seen:
+                continue
+            seen.add(id(v))
+            
+            if isinstance(v, Mapping):
+                yield from _walk(v, p, seen)
+            else:
+                for i, vv in enumerate(v):
+                    yield from _walk(vv, p + (i,), seen)
+        else:
+            yield p, v
+
+def _is_input(path, in_data):
+    # hal_data['robot'] is filled in by simulated devices
+    if path[0] == 'robot':
+        return True
+
+    d = in_data
+    for k in path:
+        try:
+            d = d[k]
+        except (KeyError, IndexError, TypeError):
+            return False
+    return True
+
+
+# The last value of a path that hasn't been recorded yet
+class _Unset:
+    def __eq__(self, other):
+        return False
+
+    __hash__ = None
+
+_unset = _Unset()
+
+
+class Recorder:
+    '''
+        Records the values in hal_data that changed since the last call to
+        :meth:`record` into a binary log file.
+    '''
+
+    def __init__(self, f, hal_data=None, hal_in_data=None):
+        '''
+            :param f: Filename or binary file object to write the log to
+            :param hal_data: Data to record, defaults to ``data.hal_data``
+            :param hal_in_data: Used to decide which values are inputs,
+                                defaults to ``data.hal_in_data``
+        '''
+        if isinstance(f, str):
+            f = open(f, 'wb')
+            self._close = True
+        else:
+            self._close = False
+
+        self.f = f
+        self.hal_data = data.hal_data if hal_data is None else hal_data
+        self.hal_in_data = data.hal_in_data if hal_in_data is None else hal_in_data
+
+        # path: [id, last value]
+        self.paths = {}
+        self.last_time = 0
+
+        self.f.write(_MAGIC)
+
+    def record(self, now=None):
+        '''
+            Records the values that have changed since the last call
+
+            :param now: FPGA time (in microseconds) to record, defaults to
+                        ``hooks.getFPGATime()``
+            :returns: the number of values that were recorded
+        '''
+        if now is None:
+            now = data.hooks.getFPGATime()
+
+        buf = bytearray()
+        frame = bytearray()
+        count = 0
+
+        paths = self.paths
+        for path, value in _walk(self.hal_data, (), set()):
+            entry = paths.get(path)
+            if entry is None:
+                try:
+                    jpath = json.dumps(path).encode('utf-8')
+                except TypeError:
+                    logger.warning("Cannot record %s", path)
+                    paths[path] = entry = [None, None]
+                    continue
+
+                entry = paths[path] = [len(paths), _unset]
+                buf.append(_PATH)
+                _write_varint(buf, entry[0])
+                buf.append(_is_input(path, self.hal_in_data))
+                _write_varint(buf, len(jpath))
+                buf += jpath
+
+            elif entry[0] is None or (entry[1] == value and type(entry[1]) is type(value)):
+                continue
+
+            if isinstance(value, list):
+                value = list(value)
+
+            try:
+                vbuf = bytearray()
+                _write_value(vbuf, value)
+            except (TypeError, ValueError):
+                logger.warning("Cannot record %s = %r", path, value)
+                entry[0] = None
+                continue
+
+            entry[1] = value
+            _write_varint(frame, entry[0])
+            frame += vbuf
+            count += 1
+
+        buf.append(_FRAME)
+        dt = now - self.last_time
+        _write_varint(buf, dt if dt > 0 else 0)
+        _write_varint(buf, count)
+        buf += frame
+
+        self.last_time = max(now, self.last_time)
+        self.f.write(buf)
+        return count
+
+    def close(self):
+        if self._close:
+            self.f.close()
+        else:
+            self.f.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Replayer:
+    '''
+        Reads a log written by :class:`Recorder`, and applies the recorded
+        inputs to hal_data using :func:`data.update_hal_data`.
+    '''
+
+    def __init__(self, f, hal_data=None):
+        '''
+            :param f: Filename, bytes, or binary file object to read the log from
+            :param hal_data: Data to apply the inputs to, defaults to
+                             ``data.hal_data``
+        '''
+        if isinstance(f, str):
+            f = open(f, 'rb')
+        elif isinstance(f, (bytes, bytearray)):
+            f = io.BytesIO(f)
+
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("Not a hal_data recording")
+
+        self.f = f
+        self.hal_data = data.hal_data if hal_data is None else hal_data
+
+        # id: (path, is_input)
+        self.paths = {}
+        self.time = 0
+
+    def read_frame(self):
+        '''
+            Reads the next frame from the log, without applying it
+
+            :returns: (FPGA time, list of (path, is_input, value)), or
+                      None at the end of the log
+        '''
+        f = self.f
+        paths = self.paths
+
+        while True:
+            rtype = f.read(1)
+            if not rtype:
+                return None
+
+            rtype = rtype[0]
+            if rtype == _PATH:
+                pid = _read_varint(f)
+                is_input = bool(f.read(1)[0])
+                path = tuple(json.loads(f.read(_read_varint(f)).decode('utf-8')))
+                paths[pid] = (path, is_input)
+
+            elif rtype == _FRAME:
+                self.time += _read_varint(f)
+                values = []
+                for _ in range(_read_varint(f)):
+                    path, is_input = paths[_read_varint(f)]
+                    values.append((path, is_input, _read_value(f)))
+                return self.time, values
+
+            else:
+                raise ValueError("Invalid record type %d" % rtype)
+
+    def frames(self):
+        '''Iterates over the remaining frames, see :meth:`read_frame`'''
+        while True:
+            frame = self.read_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def apply(self, values, inputs_only=True):
+        '''
+            Applies values from a frame to hal_data
+
+            :param values: list of (path, is_input, value)
+            :param inputs_only: If False, outputs are set too
+        '''
+        in_dict = {}
+        for path, is_input, value in values:
+            if not is_input and inputs_only:
+                continue
+
+            d = in_dict
+            out = self.hal_data
+            for k in path[:-1]:
+                out = out[k]
+                if isinstance(d, list):
+                    d = d[k]
+                else:
+                    v = d.get(k)
+                    if v is None:
+                        # update_hal_data matches list items by position
+                        v = d[k] = [{} for _ in out] if isinstance(out, list) else {}
+                    d = v
+            d[path[-1]] = value
+
+        data.update_hal_data(in_dict, self.hal_data)
+
+    def step(self, inputs_only=True):
+        '''
+            Applies the next frame of the log
+
+            :returns: the recorded FPGA time of the frame, or None at the
+                      end of the log
+        '''
+        frame = self.read_frame()
+        if frame is None:
+            return None
+
+        self.apply(frame[1], inputs_only)
+        return frame[0]
+
+    def run(self, speed=1.0, inputs_only=True):
+        '''
+            Applies all of the remaining frames, waiting between them using
+            ``hooks.delaySeconds``
+
+            :param speed: How much faster than real time to replay the log.
+                          If 0 or None, frames are applied without waiting.
+        '''
+        last = None
+        for t, values in self.frames():
+            if last is not None and speed:
+                delay = (t - last) / 1000000.0 / speed
+                if delay > 0:
+                    data.hooks.delaySeconds(delay)
+            last = t
+            self.apply(values, inputs_only)
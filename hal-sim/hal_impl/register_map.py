@@ -0,0 +1,290 @@
+'''
+    Declarative register maps for simulated I2C and SPI devices.
+
+    Most sensors on a bus are a set of registers: the robot writes a
+    register address, then reads or writes the registers starting at that
+    address. A :class:`RegisterMap` stores all of the registers of a device
+    in a single bytearray, so that a burst read is one slice of it. Registers
+    whose value comes from the simulation are declared with a function,
+    which is only called when a read covers that register::
+
+        regs = RegisterMap({
+            0x00: 0xE5,                             # constant
+            0x2D: Register(0, on_write=power),      # calls power(value)
+            0x32: Register(lambda: x, size=2, signed=True),
+        })
+
+    See :class:`.I2CRegisterSim` and :class:`.SPIRegisterSim` to use a
+    register map with :class:`.I2C` and :class:`.SPI`.
+'''
+
+from . import data
+hal_data = data.hal_data
+
+__all__ = ["Register", "RegisterMap", "ADXL345Registers", "ADXL362Registers"]
+
+
+def buffer_view(buffer):
+    ''':returns: a memoryview of the bytes of a buffer (such as a ctypes array)'''
+    view = memoryview(buffer)
+    if view.format != 'B':
+        view = view.cast('B')
+    return view
+
+
+class Register:
+    '''
+        Declares a register (or a group of registers holding one value)
+    '''
+
+    __slots__ = ['value', 'size', 'byteorder', 'signed', 'readonly', 'on_write']
+
+    def __init__(self, value=0, size=1, byteorder='little', signed=False,
+                       readonly=False, on_write=None):
+        '''
+            :param value: Initial value, or a function that returns the
+                          current value. Registers with a function are
+                          read only.
+            :param size: Number of bytes used to store the value
+            :param byteorder: 'little' or 'big'
+            :param signed: Whether the value is stored as two's complement
+            :param readonly: If True, writes from the robot are ignored
+            :param on_write: Called with the new value when the robot
+                             writes to the register
+        '''
+        self.value = value
+        self.size = size
+        self.byteorder = byteorder
+        self.signed = signed
+        self.readonly = readonly or callable(value)
+        self.on_write = on_write
+
+
+class RegisterMap:
+    '''
+        The registers of a simulated device, stored in a bytearray. Bytes
+        that aren't declared read as zero, and can be written.
+    '''
+
+    def __init__(self, registers=None, size=256):
+        '''
+            :param registers: dict of address: :class:`Register`, value,
+                              or function that returns the value
+            :param size: Number of addresses
+        '''
+        self.mem = bytearray(size)
+        self.view = memoryview(self.mem)
+        self.size = size
+
+        # address: (start, Register), for every byte that a register covers
+        self._owner = {}
+        # (start, Register) of registers that are computed on read
+        self._dynamic = []
+        # start: Register, for registers that writes need to check
+        self._hooks = {}
+
+        if registers:
+            for address, reg in registers.items():
+                self.define(address, reg)
+
+    def define(self, address, reg):
+        '''Adds a register to the map'''
+        if not isinstance(reg, Register):
+            reg = Register(reg)
+
+        if address < 0 or address + reg.size > self.size:
+            raise ValueError("Register 0x%02x does not fit in the map" % address)
+
+        for i in range(address, address + reg.size):
+            self._owner[i] = (address, reg)
+
+        if callable(reg.value):
+            self._dynamic.append((address, reg))
+        else:
+            self._store(address, reg, reg.value)
+
+        if reg.readonly or reg.on_write is not None:
+            self._hooks[address] = reg
+
+    def _store(self, address, reg, value):
+        mask = (1 << (8*reg.size)) - 1
+        if reg.signed:
+            value &= mask
+        else:
+            value = min(max(int(value), 0), mask)
+        self.mem[address:address + reg.size] = int(value).to_bytes(reg.size, reg.byteorder)
+
+    def __getitem__(self, address):
+        '''Returns the value of a register'''
+        start, reg = self._owner.get(address, (None, None))
+        if reg is None or start != address:
+            return self.mem[address]
+
+        if callable(reg.value):
+            self._refresh(address, address + 1)
+
+        return int.from_bytes(self.mem[address:address + reg.size],
+                              reg.byteorder, signed=reg.signed)
+
+    def __setitem__(self, address, value):
+        '''Sets the value of a register, from the simulation side'''
+        start, reg = self._owner.get(address, (None, None))
+        if reg is None or start != address:
+            self.mem[address] = value
+        else:
+            self._store(address, reg, value)
+
+    def _refresh(self, start, end):
+        # computes the registers in [start, end) from their functions
+        for address, reg in self._dynamic:
+            if address < end and address + reg.size > start:
+                self._store(address, reg, reg.value())
+
+    def read(self, address, count, increment=True):
+        '''
+            Reads registers, starting at address
+
+            :param increment: If False, the register at address is read
+                              count times
+            :returns: a memoryview of the registers. It is only valid until
+                      the next call.
+        '''
+        if not increment:
+            self._refresh(address, address + 1)
+            self._scratch = bytes(self.mem[address:address + 1]) * count
+            return memoryview(self._scratch)
+
+        end = address + count
+        if self._dynamic:
+            self._refresh(address, end)
+
+        if end <= self.size:
+            return self.view[address:end]
+
+        # reading past the end wraps around
+        self._scratch = bytes(self.mem[address:]) + bytes(self.mem[:end - self.size])
+        return memoryview(self._scratch)
+
+    def write(self, address, chunk):
+        '''
+            Writes bytes from the robot, starting at address. Writes to read
+            only registers and past the end of the map are ignored, and
+            on_write is called once per register that was written.
+        '''
+        chunk = bytes(chunk[:max(self.size - address, 0)])
+        end = address + len(chunk)
+
+        if not self._hooks:
+            self.mem[address:end] = chunk
+            return
+
+        # keep the bytes of read only registers
+        old = bytes(self.mem[address:end])
+        self.mem[address:end] = chunk
+
+        written = []
+        for start, reg in self._hooks.items():
+            if start < end and start + reg.size > address:
+                if reg.readonly:
+                    lo = max(start, address)
+                    hi = min(start + reg.size, end)
+                    self.mem[lo:hi] = old[lo - address:hi - address]
+                else:
+                    written.append((start, reg))
+
+        for start, reg in written:
+            reg.on_write(self[start])
+
+
+#
+# Devices supported by wpilib
+#
+
+def _clamp(value, bits):
+    limit = 1 << (bits - 1)
+    return min(max(int(round(value)), -limit), limit - 1)
+
+
+class ADXL345Registers(RegisterMap):
+    '''
+        Registers of an ADXL345 accelerometer. The acceleration is the
+        value of::
+
+            hal_data['robot'][prefix + 'x']
+
+        (and y, z) in g, and is only reported when the measure bit is set.
+    '''
+
+    kDevId = 0xE5
+
+    kPowerCtlRegister = 0x2D
+    kDataFormatRegister = 0x31
+    kDataRegister = 0x32
+
+    kPowerCtl_Measure = 0x08
+    kDataFormat_FullRes = 0x08
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        super().__init__({
+            0x00: Register(self.kDevId, readonly=True),
+            self.kPowerCtlRegister: 0,
+            self.kDataFormatRegister: 0,
+            self.kDataRegister: Register(lambda: self._raw('x'), size=2, signed=True),
+            self.kDataRegister + 2: Register(lambda: self._raw('y'), size=2, signed=True),
+            self.kDataRegister + 4: Register(lambda: self._raw('z'), size=2, signed=True),
+        }, size=64)
+
+    def _raw(self, axis):
+        if not self.mem[self.kPowerCtlRegister] & self.kPowerCtl_Measure:
+            return 0
+
+        fmt = self.mem[self.kDataFormatRegister]
+        range_bits = fmt & 0x03
+        g = hal_data['robot'].get(self.prefix + axis, 0)
+
+        # full resolution is always 4mg/LSB, otherwise there are 10 bits
+        if fmt & self.kDataFormat_FullRes:
+            return _clamp(g * 256, 10 + range_bits)
+        return _clamp(g * 256 / (1 << range_bits), 10)
+
+
+class ADXL362Registers(RegisterMap):
+    '''
+        Registers of an ADXL362 accelerometer. The acceleration is the
+        value of::
+
+            hal_data['robot'][prefix + 'x']
+
+        (and y, z) in g, and is only reported in measurement mode.
+    '''
+
+    kPartId = 0xF2
+
+    kDataRegister = 0x0E
+    kFilterCtlRegister = 0x2C
+    kPowerCtlRegister = 0x2D
+
+    kPowerCtl_Measure = 0x02
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        super().__init__({
+            0x00: Register(0xAD, readonly=True),
+            0x01: Register(0x1D, readonly=True),
+            0x02: Register(self.kPartId, readonly=True),
+            self.kDataRegister: Register(lambda: self._raw('x'), size=2, signed=True),
+            self.kDataRegister + 2: Register(lambda: self._raw('y'), size=2, signed=True),
+            self.kDataRegister + 4: Register(lambda: self._raw('z'), size=2, signed=True),
+            self.kFilterCtlRegister: 0x13,
+            self.kPowerCtlRegister: 0,
+        }, size=64)
+
+    def _raw(self, axis):
+        if self.mem[self.kPowerCtlRegister] & 0x03 != self.kPowerCtl_Measure:
+            return 0
+
+        # 1mg/LSB at 2g, 2mg/LSB at 4g, 4mg/LSB at 8g
+        mg_per_lsb = 1 << min(self.mem[self.kFilterCtlRegister] >> 6, 2)
+        g = hal_data['robot'].get(self.prefix + axis, 0)
+        return _clamp(g * 1000 / mg_per_lsb, 12)
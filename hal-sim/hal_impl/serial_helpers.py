@@ -1,7 +1,16 @@
 
+import threading
+
 from . import data
 hal_data = data.hal_data
 
+#: Default size of the receive and transmit buffers of :class:`SerialSim`
+kDefaultBufferSize = 4096
+
+# SerialPort.WriteBufferMode
+kFlushOnAccess = 1
+kFlushWhenFull = 2
+
 class SerialSimBase:
     '''
         Base class to use for Serial protocol simulators
@@ -50,6 +59,7 @@ class SerialSimBase:
     
     def getSerialBytesReceived(self, port, status):
         status.value = 0
+        return 0
     
     def readSerial(self, port, buffer, count, status):
         raise NotImplementedError
@@ -66,3 +76,364 @@ class SerialSimBase:
     
     def closeSerial(self, port, status):
         status.value = 0
+
+
+class RingBuffer:
+    '''
+        A bounded FIFO of bytes. The bytes are stored in a bytearray that
+        is allocated once, and are copied in and out using memoryview
+        slices, so no intermediate objects are created.
+    '''
+    
+    __slots__ = ['buf', 'view', 'size', 'start', 'length']
+    
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError("Buffer size must be at least 1")
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.size = size
+        self.start = 0
+        self.length = 0
+    
+    def __len__(self):
+        return self.length
+    
+    def free(self):
+        ''':returns: number of bytes that can be written'''
+        return self.size - self.length
+    
+    def clear(self):
+        self.start = 0
+        self.length = 0
+    
+    def write(self, data):
+        '''
+            Appends as much of data as fits
+            
+            :param data: bytes-like object
+            :returns: number of bytes written
+        '''
+        data = _bytes_view(data)
+        n = min(len(data), self.size - self.length)
+        end = (self.start + self.length) % self.size
+        first = min(n, self.size - end)
+        self.view[end:end + first] = data[:first]
+        if n > first:
+            self.view[:n - first] = data[first:n]
+        self.length += n
+        return n
+    
+    def read_into(self, out):
+        '''
+            Moves bytes from the buffer into a writable buffer
+            
+            :param out: writable bytes-like object, up to ``len(out)``
+                        bytes are read
+            :returns: number of bytes read
+        '''
+        out = _bytes_view(out)
+        n = min(len(out), self.length)
+        first = min(n, self.size - self.start)
+        out[:first] = self.view[self.start:self.start + first]
+        if n > first:
+            out[first:n] = self.view[:n - first]
+        self.discard(n)
+        return n
+    
+    def read(self, count=None):
+        ''':returns: up to count bytes (or everything) from the buffer'''
+        out = bytearray(self.length if count is None else min(count, self.length))
+        self.read_into(out)
+        return bytes(out)
+    
+    def discard(self, count):
+        '''Removes up to count bytes from the buffer'''
+        count = min(count, self.length)
+        self.length -= count
+        self.start = (self.start + count) % self.size if self.length else 0
+    
+    def find(self, byte, limit=None):
+        '''
+            :returns: the position of the first occurrence of byte within
+                      the first limit bytes of the buffer, or -1
+        '''
+        limit = self.length if limit is None else min(limit, self.length)
+        first = min(limit, self.size - self.start)
+        i = self.buf.find(byte, self.start, self.start + first)
+        if i != -1:
+            return i - self.start
+        if limit > first:
+            i = self.buf.find(byte, 0, limit - first)
+            if i != -1:
+                return i + first
+        return -1
+
+
+def _bytes_view(data):
+    view = memoryview(data)
+    if view.format != 'B':
+        view = view.cast('B')
+    return view
+
+
+class SerialSim(SerialSimBase):
+    '''
+        Simulates the serial port of a device, using a receive and a
+        transmit :class:`RingBuffer`. Pass it to :class:`.SerialPort` as
+        the ``simPort``.
+        
+        The simulated device sends data to the robot using :meth:`feed`, or
+        by streaming it from a generator using :meth:`stream`. Data written
+        by the robot is passed to the ``responder`` when it is flushed from
+        the transmit buffer, and the bytes returned by the responder are
+        sent back to the robot. Without a responder, the data is kept in
+        :attr:`written`.
+        
+        Reads behave like the real port: they return when the requested
+        number of bytes, the read buffer size, or the termination character
+        has been received, or when the timeout expires. Time is measured
+        using the current SimHooks, so streams and timeouts work with
+        virtual time.
+        
+        .. note:: Bytes that don't fit in the receive buffer are dropped,
+                  and counted in :attr:`dropped`.
+    '''
+    
+    def __init__(self, responder=None, rx_size=kDefaultBufferSize,
+                       tx_size=kDefaultBufferSize):
+        '''
+            :param responder: Called with the bytes written by the robot,
+                              may return bytes to send back
+            :param rx_size: Size of the receive buffer
+            :param tx_size: Initial size of the transmit buffer, changed
+                            by ``setWriteBufferSize``
+        '''
+        self.responder = responder
+        self.rx = RingBuffer(rx_size)
+        self.tx = RingBuffer(tx_size)
+        self.cond = threading.Condition()
+        
+        #: Data written by the robot, if there is no responder
+        self.written = bytearray()
+        
+        #: Number of received bytes that didn't fit in the receive buffer
+        self.dropped = 0
+        
+        self.timeout = 0.0
+        self.read_buffer_size = 1
+        self.write_mode = kFlushOnAccess
+        self.terminator = None
+        
+        self._stream = None
+        self._stream_time = None
+        self._stream_data = None
+    
+    #
+    # Device side
+    #
+    
+    def feed(self, chunk):
+        '''
+            Sends data to the robot
+            
+            :param chunk: bytes-like object
+            :returns: number of bytes that fit in the receive buffer
+        '''
+        with self.cond:
+            n = self._receive(chunk)
+            data.hooks.notifyCondition(self.cond)
+            return n
+    
+    def stream(self, generator):
+        '''
+            Sends data to the robot over time. The generator yields
+            ``(delay, data)`` tuples, where delay is the number of seconds
+            after the previous chunk (or now, for the first one) that data
+            is received. Replaces any previous stream.
+        '''
+        with self.cond:
+            self._stream = iter(generator)
+            self._stream_time = data.hooks.getTime()
+            self._next_chunk()
+            data.hooks.notifyCondition(self.cond)
+    
+    def _next_chunk(self):
+        try:
+            delay, chunk = next(self._stream)
+        except StopIteration:
+            self._stream = None
+            self._stream_data = None
+        else:
+            self._stream_time += delay
+            self._stream_data = chunk
+    
+    def _pump(self, now):
+        # receives the chunks of the stream that are due
+        while self._stream_data is not None and self._stream_time <= now:
+            self._receive(self._stream_data)
+            self._next_chunk()
+    
+    def _receive(self, chunk):
+        n = self.rx.write(chunk)
+        self.dropped += len(chunk) - n
+        return n
+    
+    def _flush(self):
+        tx = self.tx
+        if not len(tx):
+            return
+        
+        written = tx.read()
+        if self.responder is None:
+            self.written += written
+        else:
+            reply = self.responder(written)
+            if reply:
+                self._receive(reply)
+    
+    #
+    # HAL functions
+    #
+    
+    def setSerialWriteMode(self, port, mode, status):
+        status.value = 0
+        with self.cond:
+            self.write_mode = mode
+    
+    def setSerialTimeout(self, port, timeout, status):
+        status.value = 0
+        self.timeout = timeout
+    
+    def enableSerialTermination(self, port, terminator, status):
+        status.value = 0
+        if isinstance(terminator, (bytes, bytearray)):
+            terminator = terminator[0]
+        self.terminator = terminator
+    
+    def disableSerialTermination(self, port, status):
+        status.value = 0
+        self.terminator = None
+    
+    def setSerialReadBufferSize(self, port, size, status):
+        status.value = 0
+        self.read_buffer_size = max(size, 1)
+    
+    def setSerialWriteBufferSize(self, port, size, status):
+        status.value = 0
+        with self.cond:
+            self._flush()
+            self.tx = RingBuffer(max(size, 1))
+    
+    def getSerialBytesReceived(self, port, status):
+        status.value = 0
+        with self.cond:
+            self._pump(data.hooks.getTime())
+            return len(self.rx)
+    
+    def readSerial(self, port, buffer, count, status):
+        status.value = 0
+        hooks = data.hooks
+        rx = self.rx
+        
+        with self.cond:
+            end = hooks.getTime() + self.timeout
+            
+            while True:
+                now = hooks.getTime()
+                self._pump(now)
+                
+                available = len(rx)
+                n = min(count, available)
+                if self.terminator is not None:
+                    i = rx.find(self.terminator, n)
+                    if i != -1:
+                        n = i + 1
+                        break
+                
+                if n == count or available >= self.read_buffer_size:
+                    break
+                
+                remaining = end - now
+                if remaining <= 0:
+                    break
+                
+                # wake up for the next chunk of the stream
+                if self._stream_data is not None:
+                    remaining = min(remaining, max(self._stream_time - now, 0))
+                
+                hooks.waitForCondition(self.cond, remaining)
+            
+            return rx.read_into(_bytes_view(buffer)[:n])
+    
+    def writeSerial(self, port, buffer, count, status):
+        status.value = 0
+        view = _bytes_view(buffer)[:count]
+        
+        with self.cond:
+            tx = self.tx
+            while view:
+                n = tx.write(view)
+                view = view[n:]
+                if not tx.free():
+                    self._flush()
+            
+            if self.write_mode != kFlushWhenFull:
+                self._flush()
+            
+            data.hooks.notifyCondition(self.cond)
+        
+        return count
+    
+    def flushSerial(self, port, status):
+        status.value = 0
+        with self.cond:
+            self._flush()
+            data.hooks.notifyCondition(self.cond)
+    
+    def clearSerial(self, port, status):
+        status.value = 0
+        with self.cond:
+            self.rx.clear()
+            self.tx.clear()
+
+
+class ScriptedResponder:
+    '''
+        A :class:`SerialSim` responder that replies to requests from a
+        script. Each time the robot has written the next expected request,
+        the matching reply is sent::
+        
+            sim = SerialSim(ScriptedResponder([
+                (b'ID?\\n', b'LIDAR-1\\n'),
+                (b'START\\n', b'OK\\n'),
+            ]))
+    '''
+    
+    def __init__(self, script, repeat=False):
+        '''
+            :param script: sequence of (request, reply) bytes
+            :param repeat: If True, start the script over when it ends
+        '''
+        self.script = list(script)
+        self.repeat = repeat
+        self.step = 0
+        self.pending = bytearray()
+    
+    def __call__(self, written):
+        self.pending += written
+        reply = bytearray()
+        
+        while self.step < len(self.script):
+            request, response = self.script[self.step]
+            i = self.pending.find(request)
+            if i == -1:
+                break
+            
+            del self.pending[:i + len(request)]
+            reply += response
+            self.step += 1
+            if self.step == len(self.script) and self.repeat:
+                self.step = 0
+        
+        return bytes(reply)
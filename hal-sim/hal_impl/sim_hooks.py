@@ -1,9 +1,14 @@
 
+import heapq
+import itertools
 import threading
 import time
 
 from .data import hal_data
 
+import logging
+logger = logging.getLogger('hal.sim_hooks')
+
 class SimHooks:
     '''
         These are useful hooks to override for simulations.
@@ -11,6 +16,12 @@ class SimHooks:
         To use your own hook, set hal_impl.functions.hooks
     '''
     
+    #: True if time only passes when the robot code waits in these hooks,
+    #: so that waiting doesn't take any real time. Code that would
+    #: otherwise skip long waits in simulation (such as gyro calibration)
+    #: checks this.
+    virtualTime = False
+    
     def __init__(self):
         self.initialized = False
         self.reset()
@@ -31,6 +42,51 @@ class SimHooks:
     def delaySeconds(self, s):
         time.sleep(s)
     
+    def waitForCondition(self, cond, timeout=None):
+        '''
+            Used by simulated HAL components that need to wait on a
+            condition variable, which must be held by the caller. If you
+            override getTime, you probably want to override this too, so
+            that timeout is measured in your time.
+            
+            :param timeout: Seconds to wait, or None to wait until notified
+        '''
+        return cond.wait(timeout)
+    
+    def notifyCondition(self, cond):
+        '''
+            Used by simulated HAL components to wake up anything waiting
+            on a condition variable via :meth:`waitForCondition`. The
+            condition must be held by the caller.
+        '''
+        cond.notify_all()
+    
+    def registerThread(self, thread=None):
+        '''
+            Called before a thread that uses the hooks is started (or by the
+            thread itself), so that simulations that control time know to
+            wait for it.
+            
+            :param thread: Defaults to the current thread
+        '''
+        pass
+    
+    def unregisterThread(self, thread=None):
+        '''
+            Called when a thread stops using the hooks
+            
+            :param thread: Defaults to the current thread
+            :returns: True if the thread was registered
+        '''
+        return False
+    
+    def joinThread(self, thread, timeout=None):
+        '''
+            Waits for a thread to exit. Use this instead of ``thread.join``
+            when the thread may be waiting on the hooks.
+        '''
+        thread.join(timeout)
+    
     #
     # DriverStation related hooks
     #
@@ -53,15 +109,29 @@ class SimHooks:
         return True
     
     def notifyDSData(self):
-        with self.ds_cond:
+        ds_cond = self.ds_cond
+        with ds_cond:
             self.ds_packets += 1
-            self.ds_cond.notify_all()
+            self.notifyCondition(ds_cond)
     
     def waitForDSData(self, timeout=None):
-        with self.ds_cond:
+        # reset() replaces ds_cond, so hold onto the one we're waiting on
+        ds_cond = self.ds_cond
+        with ds_cond:
             current_count = self.ds_packets
-            return self.ds_cond.wait_for(lambda: current_count != self.ds_packets,
-                                         timeout=timeout)
+            if timeout is not None:
+                end = self.getTime() + timeout
+            
+            while current_count == self.ds_packets:
+                remaining = None
+                if timeout is not None:
+                    remaining = end - self.getTime()
+                    if remaining <= 0:
+                        return False
+                
+                self.waitForCondition(ds_cond, remaining)
+            
+            return True
     
     #
     # Resets this class so it can be reused
@@ -75,3 +145,223 @@ class SimHooks:
         self.ds_cond = None
         self.ds_packets = None
         self.local = None
+
+
+class _Sleeper:
+    __slots__ = ['thread', 'wake_time', 'cond', 'woken', 'timed_out']
+    
+    def __init__(self, thread, wake_time, cond):
+        self.thread = thread
+        self.wake_time = wake_time
+        self.cond = cond
+        self.woken = False
+        self.timed_out = False
+
+
+class VirtualTimeSimHooks(SimHooks):
+    '''
+        Hooks that use a virtual clock instead of the system clock, so a
+        simulation can run as fast as the CPU allows and produce the same
+        results every time.
+        
+        Time only moves forward once every registered thread is blocked in
+        :meth:`delaySeconds`, :meth:`waitForCondition` or
+        :meth:`waitForDSData` (or has exited). The clock then jumps to the
+        earliest wakeup time, and that one sleeper is woken. Sleepers are
+        woken one at a time in timestamp order (ties are broken by the
+        order in which they went to sleep).
+        
+        The thread that creates the hooks is registered. Other threads are
+        registered when they first block in the hooks, or explicitly with
+        :meth:`registerThread`. Code that starts a thread
+        that uses the hooks should register it before starting it,
+        otherwise time may move forward before the thread gets to its
+        first wait. Threads stay registered until they exit or call
+        :meth:`unregisterThread`. Threads that are not registered never
+        hold back time.
+        
+        To use::
+        
+            hal_impl.functions.hooks = VirtualTimeSimHooks()
+            hal_impl.functions.reset_hal()
+        
+        .. warning:: A registered thread that blocks on something other
+                     than these hooks (for example, ``Thread.join``) stops
+                     time. Use :meth:`joinThread`, or unregister the thread
+                     before blocking. If time has been stopped for
+                     ``stall_timeout`` (real) seconds, a warning is logged,
+                     but time still doesn't move.
+    '''
+    
+    virtualTime = True
+    
+    def __init__(self, start_time=0.0, stall_timeout=5.0, poll_interval=0.005):
+        
+        self._time = start_time
+        self._lock = threading.Lock()
+        self._heap = []
+        self._seq = itertools.count()
+        
+        # registered threads -> _Sleeper if blocked, None if running
+        self._threads = {threading.current_thread(): None}
+        self._stall_start = None
+        
+        self.stall_timeout = stall_timeout
+        self.poll_interval = poll_interval
+        
+        super().__init__()
+    
+    def getTime(self):
+        return self._time
+    
+    def delayMillis(self, ms):
+        self.delaySeconds(.001*ms)
+    
+    def delaySeconds(self, s):
+        if s <= 0:
+            return
+        
+        cond = threading.Condition(threading.Lock())
+        end = self._time + s
+        with cond:
+            while self._time < end:
+                self._block(cond, end - self._time)
+    
+    def waitForCondition(self, cond, timeout=None):
+        return self._block(cond, timeout)
+    
+    def notifyCondition(self, cond):
+        with self._lock:
+            for sleeper in self._threads.values():
+                if sleeper is not None and sleeper.cond is cond:
+                    self._unblock(sleeper)
+        
+        cond.notify_all()
+    
+    def registerThread(self, thread=None):
+        if thread is None:
+            thread = threading.current_thread()
+        
+        with self._lock:
+            self._threads.setdefault(thread, None)
+    
+    def unregisterThread(self, thread=None):
+        if thread is None:
+            thread = threading.current_thread()
+        
+        with self._lock:
+            registered = thread in self._threads
+            self._threads.pop(thread, None)
+            woken = self._advance()
+        
+        self._wake(woken)
+        return registered
+    
+    def joinThread(self, thread, timeout=None):
+        # time needs to move while this thread waits
+        registered = self.unregisterThread()
+        try:
+            thread.join(timeout)
+        finally:
+            if registered:
+                self.registerThread()
+    
+    #
+    # Internal functions
+    #
+    
+    def _block(self, cond, timeout):
+        '''Blocks the current thread, cond must be held'''
+        
+        thread = threading.current_thread()
+        wake_time = None if timeout is None else self._time + timeout
+        sleeper = _Sleeper(thread, wake_time, cond)
+        
+        with self._lock:
+            self._threads[thread] = sleeper
+            if wake_time is not None:
+                heapq.heappush(self._heap, (wake_time, next(self._seq), sleeper))
+            
+            woken = self._advance()
+        
+        self._wake(woken)
+        
+        # The poll only notices threads that have exited, whether time
+        # moves never depends on how long this takes
+        while not sleeper.woken:
+            notified = cond.wait(self.poll_interval)
+            
+            with self._lock:
+                if sleeper.woken:
+                    break
+                
+                if notified:
+                    # woken by something that doesn't use notifyCondition
+                    self._unblock(sleeper)
+                    break
+                
+                woken = self._advance()
+            
+            self._wake(woken)
+        
+        return not sleeper.timed_out
+    
+    def _unblock(self, sleeper):
+        '''Must be called with _lock held'''
+        sleeper.woken = True
+        if self._threads.get(sleeper.thread) is sleeper:
+            self._threads[sleeper.thread] = None
+    
+    def _advance(self):
+        '''
+            If every registered thread is blocked, moves time forward to the
+            next sleeper and returns it. Must be called with _lock held.
+        '''
+        
+        for thread, sleeper in list(self._threads.items()):
+            if thread.ident is not None and not thread.is_alive():
+                del self._threads[thread]
+            elif sleeper is None:
+                # registered threads that haven't started yet count as
+                # running too
+                self._stalled(thread)
+                return
+        
+        self._stall_start = None
+        
+        heap = self._heap
+        while heap:
+            wake_time, _, sleeper = heapq.heappop(heap)
+            if sleeper.woken:
+                continue
+            
+            if wake_time > self._time:
+                self._time = wake_time
+            
+            sleeper.timed_out = True
+            self._unblock(sleeper)
+            return sleeper
+    
+    def _stalled(self, thread):
+        # only used for a diagnostic, never to decide whether to move time
+        now = time.monotonic()
+        if self._stall_start is None:
+            self._stall_start = now
+        elif self.stall_timeout is not None and now - self._stall_start > self.stall_timeout:
+            logger.warning("Virtual time has been stopped for %ss waiting for %s, "
+                           "is it blocked outside of the sim hooks?",
+                           self.stall_timeout, thread.name)
+            self._stall_start = now
+    
+    def _wake(self, sleeper):
+        if sleeper is None or sleeper.thread is threading.current_thread():
+            return
+        
+        # If the condition is busy, its owner is either about to wait on it
+        # or will check the woken flag before it does
+        cond = sleeper.cond
+        if cond.acquire(blocking=False):
+            try:
+                cond.notify_all()
+            finally:
+                cond.release()
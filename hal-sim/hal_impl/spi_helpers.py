@@ -1,5 +1,8 @@
 
+import ctypes
+
 from . import data
+from .register_map import buffer_view, ADXL345Registers, ADXL362Registers
 hal_data = data.hal_data
 
 class SPISimBase:
@@ -8,7 +11,13 @@ class SPISimBase:
         
         Has all functions that need to be implemented, but throws exceptions
         when data is asked of it. Will throw away set* function data, as most
-        low-fidelity simulation will probably not care about such things. 
+        low-fidelity simulation will probably not care about such things. If
+        the subclass implements ``transactionSPI``, the accumulator is
+        simulated by :class:`SPIAccumulator`, otherwise the accumulator
+        functions behave like the other functions.
+        
+        Devices that are a set of registers should use
+        :class:`SPIRegisterSim` instead.
     '''
     
     def initializeSPI(self, port, status):
@@ -61,74 +70,407 @@ class SPISimBase:
     def initSPIAccumulator(self, port,
                            period, cmd, xfer_size, valid_mask, valid_value,
                            data_shift, data_size, is_signed, big_endian, status):
-        pass
+        # The accumulator needs transactionSPI to talk to the device
+        if type(self).transactionSPI is SPISimBase.transactionSPI:
+            self.accumulator = None
+            return
+        
+        self.accumulator = SPIAccumulator(self, port, period, cmd, xfer_size,
+                                          valid_mask, valid_value, data_shift,
+                                          data_size, is_signed, big_endian)
         
     def freeSPIAccumulator(self, port, status):
-        pass
+        self.accumulator = None
         
     def resetSPIAccumulator(self, port, status):
-        pass
+        accumulator = self._updateAccumulator()
+        if accumulator is not None:
+            accumulator.reset()
     
     def setSPIAccumulatorCenter(self, port, center, status):
-        pass
+        accumulator = self._updateAccumulator()
+        if accumulator is not None:
+            accumulator.center = center
         
     def setSPIAccumulatorDeadband(self, port, deadband, status):
-        pass
+        accumulator = self._updateAccumulator()
+        if accumulator is not None:
+            accumulator.deadband = deadband
         
     def getSPIAccumulatorLastValue(self, port, status):
         ''':returns: int32'''
-        raise NotImplementedError
+        return self._getAccumulator().last_value
         
     def getSPIAccumulatorValue(self, port, status):
         ''':returns: int64'''
-        raise NotImplementedError
+        return self._getAccumulator().value
         
     def getSPIAccumulatorCount(self, port, status):
         ''':returns: int32'''
-        raise NotImplementedError
+        return self._getAccumulator().count
     
     def getSPIAccumulatorAverage(self, port, status):
         ''':returns: float'''
-        raise NotImplementedError
+        accumulator = self._getAccumulator()
+        if accumulator.count == 0:
+            return 0.0
+        return accumulator.value / accumulator.count
         
     def getSPIAccumulatorOutput(self, port, status):
         ''':returns: value(int64), count(int32)'''
-        raise NotImplementedError
+        accumulator = self._getAccumulator()
+        return accumulator.value, accumulator.count
+    
+    def accumulatorBatch(self, port, count, period):
+        '''
+            Called by the :class:`SPIAccumulator` whenever it is updated,
+            before it does count transfers (which may be 0), one every
+            period seconds, ending at the current time
+        '''
+        pass
+    
+    def _updateAccumulator(self):
+        accumulator = getattr(self, 'accumulator', None)
+        if accumulator is not None:
+            accumulator.update()
+        return accumulator
+    
+    def _getAccumulator(self):
+        accumulator = self._updateAccumulator()
+        if accumulator is None:
+            raise NotImplementedError
+        return accumulator
+
+
+class SPIAccumulator:
+    '''
+        Simulates the SPI accumulator of the roboRIO. Every period, it
+        sends the configured command to the simulated device using
+        ``transactionSPI``, and accumulates the data field of the valid
+        responses in the same way as the HAL does.
+        
+        The transfers aren't done by a timer. Instead, all of the transfers
+        that would have happened since the last update are done at once,
+        whenever the robot code uses the accumulator.
+    '''
+    
+    def __init__(self, sim, port, period, cmd, xfer_size,
+                       valid_mask, valid_value, data_shift, data_size,
+                       is_signed, big_endian):
+        '''
+            :param sim: The :class:`SPISimBase` of the device
+            :param period: Time between transfers, in microseconds
+            
+            The rest of the parameters are the same as
+            :meth:`.SPI.initAccumulator`
+        '''
+        self.sim = sim
+        self.port = port
+        self.period = max(int(period), 1)
+        self.xfer_size = xfer_size
+        self.valid_mask = valid_mask & 0xffffffff
+        self.valid_value = valid_value & 0xffffffff
+        self.data_shift = data_shift
+        self.data_max = 1 << data_size
+        self.data_msb_mask = 1 << (data_size - 1)
+        self.is_signed = is_signed
+        self.byteorder = 'big' if big_endian else 'little'
+        
+        self.cmd = (ctypes.c_uint8 * xfer_size)(
+            *(cmd & ((1 << (8*xfer_size)) - 1)).to_bytes(xfer_size, self.byteorder))
+        self.response = (ctypes.c_uint8 * xfer_size)()
+        
+        self.center = 0
+        self.deadband = 0
+        self.reset()
+        
+        # FPGA time of the next transfer
+        self.trigger_time = data.hooks.getFPGATime() + self.period
+    
+    def reset(self):
+        self.value = 0
+        self.count = 0
+        self.last_value = 0
+    
+    def update(self, now=None):
+        '''
+            Does the transfers that happened up to now
+            
+            :param now: FPGA time (in microseconds), defaults to
+                        ``hooks.getFPGATime()``
+            :returns: the number of transfers
+        '''
+        if now is None:
+            now = data.hooks.getFPGATime()
+        
+        if now < self.trigger_time:
+            n = 0
+        else:
+            n = (now - self.trigger_time) // self.period + 1
+            self.trigger_time += n * self.period
+        
+        sim = self.sim
+        port = self.port
         
+        sim.accumulatorBatch(port, n, self.period / 1000000.0)
+        if n == 0:
+            return 0
+        
+        cmd = self.cmd
+        response = self.response
+        xfer_size = self.xfer_size
+        byteorder = self.byteorder
+        valid_mask = self.valid_mask
+        valid_value = self.valid_value
+        data_shift = self.data_shift
+        data_mask = self.data_max - 1
+        sign = self.data_max if self.is_signed else 0
+        msb = self.data_msb_mask
+        center = self.center
+        deadband = self.deadband
+        
+        value = self.value
+        count = self.count
+        last_value = self.last_value
+        
+        for _ in range(n):
+            sim.transactionSPI(port, cmd, response, xfer_size)
+            resp = int.from_bytes(response, byteorder)
+            
+            if resp & valid_mask != valid_value:
+                last_value = 0
+                continue
+            
+            v = (resp >> data_shift) & data_mask
+            if v & msb:
+                v -= sign
+            v -= center
+            
+            if v < -deadband or v > deadband:
+                value += v
+            count += 1
+            last_value = v
+        
+        self.value = value
+        self.count = count
+        self.last_value = last_value
+        return n
 
 
 class ADXRS450_Gyro_Sim(SPISimBase):
     '''
-        This returns the angle of the gyro as the value of::
+        Simulates the SPI protocol of an ADXRS450 gyro, so that its data
+        goes through the simulated SPI accumulator. The rate of the gyro
+        (in degrees per second) is the value of::
             
-            hal_data['robot']['adxrs450_spi_%d_angle']
+            hal_data['robot']['adxrs450_spi_%d_rate']
+        
+        Where %d is the SPI port number. Alternatively, you can set the angle
+        (in degrees) of the gyro in::
             
-        Where %d is the i2c port number. Angle should be in degrees.
+            hal_data['robot']['adxrs450_spi_%d_angle']
+        
+        Changes to the angle are added straight to the accumulator the next
+        time it is used, so they are seen right away and aren't limited by
+        the range of the sensor. Only the rate is quantized and clipped like
+        the real sensor.
     '''
     
+    kPartId = 0x5200
+    
+    kSensorData = 0x20000000
+    kRead = 0x80000000
+    
+    # response fields
+    kStatusValid = 0x04000000
+    kReadResponse = 0x40000000
+    
     def __init__(self, gyro):
         self.kDegreePerSecondPerLSB = gyro.kDegreePerSecondPerLSB
         self.kSamplePeriod = gyro.kSamplePeriod
+        self.kRateRegister = gyro.kRateRegister
+        self.kPIDRegister = gyro.kPIDRegister
+        
+        self._response = 0
+        self._angle = 0
+        self._angle_residual = 0
+        self._residual = 0
     
     def initializeSPI(self, port, status):
+        super().initializeSPI(port, status)
         self.angle_key = 'adxrs450_spi_%d_angle' % port
         self.rate_key = 'adxrs450_spi_%d_rate' % port
+        self._angle = hal_data['robot'].get(self.angle_key, 0)
+    
+    def accumulatorBatch(self, port, count, period):
+        angle = hal_data['robot'].get(self.angle_key, 0)
+        if angle == self._angle:
+            return
         
-        print(self.angle_key)
+        # the accumulator holds integers, the rounding error is carried to
+        # the next change
+        exact = (angle - self._angle) / (self.kDegreePerSecondPerLSB * self.kSamplePeriod) + \
+                self._angle_residual
+        delta = int(round(exact))
+        self._angle_residual = exact - delta
+        self._angle = angle
+        self.accumulator.value += delta
     
-    def getSPIAccumulatorAverage(self, port, status):
+    def _rate(self):
+        # quantized, the rounding error is carried to the next sample
+        rate = hal_data['robot'].get(self.rate_key, 0)
+        exact = rate / self.kDegreePerSecondPerLSB + self._residual
+        lsb = int(round(exact))
+        if -0x8000 <= lsb <= 0x7fff:
+            self._residual = exact - lsb
+        else:
+            # saturated
+            lsb = min(max(lsb, -0x8000), 0x7fff)
+            self._residual = 0
+        return lsb & 0xffff
+    
+    def _register(self, reg):
+        if reg == self.kPIDRegister:
+            return self.kPartId
+        elif reg == self.kRateRegister:
+            return self._rate()
         return 0
     
-    def getSPIAccumulatorValue(self, port, status):
-        return int(hal_data['robot'].get(self.angle_key, 0) / (self.kDegreePerSecondPerLSB * self.kSamplePeriod))
+    def _command(self, cmd):
+        # returns the response to a command, with odd parity
+        if cmd & self.kRead:
+            resp = self.kReadResponse | (self._register((cmd >> 17) & 0xff) << 5)
+        elif cmd & self.kSensorData:
+            resp = self.kStatusValid | (self._rate() << 10)
+        else:
+            resp = 0
+        
+        if not bin(resp).count('1') & 1:
+            resp |= 1
+        return resp
     
-    def getSPIAccumulatorLastValue(self, port, status):
-        return int(hal_data['robot'].get(self.rate_key, 0) / self.kDegreePerSecondPerLSB)
+    def transactionSPI(self, port, dataToSend, dataReceived, size):
+        cmd = int.from_bytes(buffer_view(dataToSend)[:size], 'big')
+        resp = self._command(cmd << (8*(4 - size)))
+        buffer_view(dataReceived)[:size] = (resp >> (8*(4 - size))).to_bytes(size, 'big')
+        return size
     
-    # for calibrate
-    def writeSPI(self, port, data_to_send, send_size):
-        return send_size
+    def writeSPI(self, port, dataToSend, sendSize):
+        # the response is read using readSPI
+        cmd = int.from_bytes(buffer_view(dataToSend)[:sendSize], 'big')
+        self._response = self._command(cmd << (8*(4 - sendSize)))
+        return sendSize
     
     def readSPI(self, port, buffer, count):
-        buffer[:] = (0xff000000 | (0x5200 << 5)).to_bytes(4, 'big')
+        buffer_view(buffer)[:count] = self._response.to_bytes(4, 'big')[:count]
         return count
+
+
+class SPIRegisterSim(SPISimBase):
+    '''
+        Simulates an SPI device that is a :class:`.RegisterMap`. Each
+        transfer starts with ``header_size`` bytes that select the register
+        and whether it is read or written, subclasses implement
+        :meth:`decode` for the protocol of the device. The device sends
+        zeros while the header is being sent.
+    '''
+    
+    #: Number of bytes at the start of a transfer that select the register
+    header_size = 1
+    
+    def __init__(self, registers):
+        self.registers = registers
+        self.address = 0
+        self.increment = True
+    
+    def decode(self, header):
+        '''
+            :param header: The first ``header_size`` bytes of a transfer
+            :returns: (read, address, increment), or None to ignore the
+                      transfer
+        '''
+        raise NotImplementedError
+    
+    def transactionSPI(self, port, dataToSend, dataReceived, size):
+        send = buffer_view(dataToSend)
+        recv = buffer_view(dataReceived)
+        n = min(self.header_size, size)
+        recv[:size] = bytes(size)
+        
+        cmd = self.decode(send[:n]) if n == self.header_size else None
+        if cmd is not None:
+            read, self.address, self.increment = cmd
+            if read:
+                recv[n:size] = self.registers.read(self.address, size - n, self.increment)
+            else:
+                self.registers.write(self.address, send[n:size])
+            if self.increment:
+                self.address = (self.address + size - n) % self.registers.size
+        
+        return size
+    
+    def writeSPI(self, port, dataToSend, sendSize):
+        return self.transactionSPI(port, dataToSend, bytearray(sendSize), sendSize)
+    
+    def readSPI(self, port, buffer, count):
+        '''Continues reading from where the last transfer stopped'''
+        buffer_view(buffer)[:count] = self.registers.read(self.address, count, self.increment)
+        if self.increment:
+            self.address = (self.address + count) % self.registers.size
+        return count
+
+
+class ADXL345_SPI_Sim(SPIRegisterSim):
+    '''
+        Simulates an ADXL345 on the SPI bus. The acceleration in g is the
+        value of::
+        
+            hal_data['robot']['adxl345_spi_%d_x']
+        
+        (and y, z), where %d is the SPI port number.
+    '''
+    
+    def __init__(self, accel):
+        super().__init__(None)
+        self.kAddress_Read = accel.kAddress_Read
+        self.kAddress_MultiByte = accel.kAddress_MultiByte
+    
+    def initializeSPI(self, port, status):
+        super().initializeSPI(port, status)
+        self.registers = ADXL345Registers('adxl345_spi_%d_' % port)
+    
+    def decode(self, header):
+        cmd = header[0]
+        return (bool(cmd & self.kAddress_Read), cmd & 0x3F,
+                bool(cmd & self.kAddress_MultiByte))
+
+
+class ADXL362_Sim(SPIRegisterSim):
+    '''
+        Simulates an ADXL362 on the SPI bus. The acceleration in g is the
+        value of::
+        
+            hal_data['robot']['adxl362_spi_%d_x']
+        
+        (and y, z), where %d is the SPI port number.
+    '''
+    
+    header_size = 2
+    
+    def __init__(self, accel):
+        super().__init__(None)
+        self.kRegRead = accel.kRegRead
+        self.kRegWrite = accel.kRegWrite
+    
+    def initializeSPI(self, port, status):
+        super().initializeSPI(port, status)
+        self.registers = ADXL362Registers('adxl362_spi_%d_' % port)
+    
+    def decode(self, header):
+        cmd, address = header[0], header[1]
+        if cmd == self.kRegRead:
+            return True, address, True
+        elif cmd == self.kRegWrite:
+            return False, address, True
+        # FIFO reads aren't simulated
+        return None
@@ -204,10 +204,20 @@ class GyroHandle(Handle):
         return "<%s at 0x%x pin=%s>" % (type(self).__qualname__, id(self), self.pin)
 
 class InterruptHandle(Handle):
-    pass
+    __slots__ = ['idx']
+    def __init__(self, idx):
+        self.idx = idx
+    
+    def __repr__(self):
+        return "<%s at 0x%x idx=%s>" % (type(self).__qualname__, id(self), self.idx)
 
 class NotifierHandle(Handle):
-    pass
+    __slots__ = ['idx']
+    def __init__(self, idx):
+        self.idx = idx
+    
+    def __repr__(self):
+        return "<%s at 0x%x idx=%s>" % (type(self).__qualname__, id(self), self.idx)
 
 class RelayHandle(Handle):
     __slots__ = ['pin']
@@ -3,7 +3,27 @@ import pytest
 from unittest.mock import MagicMock, patch
 import hal
 import hal_impl
-from hal_impl.sim_hooks import SimHooks as BaseSimHooks
+from hal_impl.sim_hooks import SimHooks as BaseSimHooks, VirtualTimeSimHooks
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', default=False,
+                     help='run the tests marked as benchmarks')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers',
+                            'benchmark: measures performance, only runs with --benchmark')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    
+    skip = pytest.mark.skip(reason='benchmark, use --benchmark to run')
+    for item in items:
+        if item.get_closest_marker('benchmark') is not None:
+            item.add_marker(skip)
 
 
 @pytest.fixture(scope="function")
@@ -121,3 +141,10 @@ def sim_hooks():
     with patch('hal_impl.functions.hooks', new=SimHooks()) as hooks:
         hal_impl.functions.reset_hal()
         yield hooks
+
+
+@pytest.fixture(scope='function')
+def virtual_hooks(wpilib):
+    with patch('hal_impl.functions.hooks', new=VirtualTimeSimHooks()) as hooks:
+        hal_impl.functions.reset_hal()
+        yield hooks
@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+@pytest.fixture(scope='function')
+def command(wpilib):
+    import wpilib.buttons
+    import wpilib.command
+    return wpilib.command
+
+
+@pytest.fixture(scope='function')
+def stick(wpilib, hal_data):
+    ds = wpilib.DriverStation.getInstance()
+    joystick = wpilib.Joystick(1)
+    buttons = hal_data['joysticks'][1]['buttons']
+    
+    def _set(button, value):
+        buttons[button] = value
+        ds._getData()
+    
+    ds._getData()
+    return joystick, _set
+
+
+def test_whenPressed(wpilib, stick, command):
+    joystick, setButton = stick
+    cmd = MagicMock()
+    
+    button = wpilib.buttons.JoystickButton(joystick, 2)
+    button.whenPressed(cmd)
+    
+    scheduler = command.Scheduler.getInstance()
+    scheduler.run()
+    assert not cmd.start.called
+    
+    setButton(2, True)
+    scheduler.run()
+    scheduler.run()
+    assert cmd.start.call_count == 1
+    
+    setButton(2, False)
+    scheduler.run()
+    setButton(2, True)
+    scheduler.run()
+    assert cmd.start.call_count == 2
+
+
+def test_whileHeld(wpilib, stick, command):
+    joystick, setButton = stick
+    cmd = MagicMock()
+    
+    button = wpilib.buttons.JoystickButton(joystick, 3)
+    button.whileHeld(cmd)
+    
+    scheduler = command.Scheduler.getInstance()
+    setButton(3, True)
+    scheduler.run()
+    scheduler.run()
+    assert cmd.start.call_count == 2
+    
+    setButton(3, False)
+    scheduler.run()
+    scheduler.run()
+    assert cmd.start.call_count == 2
+    assert cmd.cancel.call_count == 1
+
+
+def test_buttons_polled_once(wpilib, stick, command):
+    joystick, setButton = stick
+    cmds = [MagicMock() for _ in range(10)]
+    
+    for i, cmd in enumerate(cmds):
+        wpilib.buttons.JoystickButton(joystick, i + 1).whenPressed(cmd)
+    
+    scheduler = command.Scheduler.getInstance()
+    ds = wpilib.DriverStation.getInstance()
+    
+    with patch.object(ds, 'getStickButtons', wraps=ds.getStickButtons) as getStickButtons, \
+         patch.object(ds, 'getStickButton', wraps=ds.getStickButton) as getStickButton:
+        
+        # nothing changed, nothing read
+        scheduler.run()
+        assert getStickButtons.call_count == 0
+        assert getStickButton.call_count == 0
+        
+        setButton(5, True)
+        scheduler.run()
+        assert getStickButtons.call_count == 1
+        assert getStickButton.call_count == 1
+    
+    assert [c.start.call_count for c in cmds] == [0, 0, 0, 0, 1, 0, 0, 0, 0, 0]
+
+
+def test_custom_trigger_polled(wpilib, command):
+    cmd = MagicMock()
+    
+    class MyTrigger(wpilib.buttons.Trigger):
+        value = False
+        def get(self):
+            return self.value
+    
+    trigger = MyTrigger()
+    trigger.whenActive(cmd)
+    
+    scheduler = command.Scheduler.getInstance()
+    trigger.value = True
+    scheduler.run()
+    assert cmd.start.call_count == 1
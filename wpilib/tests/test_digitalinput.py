@@ -1,3 +1,4 @@
+import threading
 import pytest
 import hal
 
@@ -65,3 +66,59 @@ def test_digitalinput_initTable(digitalinput, di_table, di_data):
     digitalinput.initTable(di_table)
 
     assert di_table.getBoolean('Value', False) == True
+
+
+def test_digitalinput_waitForInterrupt(digitalinput, di_data):
+    digitalinput.requestInterrupts()
+    digitalinput.setUpSourceEdge(True, True)
+    
+    # times out when nothing happens
+    assert digitalinput.waitForInterrupt(0.01) == 0
+    
+    t = threading.Timer(0.01, di_data.__setitem__, ('value', True))
+    t.start()
+    assert digitalinput.waitForInterrupt(1) == 0x1
+    t.join()
+    
+    t = threading.Timer(0.01, di_data.__setitem__, ('value', False))
+    t.start()
+    assert digitalinput.waitForInterrupt(1) == 0x100
+    t.join()
+    
+    assert digitalinput.readRisingTimestamp() > 0
+    assert digitalinput.readFallingTimestamp() >= digitalinput.readRisingTimestamp()
+    
+    digitalinput.cancelInterrupts()
+    assert digitalinput.interrupt is None
+
+
+def test_digitalinput_waitForInterrupt_previous(digitalinput, di_data):
+    digitalinput.requestInterrupts()
+    di_data['value'] = True
+    
+    assert digitalinput.waitForInterrupt(0.01, ignorePrevious=False) == 0x1
+    assert digitalinput.waitForInterrupt(0.01, ignorePrevious=False) == 0
+
+
+def test_digitalinput_interruptHandler(digitalinput, di_data):
+    called = threading.Event()
+    masks = []
+    
+    def _handler(mask):
+        masks.append(mask)
+        called.set()
+    
+    digitalinput.requestInterrupts(_handler)
+    
+    # disabled until enableInterrupts is called
+    di_data['value'] = True
+    di_data['value'] = False
+    
+    digitalinput.enableInterrupts()
+    di_data['value'] = True
+    
+    assert called.wait(1)
+    assert masks == [1 << digitalinput.interrupt.idx]
+    
+    with pytest.raises(ValueError):
+        digitalinput.requestInterrupts(_handler)
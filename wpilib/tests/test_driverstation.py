@@ -89,6 +89,73 @@ def test_getData(dsmock, halmock):
     dsmock._getData()
     # TODO: check joystick values
 
+def test_getStickGeneration(ds, hal_data):
+    ds._getData()
+    gen = ds.getStickGeneration(0)
+    other = ds.getStickGeneration(1)
+
+    # nothing changed
+    ds._getData()
+    assert ds.getStickGeneration(0) == gen
+
+    hal_data['joysticks'][0]['buttons'][2] = True
+    ds._getData()
+    assert ds.getStickGeneration(0) == gen + 1
+    assert ds.getStickButton(0, 2) == True
+
+    hal_data['joysticks'][0]['axes'][1] = 0.5
+    ds._getData()
+    assert ds.getStickGeneration(0) == gen + 2
+    assert ds.getStickAxis(0, 1) == 0.5
+
+    assert ds.getStickGeneration(1) == other
+
+    with pytest.raises(IndexError):
+        ds.getStickGeneration(ds.kJoystickPorts)
+
+def test_getData_unplugged(ds, hal_data):
+    stick = hal_data['joysticks'][3]
+    stick['axes'] = []
+    stick['povs'] = []
+    stick['buttons'] = [None]
+    ds._getData()
+    assert not ds.joystickConnected[3]
+    gen = ds.getStickGeneration(3)
+
+    # still unplugged
+    ds._getData()
+    assert not ds.joystickConnected[3]
+    assert ds.getStickGeneration(3) == gen
+
+    # plugging it back in is noticed on the next packet
+    stick['axes'] = [0.0]*4
+    stick['buttons'] = [None, False, False]
+    ds._getData()
+    assert ds.joystickConnected[3]
+    assert ds.getStickGeneration(3) == gen + 1
+    assert ds.getStickAxisCount(3) == 4
+
+    # .. even if it only has buttons
+    stick['axes'] = []
+    stick['buttons'] = [None]
+    ds._getData()
+    assert not ds.joystickConnected[3]
+
+    stick['buttons'] = [None, True]
+    ds._getData()
+    assert ds.joystickConnected[3]
+    assert ds.getStickButton(3, 1) == True
+
+    # .. or only POVs
+    stick['buttons'] = [None]
+    ds._getData()
+    assert not ds.joystickConnected[3]
+
+    stick['povs'] = [90]
+    ds._getData()
+    assert ds.joystickConnected[3]
+    assert ds.getStickPOV(3, 0) == 90
+
 def test_getBatteryVoltage(dsmock, halmock):
     assert dsmock.getBatteryVoltage() == halmock.getVinVoltage.return_value
 
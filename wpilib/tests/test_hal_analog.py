@@ -0,0 +1,135 @@
+import pytest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+pytestmark = pytest.mark.skipif(np is None, reason="requires numpy")
+
+
+@pytest.fixture(scope='function')
+def engine(hal_data):
+    from hal_impl.analog import AnalogEngine
+    return AnalogEngine()
+
+
+def test_analog_engine_average(wpilib, hal_data, engine):
+    hal_data['analog_sample_rate'] = 1000.0
+    engine.set_signal(1, 1.0)
+
+    ai = wpilib.AnalogInput(1)
+    ai.setOversampleBits(2)
+    ai.setAverageBits(2)
+
+    raw = round(1.0 / 1220703e-9)
+
+    # a sample every ms, including one at the start
+    assert engine.update(now=1000000) == 1
+    assert engine.update(now=1014999) == 14
+    assert ai.getValue() == raw
+    assert ai.getVoltage() == pytest.approx(1.0, abs=0.001)
+    assert ai.getAverageValue() == 0
+
+    # 16 samples: the oversample bits are kept, the average bits aren't
+    assert engine.update(now=1015000) == 1
+    assert ai.getAverageValue() == raw*4
+    assert ai.getAverageVoltage() == pytest.approx(1.0, abs=0.001)
+
+    # the average engine only changes once per 16 samples
+    engine.set_signal(1, lambda t: np.where(t < 1.0235, 2.0, 1.0))
+    engine.update(now=1031000)
+    assert ai.getValue() == raw
+    assert ai.getAverageValue() == raw*4 + (8*raw >> 2)
+
+
+def test_analog_engine_accumulator(wpilib, hal_data, engine):
+    hal_data['analog_sample_rate'] = 1000.0
+
+    # alternates between 100 and 102 counts
+    lsb = 1220703e-9
+    engine.set_signal(0, lambda t: np.where(np.rint(t*1000) % 2, 102*lsb, 100*lsb))
+
+    ai = wpilib.AnalogInput(0)
+    ai.setOversampleBits(0)
+    ai.setAverageBits(0)
+    ai.initAccumulator()
+    ai.setAccumulatorCenter(100)
+
+    engine.update(now=0)
+    engine.update(now=9000)
+    assert ai.getAccumulatorCount() == 10
+    assert ai.getAccumulatorValue() == 5*2
+
+    ai.setAccumulatorDeadband(3)
+    engine.update(now=19000)
+    assert ai.getAccumulatorCount() == 20
+    assert ai.getAccumulatorValue() == 5*2
+
+    # resetting restarts the accumulator
+    ai.setAccumulatorDeadband(0)
+    ai.resetAccumulator()
+    engine.update(now=21000)
+    assert ai.getAccumulatorCount() == 2
+    assert ai.getAccumulatorValue() == 2
+
+
+def test_analog_engine_rate_change(hal_data, engine):
+    hal_data['analog_sample_rate'] = 1000.0
+    engine.set_signal(0, 1.0)
+
+    assert engine.update(now=0) == 1
+    assert engine.update(now=10000) == 10
+
+    # the next sample is still at 11ms
+    hal_data['analog_sample_rate'] = 100.0
+    assert engine.update(now=10999) == 0
+    assert engine.update(now=11000) == 1
+    assert engine.update(now=40000) == 2
+
+
+def test_analog_engine_gyro(wpilib, hal_data, engine):
+    rng = np.random.RandomState(42)
+    vpd = wpilib.AnalogGyro.kDefaultVoltsPerDegreePerSecond
+
+    rate = [0.0]
+    engine.set_signal(0, lambda t: 2.5 + rate[0]*vpd + 0.01*rng.standard_normal(len(t)))
+
+    center = round(2.5 / 1220703e-9) << 10
+    gyro = wpilib.AnalogGyro(0, center=center, offset=0.0)
+    assert hal_data['analog_sample_rate'] == 50000.0
+
+    # noise averages out
+    for i in range(50):
+        engine.update(now=i*20000)
+    assert gyro.getAngle() == pytest.approx(0, abs=0.5)
+
+    rate[0] = 30.0
+    for i in range(50, 100):
+        engine.update(now=i*20000)
+    assert gyro.getRate() == pytest.approx(30, abs=3)
+    assert gyro.getAngle() == pytest.approx(30, abs=1)
+
+    gyro.reset()
+    assert gyro.getAngle() == 0
+    for i in range(100, 125):
+        engine.update(now=i*20000)
+    assert gyro.getAngle() == pytest.approx(15, abs=1)
+
+
+@pytest.mark.benchmark
+def test_analog_engine_benchmark(wpilib, hal_data, engine):
+    import timeit
+
+    rng = np.random.RandomState(0)
+    for i in range(8):
+        engine.set_signal(i, lambda t: 2.5 + 0.01*rng.standard_normal(len(t)))
+    wpilib.AnalogGyro(0, center=0, offset=0.0)
+
+    now = [0]
+    def tick():
+        now[0] += 20000
+        engine.update(now=now[0])
+
+    t = min(timeit.repeat(tick, number=50, repeat=3))
+    print("8 channels at 50kHz: %.1fus per 20ms loop" % (t*1000000/50))
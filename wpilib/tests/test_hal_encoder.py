@@ -0,0 +1,139 @@
+import pytest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+pytestmark = pytest.mark.skipif(np is None, reason="requires numpy")
+
+
+@pytest.fixture(scope='function')
+def engine(hal_data):
+    from hal_impl.encoder import EncoderEngine
+    return EncoderEngine()
+
+
+def test_encoder_engine_position(wpilib, hal_data, engine):
+    encoder = wpilib.Encoder(1, 2)
+    encoder.setDistancePerPulse(0.5)
+
+    engine.set_encoder_position(0, 0.0)
+    engine.update(now=0)
+    assert encoder.get() == 0
+
+    engine.set_encoder_position(0, 10.3)
+    engine.update(now=100000)
+    assert encoder.getRaw() == 41
+    assert encoder.get() == 10
+    assert encoder.getDistance() == 5
+    assert encoder.getDirection() is True
+    assert encoder.getPeriod() == pytest.approx(0.1/10.3)
+    assert encoder.getRate() == pytest.approx(0.5*103)
+    assert not encoder.getStopped()
+
+    # going backwards
+    engine.set_encoder_position(0, 9.2)
+    engine.update(now=200000)
+    assert encoder.getRaw() == 36
+    assert encoder.get() == 9
+    assert encoder.getDirection() is False
+    assert encoder.getRate() == pytest.approx(-0.5*11)
+
+    # reset keeps the fraction of a count
+    encoder.reset()
+    assert encoder.get() == 0
+    engine.set_encoder_position(0, 8.2)
+    engine.update(now=300000)
+    assert encoder.getRaw() == -4
+    assert encoder.get() == -1
+
+    # no edges for longer than the max period
+    engine.update(now=900000)
+    assert encoder.getStopped()
+    assert encoder.getRate() == 0
+    assert encoder.getRaw() == -4
+
+
+def test_encoder_engine_types(wpilib, hal_data, engine):
+    e1 = wpilib.Encoder(1, 2, False, wpilib.Encoder.EncodingType.k1X)
+    e2 = wpilib.Encoder(3, 4, True, wpilib.Encoder.EncodingType.k2X)
+    assert e1.getEncodingScale() == 1
+    assert e2.getEncodingScale() == 2
+
+    engine.set_encoder_position(0, 0.0)
+    engine.set_encoder_velocity(1, 20.0)
+    engine.update(now=0)
+    engine.set_encoder_position(0, 3.7)
+    engine.update(now=500000)
+
+    assert (e1.getRaw(), e1.get()) == (3, 3)
+
+    # reversed
+    assert (e2.getRaw(), e2.get()) == (-20, -10)
+    assert e2.getDirection() is False
+    assert e2.getPeriod() == pytest.approx(1/20.0)
+
+
+def test_encoder_engine_counter(wpilib, hal_data, engine):
+    counter = wpilib.Counter(3)
+    counter.setSamplesToAverage(4)
+
+    # edges at 0.05, 0.15, ...
+    engine.set_counter_position(0, 0.5)
+    engine.set_counter_velocity(0, 10)
+    for i in range(11):
+        engine.update(now=i*100000)
+
+    assert counter.get() == 10
+    assert counter.getPeriod() == pytest.approx(0.1)
+
+    # edges at 1.025 and 1.075, the buffer holds the last 4 periods
+    engine.set_counter_velocity(0, 20)
+    engine.update(now=1100000)
+    assert counter.get() == 12
+    assert counter.getPeriod() == pytest.approx((0.1 + 0.1 + 0.075 + 0.05) / 4)
+
+    # a counter with only an up source counts in both directions
+    engine.set_counter_velocity(0, -10)
+    engine.update(now=1200000)
+    assert counter.get() == 13
+    assert counter.getDirection() is True
+
+    counter.reset()
+    engine.update(now=1300000)
+    assert counter.get() == 1
+
+
+def test_encoder_engine_counter_updown(wpilib, hal_data, engine):
+    counter = wpilib.Counter(wpilib.DigitalInput(3), wpilib.DigitalInput(4))
+    assert counter.getDirection() is False
+
+    engine.set_counter_position(0, 0.5)
+    engine.update(now=0)
+    engine.set_counter_position(0, -2.5)
+    engine.update(now=100000)
+
+    # rising and falling edges are counted
+    assert counter.get() == -6
+    assert counter.getDirection() is False
+
+
+@pytest.mark.benchmark
+def test_encoder_engine_benchmark(wpilib, hal_data, engine):
+    import timeit
+
+    for i in range(4):
+        wpilib.Encoder(i*2, i*2 + 1)
+        engine.set_encoder_velocity(i, 100.0 + i)
+    for i in range(8):
+        wpilib.Counter(10 + i)
+        engine.set_counter_velocity(i, 50.0 + i)
+
+    now = [0]
+    def tick():
+        now[0] += 20000
+        engine.update(now=now[0])
+
+    t = min(timeit.repeat(tick, number=200, repeat=3))
+    print("4 encoders and 8 counters: %.1fus per update" % (t*1000000/200))
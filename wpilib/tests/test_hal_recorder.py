@@ -0,0 +1,114 @@
+import io
+
+import pytest
+
+
+@pytest.fixture(scope='function')
+def recorder(hal_data, sim_hooks):
+    from hal_impl.recorder import Recorder
+    f = io.BytesIO()
+    return Recorder(f), f
+
+
+def test_recorder_deltas(hal_data, sim_hooks, recorder):
+    recorder, f = recorder
+
+    sim_hooks.time = 1.0
+    n = recorder.record()
+    assert n > 100
+    size = f.tell()
+
+    # nothing changed
+    sim_hooks.time = 1.02
+    assert recorder.record() == 0
+    assert f.tell() - size < 8
+    size = f.tell()
+
+    hal_data['analog_in'][1]['voltage'] = 2.5
+    hal_data['joysticks'][0]['axes'][1] = -1
+    hal_data['pwm'][0]['value'] = 0.5
+    sim_hooks.time = 1.04
+    assert recorder.record() == 3
+
+    # lists are copied, so changing them in place is noticed
+    hal_data['joysticks'][0]['axes'][1] = 0.5
+    assert recorder.record() == 1
+
+
+def test_recorder_replay(hal, hal_data, sim_hooks, recorder):
+    import hal_impl.functions
+    from hal_impl.recorder import Replayer
+
+    recorder, f = recorder
+
+    sim_hooks.time = 1.0
+    recorder.record()
+
+    sim_hooks.time = 1.02
+    hal_data['analog_in'][1]['voltage'] = 2.5
+    hal_data['joysticks'][0]['axes'][1] = -1
+    hal_data['robot']['custom'] = 'x'
+    hal_data['pwm'][0]['value'] = 0.5
+    recorder.record()
+
+    sim_hooks.time = 1.04
+    hal_data['analog_in'][1]['voltage'] = 3.5
+    hal_data['joysticks'][0]['axes'][1] = 0
+    recorder.record()
+
+    hal_impl.functions.reset_hal()
+    replayer = Replayer(f.getvalue())
+
+    assert replayer.step() == 1000000
+    assert hal_data['analog_in'][1]['voltage'] == 0
+
+    assert replayer.step() == 1020000
+    assert hal_data['analog_in'][1]['voltage'] == 2.5
+    assert hal_data['joysticks'][0]['axes'][1] == -1
+    assert hal_data['robot']['custom'] == 'x'
+
+    # outputs are not replayed
+    assert hal_data['pwm'][0]['value'] == 0
+
+    assert replayer.step() == 1040000
+    assert hal_data['analog_in'][1]['voltage'] == 3.5
+    assert hal_data['joysticks'][0]['axes'][1] == 0
+
+    assert replayer.step() is None
+
+    # outputs can be replayed too
+    hal_impl.functions.reset_hal()
+    replayer = Replayer(f.getvalue())
+    replayer.run(speed=None, inputs_only=False)
+    assert hal_data['pwm'][0]['value'] == 0.5
+    assert hal_data['analog_in'][1]['voltage'] == 3.5
+
+
+def test_recorder_replay_speed(hal_data, virtual_hooks):
+    from hal_impl.recorder import Recorder, Replayer
+
+    f = io.BytesIO()
+    recorder = Recorder(f)
+    for i in range(5):
+        hal_data['analog_in'][0]['voltage'] = i
+        recorder.record(now=i*100000)
+
+    start = virtual_hooks.getTime()
+    Replayer(f.getvalue()).run(speed=2.0)
+    assert virtual_hooks.getTime() - start == pytest.approx(0.2)
+    assert hal_data['analog_in'][0]['voltage'] == 4
+
+
+def test_recorder_values():
+    from hal_impl.recorder import Replayer, _write_value, _read_value
+
+    for value in [None, True, False, 0, 1, -1, 300, -300, 2**40, 1.5, -0.1,
+                  '', 'abc', [1, 2.5, None], {'a': [True]}]:
+        buf = bytearray()
+        _write_value(buf, value)
+        result = _read_value(io.BytesIO(bytes(buf)))
+        assert result == value
+        assert type(result) is type(value)
+
+    with pytest.raises(ValueError):
+        Replayer(b'garbage!')
@@ -1,3 +1,10 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
 
 def _test_filtered_hal(d):
     for k, v in d.items():
@@ -29,3 +36,287 @@ def test_hal_update(wpilib, hal_data):
     update_hal_data(in_dict, hal_data)
     
     assert hal_data['compressor']['on'] == True 
+
+
+@pytest.mark.benchmark
+def test_hal_data_benchmark(hal_data):
+    '''Per-call overhead of HAL functions that read and write hal_data'''
+    import timeit
+    import hal
+    
+    n = 20000
+    
+    pwm = hal.initializePWMPort(hal.getPort(3))
+    ain = hal.initializeAnalogInputPort(hal.getPort(1))
+    
+    for name, fn in [('setPWMRaw', lambda: hal.setPWMRaw(pwm, 100)),
+                     ('getPWMRaw', lambda: hal.getPWMRaw(pwm)),
+                     ('getAnalogValue', lambda: hal.getAnalogValue(ain))]:
+        t = min(timeit.repeat(fn, number=n, repeat=5))
+        print("%-15s %.0f ns/call" % (name, t / n * 1e9))
+    
+    assert hal.getPWMRaw(pwm) == 100
+
+
+def test_notifydict_fast_path(hal_data):
+    from hal_impl.data import NotifyDict
+    
+    d = NotifyDict({'a': 1, 'b': 2})
+    
+    # no listeners, so setting an item doesn't run any python code
+    assert type(d).__setitem__ is dict.__setitem__
+    
+    with pytest.raises(KeyError):
+        d.register('c', lambda k, v: None)
+    
+    calls = []
+    d.register('a', lambda k, v: calls.append((k, v)), notify=True)
+    assert isinstance(d, NotifyDict)
+    assert calls == [('a', 1)]
+    
+    d['a'] = 3
+    d['b'] = 4
+    assert calls == [('a', 1), ('a', 3)]
+    assert d == {'a': 3, 'b': 4}
+
+
+def test_coalesced_notifications(hal_data):
+    import hal_impl.functions
+    from hal_impl.data import flush_notifications
+    
+    calls = []
+    cb = lambda k, v: calls.append((k, v))
+    
+    pwm = hal_data['pwm']
+    pwm[0].register('value', cb, coalesce=True)
+    pwm[0].register('raw_value', cb, coalesce=True)
+    pwm[1].register('value', cb, coalesce=True)
+    
+    for i in range(10):
+        pwm[0]['value'] = i
+        pwm[1]['value'] = -i
+    
+    assert calls == []
+    
+    flush_notifications()
+    assert calls == [('value', 9), ('value', -9)]
+    
+    flush_notifications()
+    assert len(calls) == 2
+    
+    pwm[0]['raw_value'] = 5
+    pwm[0]['value'] = 1
+    flush_notifications()
+    assert calls[2:] == [('raw_value', 5), ('value', 1)]
+    
+    # values can be set by another thread while flushing
+    del calls[:]
+    def _set():
+        for i in range(2000):
+            pwm[1]['value'] = i
+    
+    th = threading.Thread(target=_set)
+    th.start()
+    while th.is_alive():
+        flush_notifications()
+    th.join()
+    flush_notifications()
+    
+    values = [v for _, v in calls]
+    assert values == sorted(set(values))
+    assert values[-1] == 1999
+    
+    # pending notifications are discarded on reset
+    del calls[:]
+    pwm[0]['value'] = 2
+    hal_impl.functions.reset_hal()
+    flush_notifications()
+    assert calls == []
+
+
+def test_batch_notifications(hal_data):
+    from hal_impl.data import batch_notifications
+    
+    calls = []
+    cb = lambda k, v: calls.append((k, v))
+    
+    pwm = hal_data['pwm']
+    pwm[0].register('value', cb)
+    pwm[1].register('value', cb)
+    
+    with batch_notifications():
+        pwm[0]['value'] = 1
+        pwm[1]['value'] = 2
+        with batch_notifications():
+            pwm[0]['value'] = 3
+        assert calls == []
+        assert pwm[0]['value'] == 3
+    
+    assert calls == [('value', 3), ('value', 2)]
+    
+    pwm[1]['value'] = 4
+    assert calls[-1] == ('value', 4)
+    
+    # values set by other threads aren't held back
+    def _set():
+        pwm[1]['value'] = 5
+    
+    with batch_notifications():
+        pwm[0]['value'] = 6
+        th = threading.Thread(target=_set)
+        th.start()
+        th.join()
+        assert calls[-1] == ('value', 5)
+    
+    assert calls[-1] == ('value', 6)
+
+
+@pytest.fixture(scope='function')
+def fndef():
+    import hal_impl.fndef
+    level = hal_impl.fndef.validation_level
+    calls = hal_impl.fndef.validation_sample_calls
+    yield hal_impl.fndef
+    hal_impl.fndef.set_validation_level(level, calls)
+
+
+def _make_hal_funcs(fndef, level):
+    import ctypes as C
+    from hal_impl.types import PortHandle, JoystickAxes_ptr
+    fndef.set_validation_level(level)
+    return (fndef._RETFUNC('getPort', PortHandle, ('channel', C.c_int32)),
+            fndef._RETFUNC('getFPGATime', C.c_uint64, ('status', C.POINTER(C.c_int32))),
+            fndef._RETFUNC('getJoystickAxes', C.c_int32, ('joystickNum', C.c_int32), ('axes', JoystickAxes_ptr)))
+
+
+def test_validation_levels(hal_data, fndef):
+    import hal_impl.functions
+    
+    with pytest.raises(ValueError):
+        fndef.set_validation_level('nope')
+    
+    # strict: every call is checked
+    getPort = _make_hal_funcs(fndef, 'strict')[0]
+    assert getPort(1).pin == 1
+    for _ in range(2):
+        with pytest.raises(AssertionError):
+            getPort(1.5)
+    
+    # off: the implementation is used directly
+    getPort, getFPGATime, _ = _make_hal_funcs(fndef, 'off')
+    assert getPort.__code__ is hal_impl.functions.getPort.__code__
+    assert getFPGATime.fndata.c_name == 'HAL_GetFPGATime'
+    assert not hasattr(hal_impl.functions.getFPGATime, 'fndata')
+    assert getPort(1.5) is not None
+    
+    # sampled: the first N calls are checked, then the implementation is
+    # bound directly
+    fndef.set_validation_level('sampled', 3)
+    getPort, getFPGATime, _ = _make_hal_funcs(fndef, 'sampled')
+    assert getFPGATime.fndata.c_name == 'HAL_GetFPGATime'
+    for i in range(3):
+        with pytest.raises(AssertionError):
+            getPort(1.5)
+        assert getPort(i).pin == i
+    
+    assert getPort.__code__ is hal_impl.functions.getPort.__code__
+    assert getPort(1.5) is not None
+    assert getPort(2).pin == 2
+    assert not hasattr(hal_impl.functions.getPort, 'fndata')
+
+
+@pytest.mark.parametrize('level, ok', [('sampled', True), ('nope', False)])
+def test_validation_level_environment(level, ok):
+    env = dict(os.environ, HALSIM_VALIDATION=level)
+    proc = subprocess.Popen([sys.executable, '-c',
+                             'import hal, hal_impl.fndef as f; print(f.validation_level)'],
+                            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    stdout, stderr = proc.communicate()
+    if ok:
+        assert proc.returncode == 0
+        assert stdout.strip() == level
+    else:
+        assert proc.returncode != 0
+        assert "Invalid validation level 'nope'" in stderr
+
+
+@pytest.mark.benchmark
+def test_validation_levels_benchmark(hal_data, fndef):
+    '''Per-call overhead of the simulated HAL at each validation level'''
+    import ctypes as C
+    import timeit
+    from hal_impl.types import JoystickAxes
+    
+    status = C.c_int32()
+    axes = JoystickAxes()
+    n = 20000
+    
+    for level in fndef.VALIDATION_LEVELS:
+        getPort, getFPGATime, getJoystickAxes = _make_hal_funcs(fndef, level)
+        for name, fn in [('getPort', lambda: getPort(1)),
+                         ('getFPGATime', lambda: getFPGATime(status)),
+                         ('getJoystickAxes', lambda: getJoystickAxes(0, axes))]:
+            t = min(timeit.repeat(fn, number=n, repeat=5))
+            print("%-8s %-16s %.0f ns/call" % (level, name, t / n * 1e9))
+
+
+def _physics_payload(t):
+    return {
+        'joysticks': [{'axes': [t*0.01, 0, 0, 0, 0, 0], 'buttons': [None] + [False]*12}
+                      for _ in range(2)],
+        'analog_in': [{'voltage': t, 'avg_voltage': 1.0} for _ in range(4)],
+        'encoder': [{'count': t, 'rate': 1.0} for _ in range(4)],
+        'robot': {},
+    }
+
+
+@pytest.mark.parametrize('diff', [True, False])
+def test_compiled_update(hal_data, diff):
+    from hal_impl.data import compile_hal_data_update, update_hal_data
+    import copy
+    
+    expected = copy.deepcopy(hal_data)
+    
+    updater = compile_hal_data_update(_physics_payload(0), hal_data, diff=diff)
+    assert ('joysticks', 1, 'axes', 0) in updater.paths
+    assert len(updater.paths) == len(updater.setters)
+    
+    calls = []
+    hal_data['analog_in'][1].register('voltage', lambda k, v: calls.append(v))
+    
+    for t in range(3):
+        payload = _physics_payload(t)
+        n = updater.update(payload)
+        update_hal_data(payload, expected)
+        assert hal_data == expected
+        
+        if diff:
+            # avg_voltage and rate only change the first time
+            assert n == (8 if t == 0 else 10)
+            assert calls == list(range(1, t + 1))
+        else:
+            assert n == len(updater.paths)
+            assert calls == list(range(t + 1))
+    
+    values = [0.5]*len(updater.paths)
+    updater.set_values(values)
+    assert hal_data['joysticks'][0]['axes'][:2] == [0.5, 0.5]
+    assert hal_data['encoder'][3]['count'] == 0.5
+
+
+@pytest.mark.benchmark
+def test_compiled_update_benchmark(hal_data):
+    '''Cost of applying a typical physics payload each tick'''
+    import timeit
+    from hal_impl.data import compile_hal_data_update, update_hal_data
+    
+    payload = _physics_payload(1)
+    n = 2000
+    
+    for name, fn in [('update_hal_data', lambda: update_hal_data(payload, hal_data)),
+                     ('compiled', compile_hal_data_update(payload, hal_data, diff=False).update),
+                     ('compiled diff', compile_hal_data_update(payload, hal_data).update)]:
+        t = min(timeit.repeat(lambda: fn(payload) if name != 'update_hal_data' else fn(),
+                              number=n, repeat=3))
+        print("%-16s %.2f us/tick" % (name, t / n * 1e6))
@@ -64,3 +64,65 @@ def test_i2c(wpilib):
     with pytest.raises(ValueError):
         i2c.port
     
+
+
+def test_register_map():
+    from hal_impl.register_map import Register, RegisterMap
+    
+    value = [0x1234]
+    written = []
+    regs = RegisterMap({
+        0x00: Register(0xE5, readonly=True),
+        0x10: Register(lambda: value[0], size=2, byteorder='big'),
+        0x12: Register(-2, size=2, signed=True),
+        0x20: Register(0, on_write=written.append),
+    }, size=64)
+    
+    assert bytes(regs.read(0x10, 4)) == b'\x12\x34\xfe\xff'
+    assert regs[0x12] == -2
+    
+    value[0] = 0xABCD
+    assert regs[0x10] == 0xABCD
+    assert bytes(regs.read(0x11, 3, increment=False)) == b'\xcd\xcd\xcd'
+    
+    # read only registers keep their value
+    regs.write(0x00, [1, 2])
+    regs.write(0x1F, [3, 4, 5])
+    assert bytes(regs.read(0x00, 2)) == b'\xe5\x02'
+    assert written == [4]
+    
+    # wraps around the end of the map
+    assert bytes(regs.read(0x3F, 2)) == b'\x00\xe5'
+
+
+def test_i2c_register_sim(wpilib):
+    from hal_impl.i2c_helpers import I2CRegisterSim
+    from hal_impl.register_map import RegisterMap
+    
+    sim = I2CRegisterSim(RegisterMap({0x05: 0x42}))
+    i2c = wpilib.I2C(wpilib.I2C.Port.kOnboard, 0x10, sim)
+    
+    assert i2c.read(0x05, 1) == [0x42]
+    assert i2c.writeBulk([0x06, 1, 2, 3]) == False
+    assert i2c.read(0x05, 4) == [0x42, 1, 2, 3]
+    
+    # the register pointer auto-increments
+    assert i2c.readOnly(2) == [0, 0]
+    assert i2c.verifySensor(0x05, [0x42, 1, 2, 3])
+
+
+def test_adxl345_i2c(wpilib, hal_data):
+    accel = wpilib.ADXL345_I2C(wpilib.I2C.Port.kOnboard,
+                               wpilib.ADXL345_I2C.Range.k2G)
+    
+    hal_data['robot']['adxl345_i2c_0_x'] = 0.5
+    hal_data['robot']['adxl345_i2c_0_y'] = -1.25
+    hal_data['robot']['adxl345_i2c_0_z'] = 3.0
+    
+    assert accel.getX() == 0.5
+    
+    # clipped to the range
+    assert accel.getAccelerations() == (0.5, -1.25, 511/256)
+    
+    accel.setRange(wpilib.ADXL345_I2C.Range.k16G)
+    assert accel.getZ() == 3.0
@@ -2,6 +2,7 @@ from unittest.mock import Mock
 import pytest
 
 def test_match_arglist(wpilib):
+    import wpilib._impl.utils
 
     argument_templates = [[("arg1", bool)],
                           [("arg1", bool), ("arg2", str)],
@@ -59,3 +60,147 @@ def test_match_arglist(wpilib):
     with pytest.raises(ValueError):
         # extra kw argument
         _, _ = wpilib._impl.utils.match_arglist("v10", [True], {"something": True}, argument_templates)
+
+
+
+def test_match_arglist_cache(wpilib, capsys):
+    from wpilib._impl.utils import ArgListMatcher, HasAttribute
+    
+    class Source:
+        def getPortHandleForRouting(self):
+            pass
+    
+    class Other:
+        pass
+    
+    source_arg = [int, HasAttribute("getPortHandleForRouting")]
+    matcher = ArgListMatcher("v1", [[("a", source_arg)],
+                                    [("a", source_arg), ("b", source_arg)],
+                                    [("a", str), ("c", None)]])
+    
+    assert matcher.match([1], {}) == (0, {"a": 1})
+    assert matcher.match([2], {}) == (0, {"a": 2})
+    assert len(matcher._cache) == 1
+    
+    s = Source()
+    assert matcher.match([s, 3], {}) == (1, {"a": s, "b": 3})
+    assert matcher.match([], {"a": 1, "b": s}) == (1, {"a": 1, "b": s})
+    assert matcher.match(["x"], {}) == (2, {"a": "x", "c": None})
+    assert len(matcher._cache) == 4
+    
+    # an instance attribute doesn't mean that every instance has it, so
+    # this can't be cached
+    o = Other()
+    o.getPortHandleForRouting = lambda: None
+    assert matcher.match([o], {}) == (0, {"a": o})
+    assert len(matcher._cache) == 4
+    
+    with pytest.raises(ValueError):
+        matcher.match([Other()], {})
+    
+    assert "ERROR: Invalid arguments passed to v1()" in capsys.readouterr().out
+    
+    o2 = Other()
+    o2.getPortHandleForRouting = lambda: None
+    assert matcher.match([o2], {}) == (0, {"a": o2})
+
+
+@pytest.mark.benchmark
+def test_match_arglist_benchmark(wpilib):
+    import timeit
+    from wpilib._impl.utils import match_arglist
+    
+    for name, args, kwargs in [('Encoder.__init__', (1, 2, True), {}),
+                               ('Encoder.__init__', (), {'aChannel': 1, 'bChannel': 2}),
+                               ('Counter.__init__', (1,), {'mode': 1})]:
+        cls = getattr(wpilib, name.split('.')[0])
+        templates = getattr(cls, '_argument_templates', None) or cls._init_templates
+        extra = name == 'Counter.__init__'
+        
+        n = 5000
+        t = min(timeit.repeat(lambda: match_arglist(name, args, kwargs, templates, extra),
+                              number=n, repeat=3))
+        print("%-20s %-40s %.2f us/call" % (name, (args, kwargs), t / n * 1e6))
+
+
+def test_periodic_executor(wpilib, virtual_hooks):
+    
+    from wpilib._impl.periodicexecutor import PeriodicExecutor
+    
+    executor = PeriodicExecutor()
+    fast = []
+    slow = []
+    
+    t1 = executor.schedule('fast', 0.01, lambda: fast.append(1))
+    t2 = executor.schedule('slow', 0.05, lambda: slow.append(1))
+    
+    wpilib.Timer.delay(0.225)
+    
+    t1.cancel()
+    t2.cancel()
+    
+    assert len(fast) == 22
+    assert len(slow) == 4
+    assert executor.getTasks() == []
+    
+    # cancel waits for the task to finish, so nothing runs after it
+    wpilib.Timer.delay(0.03)
+    assert len(fast) == 22
+    
+    # thread exits when there's nothing left to do
+    assert executor._thread is None
+
+
+def test_periodic_executor_earlier_deadline(wpilib, virtual_hooks):
+    
+    from wpilib._impl.periodicexecutor import PeriodicExecutor
+    
+    executor = PeriodicExecutor()
+    slow = executor.schedule('slow', 1.0, lambda: None)
+    
+    wpilib.Timer.delay(0.1)
+    
+    # doesn't wait for the slow task's deadline
+    calls = []
+    fast = executor.schedule('fast', 0.01, lambda: calls.append(wpilib.Timer.getFPGATimestamp()))
+    wpilib.Timer.delay(0.055)
+    
+    assert calls == pytest.approx([0.11, 0.12, 0.13, 0.14, 0.15], abs=1e-5)
+    
+    fast.cancel()
+    slow.cancel()
+
+
+def test_periodic_executor_overrun(wpilib, virtual_hooks):
+    
+    from wpilib._impl.periodicexecutor import PeriodicExecutor
+    
+    executor = PeriodicExecutor()
+    task = executor.schedule('overrun', 0.01, lambda: wpilib.Timer.delay(0.03))
+    wpilib.Timer.delay(0.15)
+    assert executor.getOverruns()['overrun'] > 0
+    task.cancel()
+    
+
+def test_pidcontroller_shared_executor(wpilib, virtual_hooks):
+    
+    from wpilib._impl.periodicexecutor import PeriodicExecutor
+    
+    output = Mock()
+    pid1 = wpilib.PIDController(1, 0, 0, lambda: 1, output, period=0.01,
+                                useSharedExecutor=True)
+    pid2 = wpilib.PIDController(1, 0, 0, lambda: 1, output, period=0.01,
+                                useSharedExecutor=True)
+    
+    executor = PeriodicExecutor.getInstance()
+    assert len(executor.getTasks()) == 2
+    
+    pid1.setSetpoint(2)
+    pid1.enable()
+    
+    wpilib.Timer.delay(0.05)
+    output.pidWrite.assert_called_with(1)
+    
+    pid1.free()
+    pid2.free()
+    assert executor.getTasks() == []
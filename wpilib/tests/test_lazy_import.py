@@ -0,0 +1,92 @@
+import importlib
+import sys
+
+import pytest
+
+
+def test_lazy_names(wpilib):
+    '''Every name that a submodule exports is in the lazy map'''
+    for modname in set(wpilib._lazy_names.values()):
+        # these only have a single name exported from them
+        if modname in ('_impl.main', 'interfaces'):
+            continue
+
+        mod = importlib.import_module('wpilib.' + modname)
+        names = getattr(mod, '__all__', None)
+        if names is None:
+            names = [n for n in vars(mod) if not n.startswith('_') and
+                     not isinstance(getattr(mod, n), type(sys))]
+
+        for name in names:
+            assert wpilib._lazy_names.get(name) == modname
+            assert getattr(wpilib, name) is getattr(mod, name)
+
+
+def test_lazy_import(wpilib):
+    assert 'wpilib.cameraserver' not in sys.modules
+
+    from wpilib import Timer
+    assert 'wpilib.timer' in sys.modules
+    assert wpilib.Timer is Timer
+    assert 'Timer' in vars(wpilib)
+
+    assert 'CameraServer' in dir(wpilib)
+    assert 'wpilib.cameraserver' not in sys.modules
+
+    assert wpilib.driverstation.DriverStation is wpilib.DriverStation
+
+    with pytest.raises(AttributeError):
+        wpilib.DoesNotExist
+
+    assert not hasattr(wpilib, '__wrapped__')
+
+
+def test_deprecated_names(wpilib):
+    import hal
+    import math
+
+    with pytest.deprecated_call():
+        assert wpilib.hal is hal
+    with pytest.deprecated_call():
+        assert wpilib.math is math
+    with pytest.deprecated_call():
+        assert wpilib.differentialdrive is wpilib.drive.differentialdrive
+    with pytest.deprecated_call():
+        assert wpilib.vector2d.Vector2d is wpilib.Vector2d
+
+    assert 'hal' not in dir(wpilib)
+
+
+def test_star_import(wpilib):
+    d = {}
+    exec('from wpilib import *', d)
+
+    for name in wpilib.__all__:
+        assert d[name] is getattr(wpilib, name)
+
+    assert 'run' in d
+
+
+def test_importtime(wpilib):
+    from wpilib._impl import importtime
+    import io
+
+    assert 'timer' in importtime.get_submodules()
+
+    results = importtime.measure(['timer', 'pwm'])
+    assert [r[0] for r in results] == ['wpilib', 'timer', 'pwm']
+    assert all(t >= 0 for _, t in results)
+
+    out = io.StringIO()
+    importtime.report(results, file=out)
+    assert 'timer' in out.getvalue()
+
+
+def test_reset_wpilib(wpilib):
+    from wpilib._impl.utils import reset_wpilib
+
+    wpilib.LiveWindow.setEnabled(True)
+    reset_wpilib()
+
+    assert wpilib.LiveWindow.liveWindowEnabled == False
+    assert 'wpilib.cameraserver' not in sys.modules
@@ -3,6 +3,13 @@ import pytest
 import random
 from unittest.mock import MagicMock
 
+# imported here so that it isn't unloaded when the wpilib fixture resets
+# sys.modules
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Filter constants taken from Java WPILIB
 # allwpilib/blob/master/wpilibjIntegrationTests/src/main/java/edu/wpi/first/wpilibj/test/TestBench.java
 
@@ -117,3 +124,75 @@ def test_reset(wpilib):
     assert len(movavg.inputs) == 0
     assert len(movavg.outputs) == 0
 
+
+
+class _ReferenceFilter:
+    '''The straightforward implementation, for comparison'''
+    
+    def __init__(self, ffGains, fbGains):
+        self.inputs = [0.0]*len(ffGains)
+        self.outputs = [0.0]*len(fbGains)
+        self.ffGains = ffGains
+        self.fbGains = fbGains
+    
+    def calculate(self, value):
+        self.inputs = ([value] + self.inputs)[:len(self.ffGains)]
+        retVal = sum(g*x for g, x in zip(self.ffGains, self.inputs)) - \
+                 sum(g*y for g, y in zip(self.fbGains, self.outputs))
+        self.outputs = ([retVal] + self.outputs)[:len(self.fbGains)]
+        return retVal
+
+
+@pytest.mark.parametrize('ffGains, fbGains', [
+    ([0.25]*4, []),
+    ([0.5, 0.3, 0.2], []),
+    ([0.1], [-0.9]),
+    ([0.8, -0.8], [-0.8]),
+    ([0.2, 0.3, 0.1], [-0.5, 0.1]),
+])
+def test_matches_reference(wpilib, ffGains, fbGains):
+    source = OutputSource()
+    flt = wpilib.LinearDigitalFilter(source, ffGains, fbGains)
+    ref = _ReferenceFilter(ffGains, fbGains)
+    
+    for value in source.pid_data:
+        assert flt.pidGet() == pytest.approx(ref.calculate(value))
+    
+    assert flt.inputs == pytest.approx(ref.inputs)
+    assert flt.outputs == pytest.approx(ref.outputs)
+
+
+def test_movingaverage_long(wpilib):
+    source = NoiseSource()
+    movavg = wpilib.LinearDigitalFilter.movingAverage(source, 200)
+    
+    for idx in range(len(source.pid_data)):
+        value = movavg.pidGet()
+    
+    assert value == pytest.approx(math.fsum(source.pid_data[-200:])/200)
+
+
+@pytest.mark.parametrize('ffGains, fbGains', [
+    ([0.25]*4, []),
+    ([0.8, -0.8], [-0.8]),
+    ([0.2, 0.3, 0.1], [-0.5, 0.1]),
+])
+@pytest.mark.skipif(np is None, reason="requires numpy")
+def test_filterBatch(wpilib, ffGains, fbGains):
+    source = OutputSource()
+    flt = wpilib.LinearDigitalFilter(source, ffGains, fbGains)
+    batch = wpilib.LinearDigitalFilter(source, ffGains, fbGains)
+    
+    # the state carries over between pidGet and filterBatch
+    expected = [flt.pidGet() for _ in range(100)]
+    source.reset()
+    for _ in range(50):
+        batch.pidGet()
+    
+    result = batch.filterBatch(source.pid_data[50:100])
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == pytest.approx(expected[50:])
+    
+    assert batch.inputs == pytest.approx(flt.inputs)
+    assert batch.outputs == pytest.approx(flt.outputs)
+    assert batch.get() == pytest.approx(flt.get())
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_livewindow_enabled(wpilib):
     wpilib.LiveWindow.setEnabled(True)
 
@@ -8,4 +11,94 @@ def test_livewindow_after_free(wpilib, networktables):
     wpilib.LiveWindow.setEnabled(False)
     m.free()
     wpilib.LiveWindow.setEnabled(True)
-    wpilib.LiveWindow.run()
\ No newline at end of file
+    wpilib.LiveWindow.run()
+
+@pytest.fixture(scope='function')
+def fake_sensors(wpilib, sim_hooks):
+
+    class FakeSensor(wpilib.LiveWindowSendable):
+        def __init__(self):
+            self.updates = 0
+            self.value = 0.0
+            self.valueEntry = None
+
+        def getSmartDashboardType(self):
+            return "Fake"
+
+        def initTable(self, subtable):
+            self.valueEntry = subtable.getEntry("Value")
+
+        def updateTable(self):
+            self.updates += 1
+            self.valueEntry.setDouble(self.value)
+
+    sensors = [FakeSensor() for _ in range(25)]
+    for i, s in enumerate(sensors):
+        wpilib.LiveWindow.addSensor("Fake", "sensor%d" % i, s)
+
+    wpilib.LiveWindow.setEnabled(True)
+    return sensors
+
+
+def test_livewindow_round_robin(wpilib, sim_hooks, fake_sensors):
+    LiveWindow = wpilib.LiveWindow
+    assert LiveWindow.maxUpdatesPerLoop == 10
+
+    def updates():
+        return sorted(s.updates for s in fake_sensors)
+
+    LiveWindow.run()
+    assert updates() == [0]*15 + [1]*10
+    LiveWindow.run()
+    assert updates() == [0]*5 + [1]*20
+    LiveWindow.run()
+    assert updates() == [1]*25
+
+    # nothing is due yet
+    LiveWindow.run()
+    assert updates() == [1]*25
+
+    sim_hooks.time += LiveWindow.defaultUpdatePeriod
+    LiveWindow.run()
+    assert updates() == [1]*15 + [2]*10
+
+    # per-component update period
+    s = fake_sensors[0]
+    LiveWindow.setUpdatePeriod(s, 0)
+    LiveWindow.maxUpdatesPerLoop = 100
+    for _ in range(5):
+        LiveWindow.run()
+    assert updates()[:-1] == [2]*24
+    assert s.updates >= 6
+
+    LiveWindow.removeComponent(s)
+    n = s.updates
+    sim_hooks.time += LiveWindow.defaultUpdatePeriod
+    LiveWindow.run()
+    assert s.updates == n
+
+
+def test_livewindow_change_only(wpilib, sim_hooks, fake_sensors):
+    from unittest.mock import MagicMock
+
+    LiveWindow = wpilib.LiveWindow
+    s = fake_sensors[0]
+    LiveWindow.setUpdatePeriod(s, 0)
+
+    entry = s.valueEntry._entry = MagicMock()
+
+    def run(value):
+        s.value = value
+        for _ in range(3):
+            LiveWindow.run()
+        return entry.setDouble.call_count
+
+    assert run(0.0) == 1
+    assert run(LiveWindow.floatTolerance / 2) == 1
+    assert run(1.0) == 2
+    assert run(1.0) == 2
+
+    # everything is sent again when LiveWindow is reenabled
+    LiveWindow.setEnabled(False)
+    LiveWindow.setEnabled(True)
+    assert run(1.0) == 3
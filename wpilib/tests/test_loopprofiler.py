@@ -0,0 +1,170 @@
+import logging
+import threading
+
+import pytest
+
+
+@pytest.fixture(scope='function')
+def profiler(wpilib, sim_hooks):
+    from wpilib._impl.loopprofiler import LoopProfiler
+    return LoopProfiler(budget=0.02, size=4)
+
+
+def test_profiler_stats(profiler, sim_hooks):
+    for i in range(6):
+        profiler.startLoop()
+        profiler.enter('a')
+        sim_hooks.time += 0.001*(i + 1)
+        profiler.exit()
+        profiler.endLoop()
+
+    # only the last 4 samples are kept
+    stats = profiler.getStats()
+    assert list(stats) == ['loop', 'a']
+    a = stats['a']
+    assert a.count == 4
+    assert a.min == pytest.approx(0.003, abs=1e-5)
+    assert a.max == pytest.approx(0.006, abs=1e-5)
+    assert a.p99 == pytest.approx(0.006, abs=1e-5)
+    assert a.avg == pytest.approx(0.0045, abs=1e-5)
+    assert stats['loop'] == a
+
+    profiler.reset()
+    assert profiler.getStats()['loop'].count == 0
+
+
+def test_profiler_nested(wpilib, profiler, sim_hooks):
+    from wpilib._impl.loopprofiler import LoopProfiler
+    scheduler = wpilib.command.Scheduler.getInstance()
+
+    profiler.startLoop()
+    profiler.enter('teleopPeriodic')
+    sim_hooks.time += 0.001
+    scheduler.run()
+    wpilib.LiveWindow.run()
+    sim_hooks.time += 0.002
+    profiler.exit()
+    profiler.endLoop()
+
+    stats = profiler.getStats()
+    assert stats['teleopPeriodic'].avg == pytest.approx(0.003, abs=1e-5)
+    assert stats['Scheduler.run'].count == 1
+    assert stats['LiveWindow.run'].count == 1
+
+    # not recorded outside of a loop
+    scheduler.run()
+    assert profiler.getStats()['Scheduler.run'].count == 1
+
+    # or from another thread while a loop is running
+    profiler.startLoop()
+    assert LoopProfiler.getActive() is profiler
+    th = threading.Thread(target=scheduler.run)
+    th.start()
+    th.join()
+    profiler.endLoop()
+    assert LoopProfiler.getActive() is None
+    assert profiler.getStats()['Scheduler.run'].count == 1
+
+
+def test_profiler_overrun(profiler, sim_hooks, caplog):
+    def loop(slow):
+        profiler.startLoop()
+        with profiler.phase('fast'):
+            sim_hooks.time += 0.001
+        with profiler.phase('slow'):
+            sim_hooks.time += slow
+        profiler.endLoop()
+
+    with caplog.at_level(logging.WARNING, logger='wpilib.profiler'):
+        loop(0.001)
+        assert profiler.overruns == 0
+
+        loop(0.05)
+        loop(0.05)
+        assert profiler.overruns == 2
+
+        # throttled
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert 'slowest phase was slow' in messages[0]
+
+        sim_hooks.time += profiler.warningInterval
+        loop(0.05)
+        assert len(caplog.records) == 2
+
+
+def test_profiler_smartdashboard(wpilib, profiler, networktables, sim_hooks):
+    profiler.startLoop()
+    profiler.enter('robotPeriodic')
+    sim_hooks.time += 0.004
+    profiler.exit()
+    profiler.endLoop()
+
+    profiler.exportToSmartDashboard()
+
+    SmartDashboard = wpilib.SmartDashboard
+    assert SmartDashboard.getNumber('LoopProfiler/robotPeriodic/avg', None) == pytest.approx(4, abs=1e-2)
+    assert SmartDashboard.getNumber('LoopProfiler/loop/p99', None) == pytest.approx(4, abs=1e-2)
+    assert SmartDashboard.getNumber('LoopProfiler/overruns', None) == 0
+
+
+def test_iterativerobot_profiler(wpilib, sim_hooks, monkeypatch):
+
+    class FakeDS:
+        def __init__(self):
+            self.loops = 0
+
+        def waitForData(self):
+            if self.loops == 3:
+                raise KeyboardInterrupt()
+            self.loops += 1
+
+        def isDisabled(self):
+            return False
+
+        def isTest(self):
+            return False
+
+        def isAutonomous(self):
+            return False
+
+    class Robot(wpilib.IterativeRobot):
+        def __init__(self):
+            super().__init__()
+            self.ds = FakeDS()
+
+        def teleopInit(self):
+            sim_hooks.time += 0.003
+
+        def teleopPeriodic(self):
+            sim_hooks.time += 0.002
+
+        def robotPeriodic(self):
+            sim_hooks.time += 0.001
+
+    # don't start networktables or the driver station
+    monkeypatch.setattr(wpilib.RobotBase, '__init__', lambda self: None)
+
+    robot = Robot()
+    with pytest.raises(KeyboardInterrupt):
+        robot.startCompetition()
+
+    stats = robot.profiler.getStats()
+    assert list(stats) == ['loop', 'teleopInit', 'teleopPeriodic', 'robotPeriodic']
+    assert stats['teleopInit'].count == 1
+    assert stats['teleopInit'].avg == pytest.approx(0.003, abs=1e-5)
+    assert stats['teleopPeriodic'].count == 3
+    assert stats['teleopPeriodic'].avg == pytest.approx(0.002, abs=1e-5)
+    assert stats['robotPeriodic'].avg == pytest.approx(0.001, abs=1e-5)
+    assert stats['loop'].max == pytest.approx(0.006, abs=1e-5)
+    assert stats['loop'].min == pytest.approx(0.003, abs=1e-5)
+
+    # a phase that raises doesn't leave the profiler inside of it
+    def teleopPeriodic():
+        raise RuntimeError()
+
+    robot.teleopPeriodic = teleopPeriodic
+    with pytest.raises(RuntimeError):
+        robot.loopFunc()
+    assert robot.profiler.stack == []
+    robot.profiler.endLoop()
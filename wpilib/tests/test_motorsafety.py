@@ -0,0 +1,137 @@
+import pytest
+from unittest.mock import MagicMock
+
+
+@pytest.fixture(scope='function')
+def robotstate(wpilib):
+    impl = MagicMock()
+    impl.isDisabled.return_value = False
+    impl.isTest.return_value = False
+    wpilib.RobotState.impl = impl
+    yield impl
+    wpilib.RobotState.impl = None
+
+
+@pytest.fixture(scope='function')
+def make_motor(wpilib):
+
+    class Motor(wpilib.MotorSafety):
+        def __init__(self, name):
+            super().__init__()
+            self.name = name
+            self.stops = 0
+
+        def stopMotor(self):
+            self.stops += 1
+
+        def getDescription(self):
+            return self.name
+
+    return Motor
+
+
+def test_motorsafety_check(wpilib, sim_hooks, robotstate, make_motor):
+    MotorSafety = wpilib.MotorSafety
+
+    sim_hooks.time = 1.0
+    m1 = make_motor('m1')
+    m2 = make_motor('m2')
+    m3 = make_motor('m3')
+
+    m1.setSafetyEnabled(True)
+    m2.setSafetyEnabled(True)
+    m2.setExpiration(0.5)
+    m1.feed()
+    m2.feed()
+    m3.feed()
+
+    sim_hooks.time = 1.05
+    MotorSafety.checkMotors()
+    assert (m1.stops, m2.stops, m3.stops) == (0, 0, 0)
+
+    # m1 is kept alive
+    sim_hooks.time = 1.08
+    m1.feed()
+    sim_hooks.time = 1.15
+    MotorSafety.checkMotors()
+    assert (m1.stops, m2.stops, m3.stops) == (0, 0, 0)
+
+    # m1 expires, and is stopped again every expiration period until fed
+    sim_hooks.time = 1.2
+    MotorSafety.checkMotors()
+    MotorSafety.checkMotors()
+    assert (m1.stops, m2.stops, m3.stops) == (1, 0, 0)
+
+    sim_hooks.time = 1.31
+    MotorSafety.checkMotors()
+    assert (m1.stops, m2.stops, m3.stops) == (2, 0, 0)
+
+    m1.feed()
+    MotorSafety.checkMotors()
+    assert m1.stops == 2
+
+    # safety disabled motors are never stopped
+    sim_hooks.time = 2.0
+    m2.setSafetyEnabled(False)
+    MotorSafety.checkMotors()
+    assert (m1.stops, m2.stops, m3.stops) == (3, 0, 0)
+
+    # nothing is stopped when disabled
+    robotstate.isDisabled.return_value = True
+    MotorSafety.checkMotors()
+    assert m1.stops == 3
+
+    # motors that go away are dropped from the heap
+    del m1
+    robotstate.isDisabled.return_value = False
+    sim_hooks.time = 2.2
+    MotorSafety.checkMotors()
+    assert len(MotorSafety._heap) == 0
+
+
+def test_motorsafety_shorter_expiration(wpilib, sim_hooks, robotstate, make_motor):
+    sim_hooks.time = 1.0
+    m = make_motor('m')
+    m.setExpiration(1.0)
+    m.setSafetyEnabled(True)
+    m.feed()
+
+    m.setExpiration(0.1)
+    m.feed()
+
+    sim_hooks.time = 1.2
+    wpilib.MotorSafety.checkMotors()
+    assert m.stops == 1
+
+
+def test_motorsafety_check_period(wpilib, virtual_hooks, robotstate, make_motor):
+    MotorSafety = wpilib.MotorSafety
+
+    m = make_motor('m')
+    m.setSafetyEnabled(True)
+    m.setExpiration(0.1)
+    m.feed()
+
+    MotorSafety.setCheckPeriod(0.01)
+    try:
+        wpilib.Timer.delay(0.115)
+        assert m.stops == 1
+    finally:
+        MotorSafety.setCheckPeriod(None)
+
+    wpilib.Timer.delay(0.1)
+    assert m.stops == 1
+
+
+@pytest.mark.benchmark
+def test_motorsafety_benchmark(wpilib, robotstate, make_motor):
+    import timeit
+
+    motors = [make_motor('m%d' % i) for i in range(20)]
+    for m in motors:
+        m.setSafetyEnabled(True)
+        m.setExpiration(100)
+        m.feed()
+
+    t = min(timeit.repeat(wpilib.MotorSafety.checkMotors, number=1000, repeat=3))
+    print("checkMotors with 20 motors: %.2fus" % (t*1000))
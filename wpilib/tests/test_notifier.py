@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock
+
+
+def test_notifier_periodic(wpilib, virtual_hooks):
+    handler = MagicMock()
+    notifier = wpilib.Notifier(handler)
+    
+    notifier.startPeriodic(0.01)
+    wpilib.Timer.delay(0.105)
+    notifier.stop()
+    
+    assert handler.call_count == 10
+    
+    wpilib.Timer.delay(0.03)
+    assert handler.call_count == 10
+    
+    notifier.free()
+
+
+def test_notifier_single(wpilib, virtual_hooks):
+    handler = MagicMock()
+    notifier = wpilib.Notifier(handler)
+    
+    notifier.startSingle(0.01)
+    wpilib.Timer.delay(0.005)
+    assert handler.call_count == 0
+    
+    wpilib.Timer.delay(0.045)
+    assert handler.call_count == 1
+    
+    notifier.free()
+    assert not notifier.thread.is_alive()
+
+
+def test_notifier_sethandler(wpilib, virtual_hooks):
+    handler1 = MagicMock()
+    handler2 = MagicMock()
+    notifier = wpilib.Notifier(handler1)
+    notifier.setHandler(handler2)
+    
+    notifier.startSingle(0.005)
+    wpilib.Timer.delay(0.05)
+    
+    assert handler1.call_count == 0
+    assert handler2.call_count == 1
+    
+    notifier.free()
+
+
+def test_notifier_hal_stop(hal, hal_data):
+    handle = hal.initializeNotifier()
+    hal.updateNotifierAlarm(handle, hal.getFPGATime() + 5000)
+    assert hal.waitForNotifierAlarm(handle) != 0
+    
+    hal.stopNotifier(handle)
+    assert hal.waitForNotifierAlarm(handle) == 0
+    hal.cleanNotifier(handle)
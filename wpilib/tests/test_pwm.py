@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -163,3 +165,66 @@ def test_pwm_stopLiveWindowMode(pwm, pwm_data):
     pwm.stopLiveWindowMode()
     assert pwm_data['value'] == 0
 
+
+def test_pwmbatch(wpilib, hal_data, sim_hooks):
+    m1 = wpilib.Talon(1)
+    m2 = wpilib.Talon(2)
+    m3 = wpilib.Talon(3)
+    m2.setInverted(True)
+    m1.setExpiration(0.1)
+    m2.setExpiration(0.2)
+    
+    batch = wpilib.PWMBatch(m1, m2)
+    with pytest.raises(ValueError):
+        wpilib.PWMBatch(m2, m3)
+    
+    calls = []
+    hal_data['pwm'][1].register('value', lambda k, v: calls.append((1, v)))
+    hal_data['pwm'][2].register('value', lambda k, v: calls.append((2, v)))
+    
+    sim_hooks.time = 1.0
+    with batch:
+        m1.set(0.5)
+        m1.set(0.25)
+        m2.set(0.5)
+        # not part of the batch
+        m3.set(0.75)
+        
+        # other threads aren't staged
+        th = threading.Thread(target=m2.set, args=(0.1,))
+        th.start()
+        th.join()
+        assert hal_data['pwm'][2]['value'] == -0.1
+        calls.clear()
+        
+        assert m1.get() == 0
+        assert calls == []
+        assert hal_data['pwm'][3]['value'] == 0.75
+    
+    assert calls == [(1, 0.25), (2, -0.5)]
+    assert m1.get() == 0.25
+    assert m2.get() == -0.5
+    assert m1.safetyStopTime == pytest.approx(1.1, abs=1e-5)
+    assert m2.safetyStopTime == pytest.approx(1.2, abs=1e-5)
+    
+    # only staged values are written
+    sim_hooks.time = 2.0
+    with batch:
+        m2.set(0)
+    assert m1.get() == 0.25
+    assert m1.safetyStopTime == pytest.approx(1.1, abs=1e-5)
+    assert m2.safetyStopTime == pytest.approx(2.2, abs=1e-5)
+    
+    # outputs are discarded if the loop fails
+    with pytest.raises(RuntimeError):
+        with batch:
+            m1.set(1)
+            raise RuntimeError()
+    assert m1.get() == 0.25
+    
+    m1.set(1)
+    assert m1.get() == 1
+    
+    batch.free()
+    m2.set(1)
+    assert m2.get() == -1
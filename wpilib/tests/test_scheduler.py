@@ -0,0 +1,178 @@
+import random
+import time
+
+import pytest
+
+
+@pytest.fixture(scope='function')
+def command(wpilib):
+    import wpilib.command
+    return wpilib.command
+
+
+def _make_classes(command):
+    
+    class Sub(command.Subsystem):
+        defaults = 0
+        
+        def getDefaultCommand(self):
+            Sub.defaults += 1
+            return super().getDefaultCommand()
+        
+        def periodic(self):
+            pass
+    
+    class Cmd(command.Command):
+        def __init__(self, requirements, duration):
+            super().__init__()
+            self.setRunWhenDisabled(True)
+            for r in requirements:
+                self.requires(r)
+            self.remaining = duration
+        
+        def execute(self):
+            self.remaining -= 1
+        
+        def isFinished(self):
+            return self.remaining <= 0
+    
+    return Sub, Cmd
+
+
+def _check_ownership(scheduler, subsystems):
+    for s in subsystems:
+        current = s.getCurrentCommand()
+        if current is not None:
+            assert current in scheduler.commandTable
+            assert current.doesRequire(s)
+    
+    for c in scheduler.commandTable:
+        for s in c.getRequirements():
+            assert s.getCurrentCommand() is c
+
+
+def test_default_command(command):
+    Sub, Cmd = _make_classes(command)
+    scheduler = command.Scheduler.getInstance()
+    
+    sub = Sub()
+    default = Cmd([sub], 1000)
+    sub.setDefaultCommand(default)
+    
+    scheduler.run()
+    assert sub.getCurrentCommand() is default
+    
+    other = Cmd([sub], 2)
+    other.start()
+    scheduler.run()
+    assert sub.getCurrentCommand() is other
+    assert not default.isRunning()
+    
+    # other finishes, default comes back
+    for _ in range(3):
+        scheduler.run()
+    assert sub.getCurrentCommand() is default
+
+
+def test_default_command_blocked(command):
+    Sub, Cmd = _make_classes(command)
+    scheduler = command.Scheduler.getInstance()
+    
+    a = Sub()
+    b = Sub()
+    
+    blocker = Cmd([b], 3)
+    blocker.setInterruptible(False)
+    blocker.start()
+    scheduler.run()
+    
+    # default needs both subsystems, and can't start until b is free
+    default = Cmd([a, b], 1000)
+    a.setDefaultCommand(default)
+    scheduler.run()
+    assert a.getCurrentCommand() is None
+    
+    for _ in range(4):
+        scheduler.run()
+    
+    assert a.getCurrentCommand() is default
+    assert b.getCurrentCommand() is default
+
+
+def test_idle_run_checks_nothing(command):
+    Sub, Cmd = _make_classes(command)
+    scheduler = command.Scheduler.getInstance()
+    
+    subs = [Sub() for _ in range(20)]
+    for s in subs[:10]:
+        s.setDefaultCommand(Cmd([s], 1000))
+    
+    scheduler.run()
+    scheduler.run()
+    
+    Sub.defaults = 0
+    scheduler.run()
+    assert Sub.defaults == 0
+
+
+def _schedule_many(command, nsubs, ncommands):
+    '''
+        Schedules randomly chosen commands over many subsystems, and checks
+        which commands own each subsystem afterwards.
+        
+        :returns: seconds taken to schedule the commands, and seconds
+                  taken by an idle run
+    '''
+    
+    Sub, Cmd = _make_classes(command)
+    scheduler = command.Scheduler.getInstance()
+    rng = random.Random(5613)
+    
+    subs = [Sub() for _ in range(nsubs)]
+    for s in subs[::2]:
+        s.setDefaultCommand(Cmd([s], 1000000))
+    
+    commands = [Cmd(rng.sample(subs, rng.randint(1, 3)), rng.randint(1, 20))
+                for _ in range(ncommands)]
+    
+    # 20 commands are started each iteration
+    start = time.perf_counter()
+    for i in range(0, ncommands, 20):
+        for c in commands[i:i+20]:
+            c.start()
+        scheduler.run()
+    elapsed = time.perf_counter() - start
+    
+    _check_ownership(scheduler, subs)
+    
+    # once everything has finished, only the defaults should be running
+    for _ in range(25):
+        scheduler.run()
+    _check_ownership(scheduler, subs)
+    assert len(scheduler.commandTable) == nsubs // 2
+    
+    # .. and idle runs no longer look at every subsystem
+    Sub.defaults = 0
+    idle_start = time.perf_counter()
+    for _ in range(100):
+        scheduler.run()
+    idle_elapsed = time.perf_counter() - idle_start
+    assert Sub.defaults == 0
+    
+    return elapsed, idle_elapsed / 100
+
+
+def test_scheduler_many_commands(command):
+    _schedule_many(command, 12, 400)
+
+
+@pytest.mark.benchmark
+def test_scheduler_benchmark(command):
+    '''Schedules thousands of commands over dozens of subsystems'''
+    
+    nsubs = 48
+    ncommands = 4000
+    elapsed, idle_elapsed = _schedule_many(command, nsubs, ncommands)
+    
+    print("\n%d commands / %d subsystems: %.1fms, idle run: %.3fms" % (
+          ncommands, nsubs, elapsed*1000, idle_elapsed*1000))
@@ -22,4 +22,134 @@ def test_serial(wpilib):
     serial.write(b'some bytes')
     
     assert serial.read(4) == b'cccc'
-    
\ No newline at end of file
+    
+
+def test_ring_buffer():
+    from hal_impl.serial_helpers import RingBuffer
+    
+    rb = RingBuffer(8)
+    assert rb.write(b'abcdef') == 6
+    assert rb.read(4) == b'abcd'
+    
+    # wraps around
+    assert rb.write(b'ghijklmn') == 6
+    assert len(rb) == 8 and rb.free() == 0
+    assert rb.find(ord('h')) == 3
+    assert rb.find(ord('k')) == 6
+    assert rb.find(ord('k'), 6) == -1
+    
+    out = bytearray(5)
+    assert rb.read_into(memoryview(out)[1:]) == 4
+    assert out == b'\x00efgh'
+    assert rb.read() == b'ijkl'
+    assert len(rb) == 0
+
+
+@pytest.fixture(scope='function')
+def serial_sim(wpilib, virtual_hooks):
+    from hal_impl.serial_helpers import SerialSim
+    
+    def _make(*args, **kwargs):
+        sim = SerialSim(*args, **kwargs)
+        serial = wpilib.SerialPort(9600, wpilib.SerialPort.Port.kOnboard, simPort=sim)
+        return sim, serial
+    
+    return _make
+
+
+def test_serial_sim_read(serial_sim, virtual_hooks):
+    sim, serial = serial_sim(rx_size=16)
+    serial.setTimeout(0.5)
+    
+    assert serial.getBytesReceived() == 0
+    assert sim.feed(b'hello\nworld') == 11
+    assert serial.getBytesReceived() == 11
+    
+    # the read buffer size is 1, so whatever is there is returned
+    assert serial.read(20) == b'hello\nworld'
+    
+    sim.feed(b'hello\nworld')
+    serial.enableTermination()
+    assert serial.read(20) == b'hello\n'
+    assert serial.read(3) == b'wor'
+    serial.disableTermination()
+    
+    # waits for the read buffer to fill up, or the timeout
+    serial.setReadBufferSize(4)
+    start = virtual_hooks.getTime()
+    assert serial.readString() == 'ld'
+    assert serial.read(4) == b''
+    assert virtual_hooks.getTime() - start == pytest.approx(0.5)
+    
+    # bytes that don't fit are dropped
+    assert sim.feed(b'x'*20) == 16
+    assert sim.dropped == 4
+    
+    serial.reset()
+    assert serial.getBytesReceived() == 0
+
+
+def test_serial_sim_write(wpilib, serial_sim):
+    sim, serial = serial_sim()
+    
+    assert serial.write(b'abc') == 3
+    assert sim.written == b'abc'
+    
+    del sim.written[:]
+    serial.setWriteBufferMode(wpilib.SerialPort.WriteBufferMode.kFlushWhenFull)
+    serial.setWriteBufferSize(4)
+    serial.writeString('abc')
+    assert sim.written == b''
+    serial.writeString('defghi')
+    assert sim.written == b'abcdefgh'
+    serial.flush()
+    assert sim.written == b'abcdefghi'
+
+
+def test_serial_sim_scripted(serial_sim):
+    from hal_impl.serial_helpers import ScriptedResponder
+    
+    sim, serial = serial_sim(ScriptedResponder([
+        (b'ID?\n', b'LIDAR\n'),
+        (b'GO\n', b'OK\n'),
+    ]))
+    serial.enableTermination()
+    
+    serial.writeString('junk ID')
+    assert serial.getBytesReceived() == 0
+    serial.writeString('?\n')
+    assert serial.readString() == 'LIDAR\n'
+    
+    serial.writeString('ID?\nGO\n')
+    assert serial.readString() == 'OK\n'
+
+
+def test_serial_sim_stream(serial_sim, virtual_hooks):
+    sim, serial = serial_sim()
+    serial.setTimeout(1.0)
+    serial.setReadBufferSize(9)
+    
+    # a frame every 10ms
+    sim.stream((0.01, ('frame%03d\n' % i).encode()) for i in range(100))
+    
+    start = virtual_hooks.getTime()
+    for i in range(100):
+        assert serial.read(9) == ('frame%03d\n' % i).encode()
+    
+    assert virtual_hooks.getTime() - start == pytest.approx(1.0, abs=0.001)
+
+
+@pytest.mark.benchmark
+def test_serial_sim_benchmark(wpilib, serial_sim):
+    import timeit
+    
+    sim, serial = serial_sim(rx_size=65536)
+    frame = bytes(range(32))
+    
+    def loop():
+        for _ in range(100):
+            sim.feed(frame)
+        serial.read(3200)
+    
+    t = min(timeit.repeat(loop, number=100, repeat=3))
+    print("SerialSim: %.1fMB/s" % (3200*100 / t / 1e6))
@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+def test_virtual_delay(wpilib, virtual_hooks):
+    start = time.monotonic()
+    
+    wpilib.Timer.delay(150)
+    
+    assert time.monotonic() - start < 1
+    assert virtual_hooks.getTime() == 150
+    assert abs(wpilib.Timer.getFPGATimestamp() - 150) < 1e-6
+
+
+def test_virtual_sleepers_in_order(wpilib, virtual_hooks):
+    woken = []
+    
+    def _sleeper(name, delay):
+        wpilib.Timer.delay(delay)
+        woken.append((name, virtual_hooks.getTime()))
+    
+    threads = [threading.Thread(target=_sleeper, args=(name, delay), daemon=True)
+               for name, delay in [('c', 0.3), ('a', 0.1), ('b', 0.2)]]
+    for t in threads:
+        virtual_hooks.registerThread(t)
+        t.start()
+    
+    wpilib.Timer.delay(1)
+    
+    for t in threads:
+        t.join()
+    
+    assert woken == [('a', 0.1), ('b', 0.2), ('c', 0.3)]
+
+
+def test_virtual_notifier(wpilib, virtual_hooks):
+    calls = []
+    notifier = wpilib.Notifier(lambda: calls.append(virtual_hooks.getTime()))
+    
+    start = virtual_hooks.getTime()
+    notifier.startPeriodic(0.02)
+    wpilib.Timer.delay(10.01)
+    notifier.stop()
+    notifier.free()
+    
+    assert len(calls) == 500
+    for i, t in enumerate(calls):
+        assert abs(t - (start + 0.02*(i + 1))) < 1e-5
+
+
+def test_virtual_join_thread(wpilib, virtual_hooks):
+    t = threading.Thread(target=wpilib.Timer.delay, args=(0.5,), daemon=True)
+    virtual_hooks.registerThread(t)
+    t.start()
+    
+    # time moves while this thread waits for the other one
+    virtual_hooks.joinThread(t)
+    assert virtual_hooks.getTime() == 0.5
+
+
+def test_virtual_unregistered_thread(wpilib, virtual_hooks):
+    # a thread that isn't registered doesn't hold back time
+    event = threading.Event()
+    t = threading.Thread(target=event.wait, daemon=True)
+    t.start()
+    
+    wpilib.Timer.delay(1)
+    assert virtual_hooks.getTime() == 1
+    
+    event.set()
+    t.join()
@@ -116,7 +116,7 @@ def test_spi(wpilib):
         spi.port
     
 
-def test_adxrs450(wpilib, hal_data):
+def test_adxrs450(wpilib, hal_data, sim_hooks):
     
     gyro = wpilib.ADXRS450_Gyro()
     
@@ -124,6 +124,150 @@ def test_adxrs450(wpilib, hal_data):
     assert abs(gyro.getAngle() - 10) < 0.001
     
     hal_data['robot']['adxrs450_spi_0_rate'] = 5
+    sim_hooks.time = 1
     assert abs(gyro.getRate() - 5) < 0.001
+    assert abs(gyro.getAngle() - 15) < 0.001
     
-    
\ No newline at end of file
+    gyro.reset()
+    assert gyro.getAngle() == 0
+
+
+def test_adxrs450_fast_angle(wpilib, hal_data, sim_hooks):
+    
+    # angle changes faster than the sensor's range aren't clipped
+    gyro = wpilib.ADXRS450_Gyro()
+    
+    for i in range(1, 51):
+        hal_data['robot']['adxrs450_spi_0_angle'] = 90*i
+        sim_hooks.time = 0.02*i
+        assert abs(gyro.getAngle() - 90*i) < 0.001
+    
+    sim_hooks.time = 2
+    assert abs(gyro.getAngle() - 4500) < 0.001
+
+
+def test_adxrs450_calibrate(wpilib, hal_data, virtual_hooks):
+    
+    # with virtual time, calibrating doesn't take any real time
+    gyro = wpilib.ADXRS450_Gyro()
+    assert virtual_hooks.getTime() == pytest.approx(5.1)
+    accumulator = gyro.spi._port[0].accumulator
+    assert accumulator.center == 0
+    
+    # a gyro with a bias of 0.4 deg/s, calibrated while at rest
+    hal_data['robot']['adxrs450_spi_0_rate'] = 0.4
+    wpilib.Timer.delay(1)
+    gyro.calibrate()
+    assert accumulator.center == 32
+    
+    wpilib.Timer.delay(10)
+    assert gyro.getAngle() == 0
+    
+    # turning
+    hal_data['robot']['adxrs450_spi_0_rate'] = 90.4
+    wpilib.Timer.delay(1)
+    assert abs(gyro.getAngle() - 90) < 0.001
+    assert abs(gyro.getRate() - 90) < 0.001
+
+
+class SPIAccumulatorDevice(SPISimBase):
+    '''
+        Sends 0xA5 followed by a 12-bit value in bits 15:4 of a little
+        endian response, or 0 when the value is None
+    '''
+    
+    def __init__(self, values):
+        self.values = iter(values)
+    
+    def transactionSPI(self, port, data_to_send, data_received, size):
+        assert list(data_to_send) == [0x34, 0x12, 0]
+        value = next(self.values)
+        if value is None:
+            data_received[:] = [0, 0, 0]
+        else:
+            data_received[:] = [0xA5] + list(((value & 0xfff) << 4).to_bytes(2, 'little'))
+        return size
+
+
+def test_spi_accumulator(wpilib, sim_hooks):
+    
+    sim = SPIAccumulatorDevice([10, -3, 2, 0xa5, 7, -20, None])
+    spi = wpilib.SPI(wpilib.SPI.Port.kMXP, sim)
+    spi.initAccumulator(0.01, 0x1234, 3, 0xff, 0xa5, 12, 12, True, False)
+    spi.setAccumulatorCenter(1)
+    spi.setAccumulatorDeadband(2)
+    
+    assert spi.getAccumulatorCount() == 0
+    
+    # the first transfer is one period after init
+    sim_hooks.time = 0.0399
+    assert spi.getAccumulatorOutput() == (9 - 4, 3)
+    assert spi.getAccumulatorLastValue() == 1
+    
+    sim_hooks.time = 0.06
+    assert spi.getAccumulatorOutput() == (5 + 0xa4 + 6 - 21, 6)
+    assert spi.getAccumulatorLastValue() == -21
+    
+    # invalid responses aren't counted
+    sim_hooks.time = 0.07
+    assert spi.getAccumulatorCount() == 6
+    assert spi.getAccumulatorLastValue() == 0
+    
+    spi.resetAccumulator()
+    assert spi.getAccumulatorOutput() == (0, 0)
+    assert spi.getAccumulatorAverage() == 0
+
+
+def test_spi_accumulator_without_transaction(wpilib, sim_hooks):
+    
+    # sims that don't implement transactionSPI provide the values themselves
+    class Sim(SPISimBase):
+        def getSPIAccumulatorValue(self, port, status):
+            return 42
+    
+    spi = wpilib.SPI(wpilib.SPI.Port.kMXP, Sim())
+    spi.initAccumulator(0.01, 0x1234, 3, 0xff, 0xa5, 12, 12, True, False)
+    
+    sim_hooks.time = 1.0
+    spi.setAccumulatorCenter(1)
+    spi.setAccumulatorDeadband(2)
+    spi.resetAccumulator()
+    assert spi.getAccumulatorValue() == 42
+    
+    with pytest.raises(NotImplementedError):
+        spi.getAccumulatorCount()
+
+
+def test_adxl345_spi(wpilib, hal_data):
+    accel = wpilib.ADXL345_SPI(wpilib.SPI.Port.kMXP,
+                               wpilib.ADXL345_SPI.Range.k4G)
+    
+    hal_data['robot']['adxl345_spi_4_x'] = -0.25
+    hal_data['robot']['adxl345_spi_4_z'] = 1.0
+    
+    assert accel.getX() == -0.25
+    assert accel.getY() == 0
+    assert accel.getAccelerations() == (-0.25, 0, 1.0)
+    
+    assert accel.spi.transaction([0x80 | 0x40 | 0x32, 0, 0]) == [0, 0xC0, 0xFF]
+    
+    # without the multibyte bit, the same register is read
+    assert accel.spi.transaction([0x80 | 0x32, 0, 0]) == [0, 0xC0, 0xC0]
+    assert accel.spi.transaction([0x80 | 0x00, 0, 0]) == [0, 0xE5, 0xE5]
+
+
+def test_adxl362(wpilib, hal_data):
+    accel = wpilib.ADXL362(wpilib.ADXL362.Range.k8G)
+    assert accel.spi is not None
+    
+    hal_data['robot']['adxl362_spi_1_x'] = 1.5
+    hal_data['robot']['adxl362_spi_1_y'] = -2.0
+    hal_data['robot']['adxl362_spi_1_z'] = 10.0
+    
+    assert accel.getX() == pytest.approx(1.5)
+    assert accel.getAccelerations() == pytest.approx((1.5, -2.0, 2047*0.004))
+    
+    accel.setRange(wpilib.ADXL362.Range.k2G)
+    assert accel.getX() == pytest.approx(1.5)
+    assert accel.getY() == pytest.approx(-2.0)
+    assert accel.getZ() == pytest.approx(2.047)
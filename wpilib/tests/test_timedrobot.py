@@ -0,0 +1,101 @@
+import pytest
+
+
+class FakeDS:
+    def __init__(self):
+        self.disabled = False
+
+    def isDisabled(self):
+        return self.disabled
+
+    def isTest(self):
+        return False
+
+    def isAutonomous(self):
+        return False
+
+
+@pytest.fixture(scope='function')
+def make_robot(wpilib, hal, virtual_hooks, monkeypatch):
+
+    # don't start networktables or the driver station
+    monkeypatch.setattr(wpilib.RobotBase, '__init__', lambda self: None)
+
+    def _make_robot(loops, durations=(), **kwargs):
+
+        class Robot(wpilib.TimedRobot):
+            def __init__(self):
+                super().__init__(**kwargs)
+                self.ds = FakeDS()
+                self.times = []
+                self.inits = []
+
+            def teleopInit(self):
+                self.inits.append('teleop')
+
+            def disabledInit(self):
+                self.inits.append('disabled')
+
+            def teleopPeriodic(self):
+                n = len(self.times)
+                self.times.append(hal.getFPGATime())
+                if n < len(durations):
+                    wpilib.Timer.delay(durations[n])
+                if n + 1 == loops:
+                    self.free()
+
+        robot = Robot()
+        robot.startCompetition()
+        return robot
+
+    return _make_robot
+
+
+def test_timedrobot_period(make_robot):
+    robot = make_robot(10, period=0.005, durations=[0.001, 0.003, 0.0])
+
+    assert robot.getPeriod() == 0.005
+    assert robot.inits == ['teleop']
+
+    # every loop starts on its deadline, regardless of how long the last
+    # one took (the simulated clock is only accurate to a microsecond)
+    start = robot.times[0]
+    assert [t - start for t in robot.times] == pytest.approx([i*5000 for i in range(10)], abs=2)
+    assert robot.skippedLoops == 0
+
+
+def test_timedrobot_skip(wpilib, make_robot):
+    robot = make_robot(4, period=0.01, durations=[0.0, 0.025],
+                       policy=wpilib.TimedRobot.OverrunPolicy.kSkip)
+
+    # the loop after the long one waits for the next deadline
+    start = robot.times[0]
+    assert [t - start for t in robot.times] == pytest.approx([0, 10000, 40000, 50000], abs=2)
+    assert robot.skippedLoops == 2
+
+
+def test_timedrobot_catchup(wpilib, make_robot):
+    robot = make_robot(6, period=0.01, durations=[0.0, 0.025],
+                       policy=wpilib.TimedRobot.OverrunPolicy.kCatchUp)
+
+    # the missed loops run immediately, then it's back on schedule
+    start = robot.times[0]
+    assert [t - start for t in robot.times] == pytest.approx([0, 10000, 35000, 35000, 40000, 50000], abs=2)
+    assert robot.skippedLoops == 0
+
+
+def test_timedrobot_catchup_limit(wpilib, monkeypatch, make_robot):
+    monkeypatch.setattr(wpilib.TimedRobot, 'maxCatchUp', 1)
+    robot = make_robot(4, period=0.01, durations=[0.0, 0.035],
+                       policy=wpilib.TimedRobot.OverrunPolicy.kCatchUp)
+
+    start = robot.times[0]
+    assert [t - start for t in robot.times] == pytest.approx([0, 10000, 45000, 50000], abs=2)
+    assert robot.skippedLoops == 2
+
+
+def test_timedrobot_invalid(wpilib):
+    with pytest.raises(ValueError):
+        wpilib.TimedRobot(period=0)
+    with pytest.raises(ValueError):
+        wpilib.TimedRobot(policy=42)
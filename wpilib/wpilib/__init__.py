@@ -1,79 +1,160 @@
 '''
     This is the core of WPILib.
+    
+    Submodules are imported the first time that something in them is
+    accessed (``wpilib.Joystick``, ``from wpilib import Joystick``), so
+    that robots only pay the import cost for the parts of WPILib that
+    they actually use. On Python versions older than 3.7, which don't
+    support module-level ``__getattr__``, everything is imported when
+    wpilib is imported.
+    
+    To see how long each submodule takes to import, run
+    ``python3 -m wpilib._impl.importtime``
 '''
 
-from .adxl345_i2c import *
-from .adxl345_spi import *
-from .adxl362 import *
-from .adxrs450_gyro import *
-from .analogaccelerometer import *
-from .analoginput import *
-from .analoggyro import *
-from .analogoutput import *
-from .analogpotentiometer import *
-from .analogtrigger import *
-from .analogtriggeroutput import *
-from .builtinaccelerometer import *
-from .cameraserver import *
-from .canjaguar import *
-from .cantalon import *
-from .compressor import *
-from .controllerpower import *
-from .counter import *
-from .digitalglitchfilter import *
-from .digitalinput import *
-from .digitaloutput import *
-from .digitalsource import *
-from .doublesolenoid import *
-from .drive import *
-from .driverstation import *
-from .encoder import *
-from .filter import *
-from .geartooth import *
-from .gyrobase import *
-from .i2c import *
-from .interruptablesensorbase import *
-from .iterativerobot import *
-from .jaguar import *
-from .joystick import *
-from .lineardigitalfilter import *
-from .livewindow import *
-from .livewindowsendable import *
-from .motorsafety import *
-from .pidcontroller import *
-from .powerdistributionpanel import *
-from .preferences import *
-from .pwm import *
-from .pwmspeedcontroller import *
-from .pwmtalonsrx import *
-from .relay import *
-from .resource import *
-from .robotbase import *
-from .robotdrive import *
-from .robotstate import *
-from .safepwm import *
-from .samplerobot import *
-from .sd540 import *
-from .sendable import *
-from .sendablechooser import *
-from .sensorbase import *
-from .serialport import *
-from .servo import *
-from .smartdashboard import *
-from .solenoidbase import *
-from .solenoid import *
-from .spark import *
-from .speedcontrollergroup import *
-from .spi import *
-from .talon import *
-from .timer import *
-from .ultrasonic import *
-from .utility import *
-from .victor import *
-from .victorsp import *
-from .xboxcontroller import *
+import importlib as _importlib
+import sys as _sys
 
-from ._impl.main import run
+#: Maps each name exported by wpilib to the submodule that it lives in
+_lazy_names = {
+    'ADXL345_I2C':             'adxl345_i2c',
+    'ADXL345_SPI':             'adxl345_spi',
+    'ADXL362':                 'adxl362',
+    'ADXRS450_Gyro':           'adxrs450_gyro',
+    'AnalogAccelerometer':     'analogaccelerometer',
+    'AnalogInput':             'analoginput',
+    'AnalogGyro':              'analoggyro',
+    'AnalogOutput':            'analogoutput',
+    'AnalogPotentiometer':     'analogpotentiometer',
+    'AnalogTrigger':           'analogtrigger',
+    'AnalogTriggerOutput':     'analogtriggeroutput',
+    'BuiltInAccelerometer':    'builtinaccelerometer',
+    'CameraServer':            'cameraserver',
+    'CANJaguar':               'canjaguar',
+    'CANTalon':                'cantalon',
+    'Compressor':              'compressor',
+    'ControllerPower':         'controllerpower',
+    'Counter':                 'counter',
+    'DigitalGlitchFilter':     'digitalglitchfilter',
+    'DigitalInput':            'digitalinput',
+    'DigitalOutput':           'digitaloutput',
+    'DigitalSource':           'digitalsource',
+    'DoubleSolenoid':          'doublesolenoid',
+    'DifferentialDrive':       'drive',
+    'KilloughDrive':           'drive',
+    'MecanumDrive':            'drive',
+    'RobotDriveBase':          'drive',
+    'Vector2d':                'drive',
+    'DriverStation':           'driverstation',
+    'Encoder':                 'encoder',
+    'Filter':                  'filter',
+    'GearTooth':               'geartooth',
+    'GyroBase':                'gyrobase',
+    'I2C':                     'i2c',
+    'InterruptableSensorBase': 'interruptablesensorbase',
+    'IterativeRobot':          'iterativerobot',
+    'Jaguar':                  'jaguar',
+    'Joystick':                'joystick',
+    'LinearDigitalFilter':     'lineardigitalfilter',
+    'LiveWindow':              'livewindow',
+    'LiveWindowSendable':      'livewindowsendable',
+    'MotorSafety':             'motorsafety',
+    'Notifier':                'notifier',
+    'PIDController':           'pidcontroller',
+    'PowerDistributionPanel':  'powerdistributionpanel',
+    'Preferences':             'preferences',
+    'PWM':                     'pwm',
+    'PWMBatch':                'pwmbatch',
+    'PWMSpeedController':      'pwmspeedcontroller',
+    'PWMTalonSRX':             'pwmtalonsrx',
+    'Relay':                   'relay',
+    'Resource':                'resource',
+    'RobotBase':               'robotbase',
+    'RobotDrive':              'robotdrive',
+    'RobotState':              'robotstate',
+    'SafePWM':                 'safepwm',
+    'SampleRobot':             'samplerobot',
+    'SD540':                   'sd540',
+    'Sendable':                'sendable',
+    'SendableChooser':         'sendablechooser',
+    'SensorBase':              'sensorbase',
+    'SerialPort':              'serialport',
+    'Servo':                   'servo',
+    'SmartDashboard':          'smartdashboard',
+    'SolenoidBase':            'solenoidbase',
+    'Solenoid':                'solenoid',
+    'Spark':                   'spark',
+    'SpeedControllerGroup':    'speedcontrollergroup',
+    'SPI':                     'spi',
+    'Talon':                   'talon',
+    'TimedRobot':              'timedrobot',
+    'Timer':                   'timer',
+    'Ultrasonic':              'ultrasonic',
+    'Utility':                 'utility',
+    'Victor':                  'victor',
+    'VictorSP':                'victorsp',
+    'XboxController':          'xboxcontroller',
+    'run':                     '_impl.main',
+    
+    # This was exported by accident by xboxcontroller, but is used
+    'GenericHID':              'interfaces',
+}
+
+__all__ = list(_lazy_names)
+
+#: Modules that leaked out of the submodules when everything was imported
+#: eagerly. They still work for now, but give a DeprecationWarning.
+_deprecated_names = {
+    'hal':                     ('hal', 'import hal'),
+    'math':                    ('math', 'import math'),
+    'differentialdrive':       ('.drive.differentialdrive', 'wpilib.drive.differentialdrive'),
+    'killoughdrive':           ('.drive.killoughdrive', 'wpilib.drive.killoughdrive'),
+    'mecanumdrive':            ('.drive.mecanumdrive', 'wpilib.drive.mecanumdrive'),
+    'robotdrivebase':          ('.drive.robotdrivebase', 'wpilib.drive.robotdrivebase'),
+    'vector2d':                ('.drive.vector2d', 'wpilib.drive.vector2d'),
+}
+
+
+def __getattr__(name):
+    modname = _lazy_names.get(name)
+    if modname is None:
+        if name.startswith('__'):
+            raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
+        
+        deprecated = _deprecated_names.get(name)
+        if deprecated is not None:
+            import warnings
+            warnings.warn("wpilib.%s is deprecated, use %s instead" % (name, deprecated[1]),
+                          DeprecationWarning, stacklevel=2)
+            return _importlib.import_module(deprecated[0], __name__)
+        
+        # Submodules were always available as attributes when everything
+        # was imported eagerly, so keep that working
+        try:
+            return _importlib.import_module('.' + name, __name__)
+        except ImportError as e:
+            if getattr(e, 'name', None) != __name__ + '.' + name:
+                raise
+            raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name)) from None
+    
+    value = getattr(_importlib.import_module('.' + modname, __name__), name)
+    
+    # only look each name up once
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names))
+
+
+if _sys.version_info < (3, 7):
+    for _name in _lazy_names:
+        __getattr__(_name)
+    # these can't warn without module-level __getattr__
+    for _name, (_modname, _) in _deprecated_names.items():
+        globals()[_name] = _importlib.import_module(_modname, __name__)
+    del _name, _modname
 
 try:
     from .version import __version__
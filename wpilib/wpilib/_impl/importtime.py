@@ -0,0 +1,113 @@
+# novalidate
+'''
+    Measures how long it takes to import each wpilib submodule, so that
+    import time can be tracked across releases. Run it like so::
+
+        python3 -m wpilib._impl.importtime [--isolated] [--json] [submodule ...]
+
+    Measurements are done in a fresh interpreter. By default, all of the
+    submodules are imported one after another in a single interpreter, so
+    each submodule is only charged for the modules that it was the first
+    to import. With ``--isolated``, each submodule is imported in its own
+    interpreter, which is slower but gives the full cost of using just
+    that submodule.
+'''
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+__all__ = ["get_submodules", "measure", "report"]
+
+_script = '''
+import json, sys, time
+results = []
+t = time.perf_counter()
+import wpilib
+results.append(('wpilib', time.perf_counter() - t))
+for modname in sys.argv[1:]:
+    t = time.perf_counter()
+    __import__('wpilib.' + modname)
+    results.append((modname, time.perf_counter() - t))
+print(json.dumps(results))
+'''
+
+
+def get_submodules():
+    ''':returns: sorted list of the submodules that wpilib exports names from'''
+    import wpilib
+    return sorted(set(wpilib._lazy_names.values()))
+
+
+def _run(submodules, python):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+
+    output = subprocess.check_output([python, '-c', _script] + list(submodules),
+                                     env=env, universal_newlines=True)
+    return [tuple(r) for r in json.loads(output.splitlines()[-1])]
+
+
+def measure(submodules=None, isolated=False, python=sys.executable):
+    '''
+        Measures the import time of wpilib submodules
+
+        :param submodules: Names of the submodules to import (such as
+                           'timer'). If None, all submodules are measured.
+        :param isolated: If True, each submodule is measured in a separate
+                         interpreter
+        :param python: The python interpreter to run
+
+        :returns: list of (name, seconds). The first entry is the time
+                  that it took to import the wpilib package itself.
+    '''
+    if submodules is None:
+        submodules = get_submodules()
+
+    if not isolated:
+        return _run(submodules, python)
+
+    results = None
+    for submodule in submodules:
+        r = _run([submodule], python)
+        if results is None:
+            results = r
+        else:
+            results.append(r[1])
+
+    return results or _run([], python)
+
+
+def report(results, file=sys.stdout):
+    '''Prints the results of :func:`measure`, slowest first'''
+    total = sum(t for _, t in results)
+
+    print("%-28s %10s %7s" % ("module", "time (ms)", "%"), file=file)
+    for name, t in sorted(results, key=lambda r: r[1], reverse=True):
+        print("%-28s %10.2f %6.1f%%" % (name, t * 1000.0, 100.0 * t / total if total else 0),
+              file=file)
+    print("%-28s %10.2f" % ("total", total * 1000.0), file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measures wpilib import times")
+    parser.add_argument('submodules', nargs='*',
+                        help="Submodules to measure (default: all of them)")
+    parser.add_argument('--isolated', action='store_true', default=False,
+                        help="Import each submodule in a separate interpreter")
+    parser.add_argument('--json', action='store_true', default=False,
+                        help="Output results as JSON")
+
+    options = parser.parse_args(argv)
+
+    results = measure(options.submodules or None, options.isolated)
+    if options.json:
+        print(json.dumps(dict(results), indent=2))
+    else:
+        report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+# novalidate
+'''
+    Measures how long each phase of the robot's main loop takes, so that
+    it is easy to find out what is making a loop run long.
+'''
+
+import array
+import collections
+import contextlib
+import functools
+import threading
+
+from ..timer import Timer
+
+import logging
+logger = logging.getLogger('wpilib.profiler')
+
+__all__ = ["LoopProfiler", "PhaseStats", "profiled"]
+
+
+#: Statistics for a single phase, in seconds. ``count`` is the number of
+#: samples that the other values were computed from.
+PhaseStats = collections.namedtuple('PhaseStats', ['count', 'min', 'avg', 'p99', 'max'])
+
+
+class _Phase:
+    __slots__ = ['name', 'samples', 'index', 'count', 'elapsed', 'ran']
+
+    def __init__(self, name, size):
+        self.name = name
+        self.samples = array.array('d', bytes(8*size))
+        self.index = 0
+        self.count = 0
+        self.elapsed = 0.0
+        self.ran = False
+
+    def record(self, value):
+        samples = self.samples
+        samples[self.index] = value
+        self.index = (self.index + 1) % len(samples)
+        if self.count < len(samples):
+            self.count += 1
+
+    def stats(self):
+        count = self.count
+        if count == 0:
+            return PhaseStats(0, 0.0, 0.0, 0.0, 0.0)
+
+        values = sorted(self.samples[:count])
+        p99 = values[min(count - 1, int(count*0.99))]
+        return PhaseStats(count, values[0], sum(values)/count, p99, values[-1])
+
+
+class LoopProfiler:
+    '''
+        Records how long each phase of a loop takes into a fixed-size ring
+        buffer, and warns when a loop takes longer than its budget.
+
+        Phases may be nested: the time spent in a nested phase is not
+        counted towards the phase that it was started from. For example,
+        when ``teleopPeriodic`` calls ``Scheduler.run``, the time spent
+        in ``Scheduler.run`` is only charged to ``Scheduler.run``.
+
+        :class:`.IterativeRobot` creates one of these for its main loop,
+        which can be accessed via its ``profiler`` attribute. Functions
+        decorated with :func:`profiled` (such as ``Scheduler.run`` and
+        ``LiveWindow.run``) are recorded as separate phases when they are
+        called from inside that loop, on the thread that runs the loop.
+    '''
+
+    # The profiler for the loop that each thread is running, if any
+    _local = threading.local()
+
+    @staticmethod
+    def getActive():
+        '''
+            :returns: the profiler for the loop that is running on the
+                      current thread, or None
+        '''
+        return getattr(LoopProfiler._local, 'active', None)
+
+    def __init__(self, budget=0.02, size=256, warningInterval=1.0):
+        '''
+            :param budget: How long (in seconds) a loop is allowed to take
+                           before a warning is logged
+            :param size: Number of samples to keep for each phase
+            :param warningInterval: Minimum number of seconds between
+                                    overrun warnings
+        '''
+        if size <= 0:
+            raise ValueError("Invalid size %s" % size)
+
+        self.budget = budget
+        self.size = size
+        self.warningInterval = warningInterval
+
+        #: Number of loops that took longer than the budget
+        self.overruns = 0
+
+        self.lastWarning = None
+        self.phases = collections.OrderedDict()
+        self.loop = _Phase('loop', size)
+        self.stack = []
+        self.loopStart = None
+        self.last = 0.0
+
+    def startLoop(self):
+        '''Call at the beginning of each loop'''
+        self.loopStart = self.last = Timer.getFPGATimestamp()
+        del self.stack[:]
+        LoopProfiler._local.active = self
+
+    def endLoop(self):
+        '''
+            Call at the end of each loop. Records the time taken by each
+            phase that ran, and warns if the loop went over budget.
+
+            :returns: how long the loop took, in seconds
+        '''
+        local = LoopProfiler._local
+        if getattr(local, 'active', None) is self:
+            local.active = None
+
+        if self.loopStart is None:
+            return 0.0
+
+        now = Timer.getFPGATimestamp()
+        total = now - self.loopStart
+        self.loopStart = None
+        self.loop.record(total)
+
+        slowest = None
+        slowestTime = 0.0
+        for phase in self.phases.values():
+            if phase.ran:
+                phase.record(phase.elapsed)
+                if slowest is None or phase.elapsed > slowestTime:
+                    slowest = phase.name
+                    slowestTime = phase.elapsed
+                phase.elapsed = 0.0
+                phase.ran = False
+
+        if total > self.budget:
+            self._overrun(now, total, slowest, slowestTime)
+
+        return total
+
+    def enter(self, name):
+        '''Starts timing the phase called name'''
+        now = Timer.getFPGATimestamp()
+        stack = self.stack
+        if stack:
+            stack[-1].elapsed += now - self.last
+
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(name, self.size)
+
+        phase.ran = True
+        stack.append(phase)
+        self.last = now
+
+    def exit(self):
+        '''Stops timing the phase that was most recently entered'''
+        now = Timer.getFPGATimestamp()
+        self.stack.pop().elapsed += now - self.last
+        self.last = now
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''
+            Context manager that times the code inside of it as the phase
+            called name::
+
+                with profiler.phase('teleopPeriodic'):
+                    self.teleopPeriodic()
+        '''
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def getStats(self):
+        '''
+            :returns: ordered dictionary of phase name: :class:`PhaseStats`.
+                      The 'loop' entry is the time that the entire loop took.
+        '''
+        stats = collections.OrderedDict()
+        stats['loop'] = self.loop.stats()
+        for name, phase in self.phases.items():
+            stats[name] = phase.stats()
+        return stats
+
+    def exportToSmartDashboard(self, prefix='LoopProfiler'):
+        '''
+            Puts the statistics for each phase on the SmartDashboard, in
+            milliseconds. Keys look like ``LoopProfiler/teleopPeriodic/avg``.
+        '''
+        from ..smartdashboard import SmartDashboard
+
+        for name, stats in self.getStats().items():
+            key = '%s/%s/' % (prefix, name)
+            SmartDashboard.putNumber(key + 'min', stats.min*1000.0)
+            SmartDashboard.putNumber(key + 'avg', stats.avg*1000.0)
+            SmartDashboard.putNumber(key + 'p99', stats.p99*1000.0)
+
+        SmartDashboard.putNumber(prefix + '/overruns', self.overruns)
+
+    def reset(self):
+        '''Discards all recorded samples'''
+        self.overruns = 0
+        self.lastWarning = None
+        self.phases.clear()
+        self.loop = _Phase('loop', self.size)
+
+    def _overrun(self, now, total, slowest, slowestTime):
+        self.overruns += 1
+
+        # only emit warning once per warningInterval
+        if self.lastWarning is None or now - self.lastWarning >= self.warningInterval:
+            self.lastWarning = now
+            if slowest is None:
+                logger.warning("Loop time of %.3fs overran budget of %.3fs (%d overruns)",
+                               total, self.budget, self.overruns)
+            else:
+                logger.warning("Loop time of %.3fs overran budget of %.3fs (%d overruns); "
+                               "slowest phase was %s (%.3fs)",
+                               total, self.budget, self.overruns,
+                               slowest, slowestTime)
+
+
+def profiled(name):
+    '''
+        Decorator that records calls to a function as a phase of the
+        currently running :class:`LoopProfiler`. When there is no active
+        profiler, the function is called directly.
+    '''
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = getattr(LoopProfiler._local, 'active', None)
+            if profiler is None:
+                return fn(*args, **kwargs)
+
+            with profiler.phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
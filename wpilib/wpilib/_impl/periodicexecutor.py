@@ -0,0 +1,207 @@
+# novalidate
+'''
+    A deadline-ordered periodic executor that runs many periodic tasks on
+    a single thread. This is an alternative to creating one TimerTask
+    thread per PIDController.
+'''
+
+import hal
+import heapq
+import itertools
+import threading
+
+from ..timer import Timer
+
+import logging
+logger = logging.getLogger('wpilib.executor')
+
+__all__ = ["PeriodicExecutor"]
+
+
+class ExecutorTask:
+    '''
+        A task that has been registered with a :class:`PeriodicExecutor`.
+
+        This has the same start/cancel interface as
+        :class:`.TimerTask`, so it can be used as a drop-in replacement.
+    '''
+
+    def __init__(self, executor, name, period, task_fn):
+        if period <= 0:
+            raise ValueError("Invalid period %s" % period)
+
+        self.executor = executor
+        self.name = name
+        self.period = period
+        self.task_fn = task_fn
+
+        self.logger = logging.getLogger('wpilib.%s' % name)
+
+        #: Number of times this task has not completed before its next
+        #: deadline
+        self.overruns = 0
+
+        #: How late (in seconds) the task was the last time it overran
+        self.last_overrun = 0.0
+
+        self.last_warning = -10
+        self.deadline = None
+        self.stopped = True
+
+    def start(self):
+        self.executor._add(self)
+
+    def cancel(self):
+        self.executor._remove(self)
+
+
+class PeriodicExecutor:
+    '''
+        Runs periodic tasks on a single thread. Tasks are kept in a heap
+        ordered by their next deadline, so the thread only ever wakes up
+        when a task is due. Each task has its own period.
+
+        The thread is started when the first task is added, and exits when
+        there are no more tasks to run. Adding or removing a task wakes the
+        thread up, so a task with an earlier deadline is not delayed by the
+        task the thread was waiting for.
+    '''
+
+    _instance = None
+
+    @classmethod
+    def getInstance(cls):
+        '''Returns the executor shared by all users that opt into it'''
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, name='PeriodicExecutor'):
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._heap = []
+        self._tasks = set()
+        self._seq = itertools.count()
+        self._thread = None
+        self._current = None
+
+    def schedule(self, name, period, task_fn):
+        '''
+            Registers a new task and starts running it
+
+            :param name: Name of the task, used for logging
+            :param period: How often to run the task, in seconds
+            :param task_fn: Function to call each period
+
+            :returns: an :class:`ExecutorTask`, call ``cancel()`` to stop it
+        '''
+        task = ExecutorTask(self, name, period, task_fn)
+        task.start()
+        return task
+
+    def getTasks(self):
+        ''':returns: a list of the tasks currently registered'''
+        with self._cond:
+            return list(self._tasks)
+
+    def getOverruns(self):
+        ''':returns: dictionary of task name: number of overruns'''
+        with self._cond:
+            return {task.name: task.overruns for task in self._tasks}
+
+    def _add(self, task):
+        with self._cond:
+            if not task.stopped:
+                return
+
+            task.stopped = False
+            task.deadline = Timer.getFPGATimestamp() + task.period
+            self._tasks.add(task)
+            self._push(task)
+            hal.notifyCondition(self._cond)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name,
+                                                daemon=True)
+                hal.registerThread(self._thread)
+                self._thread.start()
+
+    def _remove(self, task):
+        with self._cond:
+            task.stopped = True
+            self._tasks.discard(task)
+            hal.notifyCondition(self._cond)
+
+            # like TimerTask.cancel, don't return until the task is done
+            # running, unless the task is cancelling itself
+            if threading.current_thread() is not self._thread:
+                while self._current is task:
+                    hal.waitForCondition(self._cond)
+
+    def _push(self, task):
+        heapq.heappush(self._heap, (task.deadline, next(self._seq), task))
+
+    def _run(self):
+
+        logger.info("Executor started")
+
+        try:
+            while True:
+
+                with self._cond:
+                    heap = self._heap
+
+                    while True:
+                        # Cancelled tasks are lazily removed from the heap
+                        while heap and (heap[0][2].stopped or heap[0][0] != heap[0][2].deadline):
+                            heapq.heappop(heap)
+
+                        if not heap:
+                            self._thread = None
+                            return
+
+                        deadline, _, task = heap[0]
+
+                        now = Timer.getFPGATimestamp()
+                        if deadline <= now:
+                            break
+
+                        # Woken early when a task is added or removed. The
+                        # FPGA clock only has microsecond resolution, so
+                        # wait for at least that long to make progress
+                        hal.waitForCondition(self._cond, max(deadline - now, 0.000001))
+
+                    heapq.heappop(heap)
+                    self._current = task
+
+                try:
+                    task.task_fn()
+                except Exception:
+                    task.logger.exception("Unhandled exception in periodic task")
+                finally:
+                    now = Timer.getFPGATimestamp()
+
+                    with self._cond:
+                        self._current = None
+                        hal.notifyCondition(self._cond)
+
+                        if not task.stopped:
+                            task.deadline = deadline + task.period
+                            if task.deadline < now:
+                                self._overrun(task, now)
+                                task.deadline = now
+
+                            self._push(task)
+        finally:
+            logger.info("Executor exited")
+
+    def _overrun(self, task, now):
+        task.overruns += 1
+        task.last_overrun = now - task.deadline
+
+        # only emit warning once per second per task
+        if now - task.last_warning > 1:
+            task.last_warning = now
+            task.logger.warning("Missed deadline by %02f (%d overruns: too much going on?)",
+                                task.last_overrun, task.overruns)
@@ -4,6 +4,7 @@
     the PID Controller
 '''
 
+import hal
 import threading
 from ..timer import Timer
 
@@ -25,9 +26,13 @@ class TimerTask(threading.Thread):
         
         self.stopped = False
     
+    def start(self):
+        hal.registerThread(self)
+        super().start()
+    
     def cancel(self):
         self.stopped = True
-        self.join()
+        hal.joinThread(self)
     
     def run(self):
         
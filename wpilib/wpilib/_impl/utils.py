@@ -19,12 +19,201 @@ def match_arglist(name, args, kwargs, templates, allow_extra_kwargs=False):
 
     Each element in the list should be a tuple, corresponding to an argument name,
     and argument type condition. See types_match() for argument type condition structures.
+    
+    The templates are compiled into an :class:`ArgListMatcher` the first time
+    that they are seen for a given name. Callers should pass the same
+    templates object each time, though equal templates work too.
 
     :returns The id of the selected template
     :returns A dictionary of argument name, value tuples.
     :
     """
-    return __match_arglist(name, args, kwargs, templates, False, allow_extra_kwargs)
+    key = (name, allow_extra_kwargs)
+    matcher = _matchers.get(key)
+    if matcher is None or (matcher.templates is not templates and
+                           matcher.templates != templates):
+        matcher = _matchers[key] = ArgListMatcher(name, templates, allow_extra_kwargs)
+    return matcher.match(args, kwargs)
+
+#: key: (name, allow_extra_kwargs), value: ArgListMatcher
+_matchers = {}
+
+def _class_has(cls, attr):
+    return any(attr in vars(k) for k in cls.__mro__)
+
+def _is_plain(value):
+    '''True if value can't have attributes that its type doesn't have'''
+    return type(value) is value.__class__ and \
+           not hasattr(value, '__dict__') and \
+           not hasattr(type(value), '__getattr__')
+
+
+class _Condition:
+    '''A type condition (see :func:`types_match`), compiled into a check'''
+    
+    __slots__ = ['types', 'attrs', 'subconditions', 'always']
+    
+    def __init__(self, type_structure):
+        self.types = ()
+        self.attrs = None
+        self.subconditions = ()
+        self.always = False
+        
+        if type_structure is None:
+            self.always = True
+        elif hasattr(type_structure, "matches"):
+            self.attrs = type_structure
+        elif isinstance(type_structure, list) and len(type_structure) != 0:
+            self.types = tuple(t for t in type_structure if isinstance(t, type))
+            self.subconditions = tuple(_Condition(t) for t in type_structure
+                                       if not isinstance(t, type))
+            self.always = any(c.always for c in self.subconditions)
+        else:
+            self.types = type_structure
+    
+    def check(self, value):
+        '''
+            :returns: (matches, cacheable). If cacheable is True, then any
+                      other value of the same type gives the same result
+        '''
+        if self.always:
+            return True, True
+        
+        if self.types and isinstance(value, self.types):
+            return True, type(value) is value.__class__
+        
+        cacheable = type(value) is value.__class__
+        
+        if self.attrs is not None:
+            matches = self.attrs.matches(value)
+            if not isinstance(self.attrs, HasAttribute):
+                return matches, False
+            
+            # Attributes that are on the class are on every instance. If
+            # they aren't, instances of some types can still have them
+            on_class = all(_class_has(type(value), a) for a in self.attrs.conditions)
+            if matches:
+                return True, cacheable and on_class
+            return False, cacheable and not on_class and _is_plain(value)
+        
+        # The result only depends on the type if the condition that matched
+        # does, or if all of the conditions that didn't match do
+        all_cacheable = cacheable
+        for c in self.subconditions:
+            matches, c_cacheable = c.check(value)
+            if matches:
+                return True, cacheable and c_cacheable
+            all_cacheable = all_cacheable and c_cacheable
+        
+        return False, all_cacheable
+
+
+class ArgListMatcher:
+    '''
+        A precompiled version of :func:`match_arglist`. Which template
+        can possibly match is only determined by the number of positional
+        arguments and the names of the keyword arguments, so the templates
+        are sorted into a dispatch table keyed on those. The winning
+        template for each combination of argument types is also cached,
+        as long as the type conditions only depend on the types of the
+        arguments.
+    '''
+    
+    #: Maximum number of argument type combinations that are cached
+    max_cache_size = 64
+    
+    def __init__(self, name, templates, allow_extra_kwargs=False):
+        self.name = name
+        self.templates = templates
+        self.allow_extra_kwargs = allow_extra_kwargs
+        
+        self._conditions = [[(arg_name, _Condition(tc)) for arg_name, tc in template]
+                            for template in templates]
+        
+        # key: (nargs, frozenset of kwarg names), value: list of candidates
+        self._dispatch = {}
+        
+        # key: (nargs, kwarg names, types), value: candidate
+        self._cache = {}
+    
+    def _candidates(self, nargs, kwnames):
+        '''Finds the templates that can match the shape of an argument list'''
+        candidates = []
+        
+        for i, template in enumerate(self._conditions):
+            plan = []
+            pos = 0
+            used = 0
+            kwarg_found = False
+            
+            # Same rules as __match_arglist
+            for arg_name, condition in template:
+                if arg_name in kwnames:
+                    plan.append((arg_name, None, arg_name, condition))
+                    used += 1
+                    kwarg_found = True
+                elif not kwarg_found and pos < nargs:
+                    plan.append((arg_name, pos, None, condition))
+                    pos += 1
+                else:
+                    plan.append((arg_name, None, None, condition))
+            
+            if pos == nargs and (used == len(kwnames) or self.allow_extra_kwargs):
+                candidates.append((i, plan))
+        
+        return candidates
+    
+    def match(self, args, kwargs):
+        '''
+            Same as :func:`match_arglist`
+            
+            :returns: (template index, dictionary of argument name: value)
+        '''
+        kwnames = tuple(kwargs)
+        
+        types = tuple(map(type, args)) + tuple(map(type, kwargs.values()))
+        key = (len(args), kwnames, types)
+        candidate = self._cache.get(key)
+        
+        if candidate is None:
+            shape = (len(args), frozenset(kwnames))
+            candidates = self._dispatch.get(shape)
+            if candidates is None:
+                candidates = self._dispatch[shape] = self._candidates(*shape)
+            
+            cacheable = True
+            
+            for candidate in candidates:
+                for arg_name, pos, kwname, condition in candidate[1]:
+                    if pos is not None:
+                        value = args[pos]
+                    elif kwname is not None:
+                        value = kwargs[kwname]
+                    else:
+                        value = None
+                    
+                    matches, c_cacheable = condition.check(value)
+                    cacheable = cacheable and c_cacheable
+                    if not matches:
+                        break
+                else:
+                    break
+            else:
+                # We found nothing, then... but we need to give the user a good
+                # error message, so run it again in verbose mode, then raise the error!
+                _verbose_match_arglist(self.name, args, kwargs, self.templates, True)
+            
+            if cacheable and len(self._cache) < self.max_cache_size:
+                self._cache[key] = candidate
+        
+        output = kwargs.copy()
+        for arg_name, pos, kwname, _ in candidate[1]:
+            if pos is not None:
+                output[arg_name] = args[pos]
+            elif kwname is None:
+                output[arg_name] = None
+        
+        return candidate[0], output
     
 def __match_arglist(name, args, kwargs, templates, err, allow_extra_kwargs=False):
 
@@ -112,6 +301,8 @@ def __match_arglist(name, args, kwargs, templates, err, allow_extra_kwargs=False
         print("*"*50)
         raise ValueError("Attribute error, attributes given did not match any argument templates. See messages above for more info")
 
+_verbose_match_arglist = __match_arglist
+
 def types_match(object, type_structure):
     """
     :param object: the object to check
@@ -170,6 +361,12 @@ def typematch_to_str(type_structure):
 class HasAttribute:
     def __init__(self, *args):
         self.conditions = args[:]
+    
+    def __eq__(self, other):
+        return isinstance(other, HasAttribute) and self.conditions == other.conditions
+    
+    def __hash__(self):
+        return hash(self.conditions)
 
     def matches(self, object):
         for attribute in self.conditions:
@@ -200,8 +397,17 @@ def reset_wpilib():
         except KeyError:
             continue
         
-        for _, cls in inspect.getmembers(module, inspect.isclass):
-            if hasattr(cls, '_reset'):
+        if modname == 'wpilib':
+            # Only look at the parts of wpilib that have been imported,
+            # accessing anything else would import it
+            members = [getattr(module, name)
+                       for name, submodule in module._lazy_names.items()
+                       if 'wpilib.' + submodule in sys.modules]
+        else:
+            members = [cls for _, cls in inspect.getmembers(module)]
+        
+        for cls in members:
+            if inspect.isclass(cls) and hasattr(cls, '_reset'):
                 cls._reset()
                 
     import hal_impl.functions
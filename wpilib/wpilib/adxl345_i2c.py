@@ -56,7 +56,12 @@ class ADXL345_I2C(SensorBase):
         if address is None:
             address = self.kAddress
         
-        self.i2c = I2C(port, address)
+        simPort = None
+        if hal.HALIsSimulation():
+            from hal_impl.i2c_helpers import ADXL345_I2C_Sim
+            simPort = ADXL345_I2C_Sim(self)
+        
+        self.i2c = I2C(port, address, simPort=simPort)
 
         # Turn on the measurements
         self.i2c.write(self.kPowerCtlRegister, self.kPowerCtl_Measure)
@@ -125,7 +130,7 @@ class ADXL345_I2C(SensorBase):
         """
         data = self.i2c.read(self.kDataRegister + axis, 2)
         # Sensor is little endian... swap bytes
-        rawAccel = (data[1] << 8) | data[0]
+        rawAccel = int.from_bytes(data, 'little', signed=True)
         return rawAccel * self.kGsPerLSB
 
     def getAccelerations(self):
@@ -139,7 +144,7 @@ class ADXL345_I2C(SensorBase):
         # Sensor is little endian... swap bytes
         rawData = []
         for i in range(3):
-            rawData.append((data[i*2+1] << 8) | data[i*2])
+            rawData.append(int.from_bytes(data[i*2:i*2+2], 'little', signed=True))
 
         return (rawData[0] * self.kGsPerLSB,
                 rawData[1] * self.kGsPerLSB,
@@ -57,7 +57,12 @@ class ADXL345_SPI(SensorBase):
         :param range: The range (+ or -) that the accelerometer will measure.
         :type range: :class:`.ADXL345_SPI.Range`
         """
-        self.spi = SPI(port)
+        simPort = None
+        if hal.HALIsSimulation():
+            from hal_impl.spi_helpers import ADXL345_SPI_Sim
+            simPort = ADXL345_SPI_Sim(self)
+        
+        self.spi = SPI(port, simPort=simPort)
         self.spi.setClockRate(500000)
         self.spi.setMSBFirst()
         self.spi.setSampleDataOnFalling()
@@ -133,7 +138,7 @@ class ADXL345_SPI(SensorBase):
                  self.kDataRegister) + axis, 0, 0]
         data = self.spi.transaction(data)
         # Sensor is little endian... swap bytes
-        rawAccel = (data[2] << 8) | data[1]
+        rawAccel = int.from_bytes(data[1:3], 'little', signed=True)
         return rawAccel * self.kGsPerLSB
 
     def getAccelerations(self):
@@ -151,7 +156,7 @@ class ADXL345_SPI(SensorBase):
         # Sensor is little endian... swap bytes
         rawData = []
         for i in range(3):
-            rawData.append((data[i*2+2] << 8) | data[i*2+1])
+            rawData.append(int.from_bytes(data[i*2+1:i*2+3], 'little', signed=True))
 
         return (rawData[0] * self.kGsPerLSB,
                 rawData[1] * self.kGsPerLSB,
@@ -60,7 +60,12 @@ class ADXL362(SensorBase):
         if port is None:
             port = SPI.Port.kOnboardCS1
         
-        self.spi = SPI(port)
+        simPort = None
+        if hal.HALIsSimulation():
+            from hal_impl.spi_helpers import ADXL362_Sim
+            simPort = ADXL362_Sim(self)
+        
+        self.spi = SPI(port, simPort=simPort)
         self.spi.setClockRate(3000000)
         self.spi.setMSBFirst()
         self.spi.setSampleDataOnFalling()
@@ -112,7 +117,7 @@ class ADXL362(SensorBase):
         elif range == self.Range.k8G or \
              range == self.Range.k16G:
             value = self.kFilterCtl_Range8G
-            self.gsPerLSB = 0x004
+            self.gsPerLSB = 0.004
         else:
             raise ValueError("Invalid range argument '%s'" % range)
 
@@ -153,7 +158,7 @@ class ADXL362(SensorBase):
                 self.kDataRegister + axis, 0, 0]
         data = self.spi.transaction(data)
         # Sensor is little endian... swap bytes
-        rawAccel = (data[2] << 8) | data[1]
+        rawAccel = int.from_bytes(data[2:4], 'little', signed=True)
         return rawAccel * self.gsPerLSB
 
     def getAccelerations(self):
@@ -173,7 +178,7 @@ class ADXL362(SensorBase):
         # Sensor is little endian... swap bytes
         rawData = []
         for i in range(3):
-            rawData.append((data[i*2+2] << 8) | data[i*2+1])
+            rawData.append(int.from_bytes(data[i*2+2:i*2+4], 'little', signed=True))
 
         return (rawData[0] * self.gsPerLSB,
                 rawData[1] * self.gsPerLSB,
@@ -13,7 +13,9 @@ from .gyrobase import GyroBase
 from .livewindow import LiveWindow
 from .spi import SPI
 from .timer import Timer
-    
+
+__all__ = ["ADXRS450_Gyro"]
+
 
 class ADXRS450_Gyro(GyroBase):
     """
@@ -97,18 +99,26 @@ class ADXRS450_Gyro(GyroBase):
         if self.spi is None:
             return
         
-        if not hal.HALIsSimulation():
-            Timer.delay(0.1)
+        self._calibrationDelay(0.1)
 
         self.spi.setAccumulatorCenter(0)
         self.spi.resetAccumulator()
         
-        if not hal.HALIsSimulation():
-            Timer.delay(self.kCalibrationSampleTime)
+        self._calibrationDelay(self.kCalibrationSampleTime)
         
         self.spi.setAccumulatorCenter(int(self.spi.getAccumulatorAverage()))
         self.spi.resetAccumulator()
 
+    def _calibrationDelay(self, seconds):
+        # In simulation, only wait when the simulated clock doesn't need
+        # real time to pass, so the robot isn't frozen for 5 seconds
+        if hal.HALIsSimulation():
+            from hal_impl.data import hooks
+            if not getattr(hooks, 'virtualTime', False):
+                return
+        
+        Timer.delay(seconds)
+
     def _calcParity(self, v):
         parity = False
         while v != 0:
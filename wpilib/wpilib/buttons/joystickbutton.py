@@ -7,6 +7,7 @@
 #----------------------------------------------------------------------------
 
 from .button import Button
+from ..interfaces.generichid import GenericHID
 
 __all__ = ["JoystickButton"]
 
@@ -31,3 +32,11 @@ class JoystickButton(Button):
         :returns: The value of the joystick button
         """
         return self.joystick.getRawButton(self.buttonNumber)
+
+    def _getStickButton(self):
+        # Only if nobody has changed how the button is read
+        if type(self).get is not JoystickButton.get or \
+           type(self.joystick).getRawButton is not GenericHID.getRawButton or \
+           self.buttonNumber <= 0:
+            return None
+        return self.joystick.port, 1 << (self.buttonNumber - 1)
@@ -54,9 +54,7 @@ class Trigger:
             else:
                 execute.pressedLast = False
 
-        execute.pressedLast = self.grab()
-        from ..command import Scheduler
-        Scheduler.getInstance().addButton(execute)
+        self._addButton(execute)
 
     def whileActive(self, command):
         """Constantly starts the given command while the button is held.
@@ -75,9 +73,7 @@ class Trigger:
                     execute.pressedLast = False
                     command.cancel()
 
-        execute.pressedLast = self.grab()
-        from ..command import Scheduler
-        Scheduler.getInstance().addButton(execute)
+        self._addButton(execute, whileActive=True)
 
     def whenInactive(self, command):
         """Starts the command when the trigger becomes inactive.
@@ -92,9 +88,7 @@ class Trigger:
                     execute.pressedLast = False
                     command.start()
 
-        execute.pressedLast = self.grab()
-        from ..command import Scheduler
-        Scheduler.getInstance().addButton(execute)
+        self._addButton(execute)
 
     def toggleWhenActive(self, command):
         """Toggles a command when the trigger becomes active.
@@ -112,9 +106,7 @@ class Trigger:
             else:
                 execute.pressedLast = False
 
-        execute.pressedLast = self.grab()
-        from ..command import Scheduler
-        Scheduler.getInstance().addButton(execute)
+        self._addButton(execute)
 
     def cancelWhenActive(self, command):
         """Cancels a command when the trigger becomes active.
@@ -129,10 +121,29 @@ class Trigger:
             else:
                 execute.pressedLast = False
 
+        self._addButton(execute)
+
+    def _addButton(self, execute, whileActive=False):
+        """Registers a binding function with the :class:`.Scheduler`
+
+        :param whileActive: True if the function must be called on every
+                            iteration while the trigger is active, even if
+                            the trigger has not changed
+        """
         execute.pressedLast = self.grab()
+        execute.trigger = self
+        execute.whileActive = whileActive
         from ..command import Scheduler
         Scheduler.getInstance().addButton(execute)
 
+    def _getStickButton(self):
+        """If the state of this trigger is exactly the state of a single
+        joystick button, returns (port, bitmask) for that button so that the
+        :class:`.Scheduler` can skip polling it when it hasn't changed.
+        Otherwise returns None.
+        """
+        return None
+
     def getSmartDashboardType(self):
         """These methods continue to return the "Button" :class:`.SmartDashboard` type
         until we decided to create a Trigger widget type for the dashboard.
@@ -8,7 +8,9 @@
 
 import hal
 
+from ..driverstation import DriverStation
 from ..sendable import Sendable
+from .._impl.loopprofiler import profiled
 
 import collections
 import warnings
@@ -55,6 +57,9 @@ class Scheduler(Sendable):
         self.commandTable = collections.OrderedDict()
         # The set of all Subsystems
         self.subsystems = set()
+        # Subsystems whose current or default command has changed, and need
+        # to be checked for a default command at the end of run()
+        self.changedSubsystems = set()
         # Whether or not we are currently adding a command
         self.adding = False
         # Whether or not we are currently disabled
@@ -63,6 +68,11 @@ class Scheduler(Sendable):
         self.additions = []
         # A list of all Buttons. It is created lazily.
         self.buttons = []
+        # Buttons that are a single joystick button: button: (port, bitmask)
+        self.stickButtons = {}
+        # Last state of each joystick used by stickButtons:
+        # port: [generation, buttons]
+        self.stickStates = {}
         self.runningCommandsChanged = False
 
         self.namesEntry = None
@@ -91,6 +101,36 @@ class Scheduler(Sendable):
         """
         self.buttons.append(button)
 
+        # Joystick buttons are only polled when the joystick changes
+        trigger = getattr(button, 'trigger', None)
+        stickButton = trigger._getStickButton() if trigger is not None else None
+        if stickButton is not None:
+            port = stickButton[0]
+            if port not in self.stickStates:
+                ds = DriverStation.getInstance()
+                self.stickStates[port] = [ds.getStickGeneration(port),
+                                          ds.getStickButtons(port)]
+            self.stickButtons[button] = stickButton
+
+    def _pollStickButtons(self):
+        """Reads the buttons of each joystick that has buttons bound to
+        commands, once per joystick.
+
+        :returns: dictionary of port: bitmask of buttons that changed
+        """
+        ds = DriverStation.getInstance()
+        changed = {}
+        for port, state in self.stickStates.items():
+            generation = ds.getStickGeneration(port)
+            if generation == state[0]:
+                changed[port] = 0
+            else:
+                buttons = ds.getStickButtons(port)
+                changed[port] = buttons ^ state[1]
+                state[0] = generation
+                state[1] = buttons
+        return changed
+
     def _add(self, command):
         """Adds a command immediately to the Scheduler. This should only be
         called in the :meth:`run` loop. Any command with conflicting
@@ -109,19 +149,24 @@ class Scheduler(Sendable):
 
         # Only add if not already in
         if command not in self.commandTable:
+            requirements = command.getRequirements()
+
             # Check that the requirements can be had
-            for lock in command.getRequirements():
-                if (lock.getCurrentCommand() is not None and
-                    not lock.getCurrentCommand().isInterruptible()):
+            for lock in requirements:
+                current = lock.getCurrentCommand()
+                if current is not None and not current.isInterruptible():
                     return
 
             # Give it the requirements
             self.adding = True
-            for lock in command.getRequirements():
-                if lock.getCurrentCommand() is not None:
-                    lock.getCurrentCommand().cancel()
-                    self.remove(lock.getCurrentCommand())
-                lock.setCurrentCommand(command)
+            for lock in requirements:
+                # removing a command frees all of its requirements, so this
+                # must be checked each time
+                current = lock.getCurrentCommand()
+                if current is not None:
+                    current.cancel()
+                    self.remove(current)
+                self._setCurrentCommand(lock, command)
             self.adding = False
 
             # Add it to the list
@@ -131,6 +176,7 @@ class Scheduler(Sendable):
 
             command.startRunning()
 
+    @profiled('Scheduler.run')
     def run(self):
         """Runs a single iteration of the loop. This method should be called
         often in order to have a functioning Command system. The loop has five
@@ -148,8 +194,19 @@ class Scheduler(Sendable):
         if self.disabled:
             return # Don't run when disabled
 
-        # Get button input (going backwards preserves button priority)
+        # Get button input (going backwards preserves button priority).
+        # Joystick buttons that haven't changed don't need to be called,
+        # unless the binding acts on every iteration while held, or the
+        # button can also be pressed from SmartDashboard
+        stickButtons = self.stickButtons
+        changed = self._pollStickButtons() if stickButtons else None
         for button in reversed(self.buttons):
+            stickButton = stickButtons.get(button)
+            if stickButton is not None and \
+               not changed[stickButton[0]] & stickButton[1] and \
+               not (button.whileActive and button.pressedLast) and \
+               getattr(button.trigger, 'pressedEntry', None) is None:
+                continue
             button()
 
         # Call every subsystem's periodic method
@@ -167,11 +224,20 @@ class Scheduler(Sendable):
             self._add(command)
         self.additions.clear()
 
-        # Add in the defaults
-        for lock in self.subsystems:
-            if lock.getCurrentCommand() is None:
-                self._add(lock.getDefaultCommand())
-            lock.confirmCommand()
+        # Add in the defaults. Only subsystems that changed need to be
+        # checked; anything changed while doing so is checked next time
+        if self.changedSubsystems:
+            changed, self.changedSubsystems = self.changedSubsystems, set()
+            for lock in changed:
+                if lock.getCurrentCommand() is None:
+                    defaultCommand = lock.getDefaultCommand()
+                    self._add(defaultCommand)
+                    # the default command couldn't take over (because an
+                    # uninterruptible command holds one of its other
+                    # requirements), so try again next time
+                    if defaultCommand is not None and lock.getCurrentCommand() is None:
+                        self.changedSubsystems.add(lock)
+                lock.confirmCommand()
 
         self.updateTable()
 
@@ -184,6 +250,15 @@ class Scheduler(Sendable):
         """
         if system is not None:
             self.subsystems.add(system)
+            self.changedSubsystems.add(system)
+
+    def _subsystemChanged(self, system):
+        """Called when the default command of a subsystem changes"""
+        self.changedSubsystems.add(system)
+
+    def _setCurrentCommand(self, system, command):
+        system.setCurrentCommand(command)
+        self.changedSubsystems.add(system)
 
     def remove(self, command):
         """Removes the :class:`.Command` from the Scheduler.
@@ -194,7 +269,7 @@ class Scheduler(Sendable):
             return
         del self.commandTable[command]
         for reqt in command.getRequirements():
-            reqt.setCurrentCommand(None)
+            self._setCurrentCommand(reqt, None)
         command.removed()
 
     def removeAll(self):
@@ -203,7 +278,7 @@ class Scheduler(Sendable):
         # TODO: Confirm that this works with "uninteruptible" commands
         for command in self.commandTable:
             for reqt in command.getRequirements():
-                reqt.setCurrentCommand(None)
+                self._setCurrentCommand(reqt, None)
             command.removed()
         self.commandTable.clear()
 
@@ -90,6 +90,7 @@ class Subsystem(Sendable):
             if self not in command.getRequirements():
                 raise ValueError("A default command must require the subsystem")
             self.defaultCommand = command
+        Scheduler.getInstance()._subsystemChanged(self)
         if self.hasDefaultEntry is not None and self.defaultEntry is not None:
             if self.defaultCommand is not None:
                 self.hasDefaultEntry.setBoolean(True)
@@ -64,6 +64,22 @@ class Counter(SensorBase):
     allocatedUpSource = False
     allocatedDownSource = False
 
+    # Argument templates, see match_arglist
+    source_identifier = [int, HasAttribute("getPortHandleForRouting"), HasAttribute("createOutput")]
+
+    _init_templates = [[],
+                       [("upSource", source_identifier), ],
+                       [("upSource", source_identifier), ("downSource", source_identifier)],
+                       [("encodingType", None), ("upSource", source_identifier),
+                        ("downSource", source_identifier), ("inverted", bool)], ]
+    del source_identifier
+
+    # used by setUpSource and setDownSource
+    _source_templates = [[("channel", int)],
+                         [("source", HasAttribute("getPortHandleForRouting")), ],
+                         [("analogTrigger", HasAttribute("createOutput"))],
+                         [("analogTrigger", HasAttribute("createOutput")), ("triggerType", None)]]
+
     def __init__(self, *args, **kwargs):
         """Counter constructor.
 
@@ -106,17 +122,8 @@ class Counter(SensorBase):
         :type encodingType: :class:`.Counter.EncodingType`
         """
 
-        source_identifier = [int, HasAttribute("getPortHandleForRouting"), HasAttribute("createOutput")]
-
-        argument_templates = [[],
-                              [("upSource", source_identifier), ],
-                              [("upSource", source_identifier), ("downSource", source_identifier)],
-                              [("encodingType", None), ("upSource", source_identifier),
-                               ("downSource", source_identifier), ("inverted", bool)], ]
-
-
         _, results = match_arglist('Counter.__init__',
-                                   args, kwargs, argument_templates, allow_extra_kwargs=True)
+                                   args, kwargs, self._init_templates, allow_extra_kwargs=True)
 
         # extract arguments
         upSource = results.pop("upSource", None)
@@ -219,13 +226,8 @@ class Counter(SensorBase):
 
         #TODO Both this and the java implementation should probably not allow setting a source if one is already set.
 
-        argument_templates = [[("channel", int)],
-                              [("source", HasAttribute("getPortHandleForRouting")), ],
-                              [("analogTrigger", HasAttribute("createOutput"))],
-                              [("analogTrigger", HasAttribute("createOutput")), ("triggerType", None)]]
-
         _, results = match_arglist('Counter.setUpSource',
-                                   args, kwargs, argument_templates)
+                                   args, kwargs, self._source_templates)
 
         # extract arguments
         source = results.pop("source", None)
@@ -306,13 +308,8 @@ class Counter(SensorBase):
 
         #TODO Both this and the java implementation should probably not allow setting a source if one is already set.
 
-        argument_templates = [[("channel", int)],
-                              [("source", HasAttribute("getPortHandleForRouting")), ],
-                              [("analogTrigger", HasAttribute("createOutput")), ],
-                              [("analogTrigger", HasAttribute("createOutput")), ("triggerType", None)]]
-
         _, results = match_arglist('Counter.setDownSource',
-                                   args, kwargs, argument_templates)
+                                   args, kwargs, self._source_templates)
 
         # extract arguments
         source = results.pop("source", None)
@@ -39,7 +39,7 @@ class DriverStation:
             ds = DriverStation.instance
             ds.release()
             #hal.giveMultiWait(ds.packetDataAvailableSem)
-            ds.thread.join()
+            hal.joinThread(ds.thread)
             del DriverStation.instance
 
     @classmethod
@@ -76,6 +76,10 @@ class DriverStation:
         self.joystickPOVsCache = [hal.JoystickPOVs() for _ in range(self.kJoystickPorts)]
         self.joystickButtonsCache = [hal.JoystickButtons() for _ in range(self.kJoystickPorts)]
 
+        # Incremented each time the data for a joystick changes
+        self.joystickGenerations = [0]*self.kJoystickPorts
+        self.joystickConnected = [True]*self.kJoystickPorts
+
         self.controlWordMutex = threading.RLock()
         self.controlWordCache = hal.ControlWord()
         self.lastControlWordUpdate = 0
@@ -95,6 +99,7 @@ class DriverStation:
 
         self.thread = threading.Thread(target=self._run, name="FRCDriverStation")
         self.thread.daemon = True
+        hal.registerThread(self.thread)
         self.thread.start()
 
     def release(self):
@@ -241,6 +246,23 @@ class DriverStation:
                 return False
             return ((0x1 << (button - 1)) & joystickButtons.buttons) != 0
 
+    def getStickGeneration(self, stick):
+        """Returns a counter that is incremented each time the axes, POVs,
+        or buttons of a joystick change. If the value is the same as the last
+        time you called this, then none of the joystick's values have changed
+        and you can skip processing them.
+
+        :param stick: The joystick port number
+        :type stick: int
+
+        :returns: The number of times the joystick data has changed
+        :rtype: int
+        """
+        if stick < 0 or stick >= self.kJoystickPorts:
+            raise IndexError("Joystick index is out of range, should be 0-%s" % self.kJoystickPorts)
+
+        return self.joystickGenerations[stick]
+
     def getStickAxisCount(self, stick):
         """Returns the number of axes on a given joystick port
 
@@ -568,22 +590,59 @@ class DriverStation:
         the data will be copied from the DS polling loop.
         """
 
-        # Get the status of all of the joysticks
+        # Get the status of all of the joysticks, and only keep the ones that
+        # changed. The live data is only ever replaced by this thread, so it
+        # is safe to read it without the mutex
+        changed = []
         for stick in range(self.kJoystickPorts):
-            hal.getJoystickAxes(stick, self.joystickAxesCache[stick])
-            hal.getJoystickPOVs(stick, self.joystickPOVsCache[stick])
-            hal.getJoystickButtons(stick, self.joystickButtonsCache[stick])
+            axes = self.joystickAxesCache[stick]
+            povs = self.joystickPOVsCache[stick]
+            buttons = self.joystickButtonsCache[stick]
+
+            hal.getJoystickAxes(stick, axes)
+            hal.getJoystickPOVs(stick, povs)
+            hal.getJoystickButtons(stick, buttons)
+
+            connected = not (axes.count == 0 and povs.count == 0 and buttons.count == 0)
+
+            # nothing changed for a joystick that is still unplugged
+            if not connected and not self.joystickConnected[stick]:
+                continue
+
+            self.joystickConnected[stick] = connected
+
+            if not self._stickEqual(stick):
+                changed.append(stick)
 
         # Force a control word update, to make sure the data is the newest.
         self._updateControlWord(True)
 
+        if not changed:
+            return
+
         # lock joystick mutex to swap cache data
         with self.joystickMutex:
 
             # move cache to actual data
-            self.joystickAxes, self.joystickAxesCache = self.joystickAxesCache, self.joystickAxes
-            self.joystickButtons, self.joystickButtonsCache = self.joystickButtonsCache, self.joystickButtons
-            self.joystickPOVs, self.joystickPOVsCache = self.joystickPOVsCache, self.joystickPOVs
+            for stick in changed:
+                self.joystickAxes[stick], self.joystickAxesCache[stick] = self.joystickAxesCache[stick], self.joystickAxes[stick]
+                self.joystickButtons[stick], self.joystickButtonsCache[stick] = self.joystickButtonsCache[stick], self.joystickButtons[stick]
+                self.joystickPOVs[stick], self.joystickPOVsCache[stick] = self.joystickPOVsCache[stick], self.joystickPOVs[stick]
+                self.joystickGenerations[stick] += 1
+
+    def _stickEqual(self, stick):
+        """Returns True if the cached data for a joystick is the same as
+        the live data"""
+        axes, oldAxes = self.joystickAxesCache[stick], self.joystickAxes[stick]
+        povs, oldPOVs = self.joystickPOVsCache[stick], self.joystickPOVs[stick]
+        buttons, oldButtons = self.joystickButtonsCache[stick], self.joystickButtons[stick]
+
+        return buttons.buttons == oldButtons.buttons and \
+               buttons.count == oldButtons.count and \
+               axes.count == oldAxes.count and \
+               povs.count == oldPOVs.count and \
+               axes.axes[:axes.count] == oldAxes.axes[:axes.count] and \
+               povs.povs[:povs.count] == oldPOVs.povs[:povs.count]
 
     def _reportJoystickUnpluggedError(self, message):
         """
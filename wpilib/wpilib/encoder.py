@@ -56,6 +56,27 @@ class Encoder(SensorBase):
     EncodingType = CounterBase.EncodingType
     PIDSourceType = PIDSource.PIDSourceType
 
+    # Argument templates for __init__, see match_arglist
+    a_source_arg = ("aSource", HasAttribute("getPortHandleForRouting"))
+    b_source_arg = ("bSource", HasAttribute("getPortHandleForRouting"))
+    index_source_arg = ("indexSource", HasAttribute("getPortHandleForRouting"))
+    a_channel_arg = ("aChannel", int)
+    b_channel_arg = ("bChannel", int)
+    index_channel_arg = ("indexChannel", int)
+
+    _argument_templates = [[a_source_arg, b_source_arg],
+                          [a_source_arg, b_source_arg, ("reverseDirection", bool)],
+                          [a_source_arg, b_source_arg, ("reverseDirection", bool), ("encodingType", int)],
+                          [a_source_arg, b_source_arg, index_source_arg],
+                          [a_source_arg, b_source_arg, index_source_arg, ("reverseDirection", bool)],
+                          [a_channel_arg, b_channel_arg],
+                          [a_channel_arg, b_channel_arg, ("reverseDirection", bool)],
+                          [a_channel_arg, b_channel_arg, ("reverseDirection", bool), ("encodingType", int)],
+                          [a_channel_arg, b_channel_arg, index_channel_arg],
+                          [a_channel_arg, b_channel_arg, index_channel_arg, ("reverseDirection", bool)]]
+    del a_source_arg, b_source_arg, index_source_arg
+    del a_channel_arg, b_channel_arg, index_channel_arg
+
     def __init__(self, *args, **kwargs):
         """Encoder constructor. Construct a Encoder given a and b channels
         and optionally an index channel.
@@ -113,26 +134,8 @@ class Encoder(SensorBase):
             spec'd count.  Defaults to k4X if unspecified.
         :type encodingType: :class:`Encoder.EncodingType`
         """
-        a_source_arg = ("aSource", HasAttribute("getPortHandleForRouting"))
-        b_source_arg = ("bSource", HasAttribute("getPortHandleForRouting"))
-        index_source_arg = ("indexSource", HasAttribute("getPortHandleForRouting"))
-        a_channel_arg = ("aChannel", int)
-        b_channel_arg = ("bChannel", int)
-        index_channel_arg = ("indexChannel", int)
-
-        argument_templates = [[a_source_arg, b_source_arg],
-                              [a_source_arg, b_source_arg, ("reverseDirection", bool)],
-                              [a_source_arg, b_source_arg, ("reverseDirection", bool), ("encodingType", int)],
-                              [a_source_arg, b_source_arg, index_source_arg],
-                              [a_source_arg, b_source_arg, index_source_arg, ("reverseDirection", bool)],
-                              [a_channel_arg, b_channel_arg],
-                              [a_channel_arg, b_channel_arg, ("reverseDirection", bool)],
-                              [a_channel_arg, b_channel_arg, ("reverseDirection", bool), ("encodingType", int)],
-                              [a_channel_arg, b_channel_arg, index_channel_arg],
-                              [a_channel_arg, b_channel_arg, index_channel_arg, ("reverseDirection", bool)]]
-
         _, results = match_arglist('Encoder.__init__',
-                                   args, kwargs, argument_templates)
+                                   args, kwargs, self._argument_templates)
         
         # keyword arguments
         aSource = results.pop("aSource", None)
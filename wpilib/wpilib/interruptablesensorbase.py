@@ -53,7 +53,7 @@ class InterruptableSensorBase(SensorBase):
         if self.interrupt is not None:
             raise ValueError("The interrupt has already been allocated")
 
-        self.allocateInterrupts(handler is not None)
+        self.allocateInterrupts(handler is None)
 
         assert self.interrupt is not None
 
@@ -85,7 +85,7 @@ class InterruptableSensorBase(SensorBase):
         if self.interrupt is None:
             raise ValueError("The interrupt is not allocated.")
         self._interrupt_finalizer()
-        self.interrupt = None
+        self._interrupt = None
 
     def waitForInterrupt(self, timeout, ignorePrevious=True):
         """In synchronous mode, wait for the defined interrupt to occur.
@@ -154,7 +154,7 @@ class InterruptableSensorBase(SensorBase):
         """
         if self.interrupt is not None:
             hal.setInterruptUpSourceEdge(self.interrupt,
-                                         1 if risingEdge else 0,
-                                         1 if fallingEdge else 0)
+                                         bool(risingEdge),
+                                         bool(fallingEdge))
         else:
             raise ValueError("You must call RequestInterrupts before setUpSourceEdge")
@@ -12,6 +12,7 @@ import logging
 from .robotbase import RobotBase
 from .timer import Timer
 from .livewindow import LiveWindow
+from ._impl.loopprofiler import LoopProfiler
 
 __all__ = ["IterativeRobot"]
 
@@ -70,6 +71,11 @@ class IterativeRobot(RobotBase):
         self.teleopInitialized = False
         self.testInitialized = False
 
+        #: A :class:`.LoopProfiler` that records how long each part of the
+        #: main loop takes. Call ``self.profiler.exportToSmartDashboard()``
+        #: to see the results.
+        self.profiler = LoopProfiler()
+
     def startCompetition(self):
         """Provide an alternate "main loop" via startCompetition()."""
         hal.report(hal.UsageReporting.kResourceType_Framework,
@@ -85,61 +91,81 @@ class IterativeRobot(RobotBase):
         while True:
             # Wait for new data to arrive
             self.ds.waitForData()
-            # Call the appropriate function depending upon the current robot mode
-            if self.isDisabled():
-                # call DisabledInit() if we are now just entering disabled mode from
-                # either a different mode or from power-on
-                if not self.disabledInitialized:
+            self.loopFunc()
+
+    def loopFunc(self):
+        """Call the appropriate init and periodic functions depending upon
+        the current robot mode. This is called once per loop by
+        :meth:`startCompetition`."""
+        profiler = self.profiler
+        profiler.startLoop()
+        # Call the appropriate function depending upon the current robot mode
+        if self.isDisabled():
+            # call DisabledInit() if we are now just entering disabled mode from
+            # either a different mode or from power-on
+            if not self.disabledInitialized:
+                with profiler.phase('disabledInit'):
                     LiveWindow.setEnabled(False)
                     self.disabledInit()
-                    self.disabledInitialized = True
-                    # reset the initialization flags for the other modes
-                    self.autonomousInitialized = False
-                    self.teleopInitialized = False
-                    self.testInitialized = False
-                hal.observeUserProgramDisabled()
+                self.disabledInitialized = True
+                # reset the initialization flags for the other modes
+                self.autonomousInitialized = False
+                self.teleopInitialized = False
+                self.testInitialized = False
+            hal.observeUserProgramDisabled()
+            with profiler.phase('disabledPeriodic'):
                 self.disabledPeriodic()
-            elif self.isTest():
-                # call TestInit() if we are now just entering test mode from either
-                # a different mode or from power-on
-                if not self.testInitialized:
+        elif self.isTest():
+            # call TestInit() if we are now just entering test mode from either
+            # a different mode or from power-on
+            if not self.testInitialized:
+                with profiler.phase('testInit'):
                     LiveWindow.setEnabled(True)
                     self.testInit()
-                    self.testInitialized = True
-                    self.autonomousInitialized = False
-                    self.teleopInitialized = False
-                    self.disabledInitialized = False
-                hal.observeUserProgramTest()
+                self.testInitialized = True
+                self.autonomousInitialized = False
+                self.teleopInitialized = False
+                self.disabledInitialized = False
+            hal.observeUserProgramTest()
+            with profiler.phase('testPeriodic'):
                 self.testPeriodic()
-            elif self.isAutonomous():
-                # call Autonomous_Init() if this is the first time
-                # we've entered autonomous_mode
-                if not self.autonomousInitialized:
+        elif self.isAutonomous():
+            # call Autonomous_Init() if this is the first time
+            # we've entered autonomous_mode
+            if not self.autonomousInitialized:
+                with profiler.phase('autonomousInit'):
                     LiveWindow.setEnabled(False)
                     # KBS NOTE: old code reset all PWMs and relays to "safe values"
                     # whenever entering autonomous mode, before calling
                     # "Autonomous_Init()"
                     self.autonomousInit()
-                    self.autonomousInitialized = True
-                    self.testInitialized = False
-                    self.teleopInitialized = False
-                    self.disabledInitialized = False
-                hal.observeUserProgramAutonomous()
+                self.autonomousInitialized = True
+                self.testInitialized = False
+                self.teleopInitialized = False
+                self.disabledInitialized = False
+            hal.observeUserProgramAutonomous()
+            with profiler.phase('autonomousPeriodic'):
                 self.autonomousPeriodic()
-            else:
-                # call Teleop_Init() if this is the first time
-                # we've entered teleop_mode
-                if not self.teleopInitialized:
+        else:
+            # call Teleop_Init() if this is the first time
+            # we've entered teleop_mode
+            if not self.teleopInitialized:
+                with profiler.phase('teleopInit'):
                     LiveWindow.setEnabled(False)
                     self.teleopInit()
-                    self.teleopInitialized = True
-                    self.testInitialized = False
-                    self.autonomousInitialized = False
-                    self.disabledInitialized = False
-                hal.observeUserProgramTeleop()
+                self.teleopInitialized = True
+                self.testInitialized = False
+                self.autonomousInitialized = False
+                self.disabledInitialized = False
+            hal.observeUserProgramTeleop()
+            with profiler.phase('teleopPeriodic'):
                 self.teleopPeriodic()
+
+        with profiler.phase('robotPeriodic'):
             self.robotPeriodic()
 
+        profiler.endLoop()
+
     # ----------- Overridable initialization code -----------------
 
     def robotInit(self):
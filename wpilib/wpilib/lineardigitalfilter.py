@@ -6,7 +6,8 @@
 # the project.
 #----------------------------------------------------------------------------
 
-import collections
+import array
+import itertools
 import math
 from operator import mul
 
@@ -74,6 +75,9 @@ class LinearDigitalFilter(Filter):
     * :meth:`movingAverage`
     * :meth:`singlePoleIIR`
     
+    To run a filter over a recorded log of samples instead of a live
+    source, see :meth:`filterBatch`.
+    
     """
     
     def __init__(self, source, ffGains, fbGains):
@@ -88,14 +92,32 @@ class LinearDigitalFilter(Filter):
         """
         
         super().__init__(source)
-    
-        lf = len(ffGains)
-        lb = len(fbGains)
-    
-        self.inputs = collections.deque([0.0]*lf, maxlen=lf)
-        self.outputs = collections.deque([0.0]*lb, maxlen=lb)
+        
         self.inputGains = ffGains
         self.outputGains = fbGains
+        
+        # Past values are kept in fixed size ring buffers, where the newest
+        # value is at the index stored in _inputIdx/_outputIdx. To avoid
+        # rotating the buffers, the dot product is computed against a
+        # reversed and doubled copy of the gains instead, starting at an
+        # offset that lines the gains up with the buffer
+        self._inputs = array.array('d', [0.0]*len(ffGains))
+        self._outputs = array.array('d', [0.0]*len(fbGains))
+        self._inputIdx = 0
+        self._outputIdx = 0
+        self._inputCount = len(ffGains)
+        self._outputCount = len(fbGains)
+        self._inputGainsRev = array.array('d', list(reversed(ffGains))*2)
+        self._outputGainsRev = array.array('d', list(reversed(fbGains))*2)
+        
+        # A moving average is computed using a running sum of its inputs
+        # instead of multiplying every tap
+        self._avgGain = None
+        if ffGains and not fbGains and all(g == ffGains[0] for g in ffGains):
+            self._avgGain = ffGains[0]
+        
+        self._sum = 0.0
+        self._sumCount = 0
     
     @staticmethod
     def singlePoleIIR(source, timeConstant, period):
@@ -172,23 +194,95 @@ class LinearDigitalFilter(Filter):
 
         return LinearDigitalFilter(source, ffGains, fbGains)
     
+    @property
+    def inputs(self):
+        """Past inputs, newest first"""
+        return self._history(self._inputs, self._inputIdx, self._inputCount)
+    
+    @property
+    def outputs(self):
+        """Past outputs, newest first"""
+        return self._history(self._outputs, self._outputIdx, self._outputCount)
+    
+    @staticmethod
+    def _history(buf, idx, count):
+        history = itertools.chain(reversed(buf[:idx+1]), reversed(buf[idx+1:]))
+        return list(itertools.islice(history, count))
+    
+    @staticmethod
+    def _dot(buf, idx, gainsRev):
+        # gainsRev[len - 1 - idx + j] is the gain for buf[j]
+        l = len(buf)
+        if l == 0:
+            return 0.0
+        return sum(map(mul, buf, itertools.islice(gainsRev, l - 1 - idx, None)))
+    
     def get(self):
         """Returns the current filter estimate without also inserting new data as
         :meth:`pidGet` would do.
         
         :returns: The current filter estimate
         """
-
+        
+        if self._avgGain is not None:
+            return self._avgGain*self._sum
+        
         # Calculate the new value
-        retVal = sum(map(mul, self.inputs, self.inputGains)) - \
-                 sum(map(mul, self.outputs, self.outputGains)) 
+        retVal = self._dot(self._inputs, self._inputIdx, self._inputGainsRev) - \
+                 self._dot(self._outputs, self._outputIdx, self._outputGainsRev)
         
         return retVal
 
     def reset(self):
         """Reset the filter state"""
-        self.inputs.clear()
-        self.outputs.clear()
+        for i in range(len(self._inputs)):
+            self._inputs[i] = 0.0
+        for i in range(len(self._outputs)):
+            self._outputs[i] = 0.0
+        self._inputIdx = 0
+        self._outputIdx = 0
+        self._inputCount = 0
+        self._outputCount = 0
+        self._sum = 0.0
+        self._sumCount = 0
+    
+    def _addInput(self, value):
+        inputs = self._inputs
+        l = len(inputs)
+        if l == 0:
+            return
+        
+        idx = (self._inputIdx + 1) % l
+        
+        if self._avgGain is not None:
+            # recompute the sum once in awhile so that rounding errors
+            # don't accumulate
+            self._sumCount += 1
+            if self._sumCount >= l:
+                self._sumCount = 0
+                inputs[idx] = value
+                self._sum = math.fsum(inputs)
+            else:
+                self._sum += value - inputs[idx]
+                inputs[idx] = value
+        else:
+            inputs[idx] = value
+        
+        self._inputIdx = idx
+        if self._inputCount < l:
+            self._inputCount += 1
+    
+    def _addOutput(self, value):
+        outputs = self._outputs
+        l = len(outputs)
+        if l == 0:
+            return
+        
+        idx = (self._outputIdx + 1) % l
+        outputs[idx] = value
+        self._outputIdx = idx
+        if self._outputCount < l:
+            self._outputCount += 1
      
     def pidGet(self):
         """Calculates the next value of the filter
@@ -197,13 +291,87 @@ class LinearDigitalFilter(Filter):
         """
         
         # Rotate the inputs
-        self.inputs.appendleft(self.pidGetSource())
-    
+        self._addInput(self.pidGetSource())
+        
         # Calculate the new value
-        retVal = sum(map(mul, self.inputs, self.inputGains)) - \
-                 sum(map(mul, self.outputs, self.outputGains))
-    
+        retVal = self.get()
+        
         # Rotate the outputs
-        self.outputs.appendleft(retVal)
-    
+        self._addOutput(retVal)
+        
         return retVal
+    
+    def filterBatch(self, samples):
+        """Runs the filter over a sequence of samples, as if :meth:`pidGet`
+        had been called once for each of them. The filter state is updated,
+        so this can be freely mixed with calls to :meth:`pidGet`. The
+        source is not used.
+        
+        This is much faster than calling :meth:`pidGet` in a loop, and is
+        intended for tuning filters against recorded sensor logs.
+        
+        .. note:: Requires NumPy to be installed. FIR filters are fully
+                  vectorized, the feedback part of IIR filters is computed
+                  sample by sample.
+        
+        :param samples: Input values, oldest first
+        :type samples: list, tuple, numpy.ndarray
+        
+        :returns: Filtered values, one for each sample
+        :rtype: numpy.ndarray
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("LinearDigitalFilter.filterBatch requires NumPy to be installed") from e
+        
+        x = np.asarray(samples, dtype=np.float64).ravel()
+        n = len(x)
+        
+        ffGains = np.asarray(self.inputGains, dtype=np.float64)
+        fbGains = list(self.outputGains)
+        lf = len(ffGains)
+        lb = len(fbGains)
+        
+        if n == 0:
+            return np.zeros(0)
+        
+        # feedforward: prepend the previous inputs (oldest first), so that
+        # a 'valid' convolution produces one value per sample
+        prevInputs = self._history(self._inputs, self._inputIdx, max(lf - 1, 0))
+        prevInputs = np.asarray(prevInputs[::-1], dtype=np.float64)
+        xx = np.concatenate((prevInputs, x))
+        if lf:
+            y = np.convolve(xx, ffGains, mode='valid')
+        else:
+            y = np.zeros(n)
+        
+        # feedback
+        if lb:
+            fb = y.tolist()
+            hist = self._history(self._outputs, self._outputIdx, lb)[::-1]
+            for i, v in enumerate(fb):
+                v -= sum(map(mul, fbGains, reversed(hist[-lb:])))
+                fb[i] = v
+                hist.append(v)
+            y = np.array(fb)
+        
+        # Update the filter state
+        if lf:
+            for i, v in enumerate(xx[-lf:].tolist()):
+                self._inputs[i] = v
+            self._inputIdx = lf - 1
+            self._inputCount = min(lf, self._inputCount + n)
+            if self._avgGain is not None:
+                self._sum = math.fsum(self._inputs)
+                self._sumCount = 0
+        
+        if lb:
+            lastOutputs = self._history(self._outputs, self._outputIdx, lb)[::-1]
+            lastOutputs = (lastOutputs + y[-lb:].tolist())[-lb:]
+            for i, v in enumerate(lastOutputs):
+                self._outputs[i] = v
+            self._outputIdx = lb - 1
+            self._outputCount = min(lb, self._outputCount + n)
+        
+        return y
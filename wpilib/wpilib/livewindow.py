@@ -2,6 +2,8 @@
 
 from networktables import NetworkTables
 from .command import Scheduler
+from .timer import Timer
+from ._impl.loopprofiler import profiled
 
 import logging
 logger = logging.getLogger(__name__)
@@ -18,9 +20,84 @@ class _LiveWindowComponent:
         self.name = str(name)
         self.isSensor = isSensor
 
+class _ChangeOnlyEntry:
+    """Wraps a NetworkTableEntry so that values are only sent to
+    NetworkTables when they change. Everything else is passed through to
+    the entry."""
+
+    __slots__ = ['_entry', '_last']
+
+    def __init__(self, entry):
+        self._entry = entry
+        self._last = None
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def _forget(self):
+        self._last = None
+
+    def setDouble(self, value):
+        last = self._last
+        if last is not None and abs(value - last) <= LiveWindow.floatTolerance:
+            return True
+        self._last = value
+        return self._entry.setDouble(value)
+
+    setNumber = setDouble
+
+    def setBoolean(self, value):
+        if self._last is not None and value == self._last:
+            return True
+        self._last = value
+        return self._entry.setBoolean(value)
+
+    def setString(self, value):
+        if self._last is not None and value == self._last:
+            return True
+        self._last = value
+        return self._entry.setString(value)
+
+
+class _ChangeOnlyTable:
+    """Wraps a NetworkTable so that the entries it returns are
+    :class:`_ChangeOnlyEntry` objects"""
+
+    def __init__(self, table):
+        self._table = table
+        self._entries = {}
+
+    def __getattr__(self, name):
+        return getattr(self._table, name)
+
+    def getEntry(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _ChangeOnlyEntry(self._table.getEntry(key))
+        return entry
+
+    def _forget(self):
+        for entry in self._entries.values():
+            entry._forget()
+
+
 class LiveWindow:
     """The public interface for putting sensors and
-    actuators on the LiveWindow."""
+    actuators on the LiveWindow.
+
+    In test mode, sensor values are sent to NetworkTables by
+    :meth:`updateValues`. To keep this from taking too long when there are
+    many sensors:
+
+    - Each sensor is only updated once per :attr:`defaultUpdatePeriod`,
+      which can be changed for individual sensors with
+      :meth:`setUpdatePeriod`
+    - At most :attr:`maxUpdatesPerLoop` sensors are updated each time
+      :meth:`updateValues` is called. Sensors are visited round-robin, so
+      the ones that were skipped are updated first on the next call.
+    - Values are only sent when they change (floats by more than
+      :attr:`floatTolerance`)
+    """
 
     sensors = set()
     #actuators = set()
@@ -29,7 +106,31 @@ class LiveWindow:
     statusTable = None
     liveWindowEnabled = False
     firstTime = True
-    
+
+    #: How often (in seconds) each sensor is updated, unless overridden
+    #: with :meth:`setUpdatePeriod`
+    defaultUpdatePeriod = 0.1
+
+    #: Maximum number of sensors updated by each call to :meth:`updateValues`
+    maxUpdatesPerLoop = 10
+
+    #: Floating point values that differ by this much or less from the last
+    #: value sent are not sent again
+    floatTolerance = 1e-6
+
+    # key: component, value: update period
+    updatePeriods = {}
+
+    # key: component, value: time of the next update
+    nextUpdate = {}
+
+    # sensors in round-robin order, rebuilt when sensors changes
+    sensorOrder = None
+    sensorIndex = 0
+
+    # key: component, value: _ChangeOnlyTable
+    changeOnlyTables = {}
+
     @staticmethod
     def _reset():
         LiveWindow.sensors = set()
@@ -38,6 +139,11 @@ class LiveWindow:
         LiveWindow.statusTable = None
         LiveWindow.liveWindowEnabled = False
         LiveWindow.firstTime = True
+        LiveWindow.updatePeriods = {}
+        LiveWindow.nextUpdate = {}
+        LiveWindow.sensorOrder = None
+        LiveWindow.sensorIndex = 0
+        LiveWindow.changeOnlyTables = {}
 
     @staticmethod
     def initializeLiveWindowComponents():
@@ -58,9 +164,12 @@ class LiveWindow:
             table.putString("~TYPE~", component.getSmartDashboardType())
             table.putString("Name", c.name)
             table.putString("Subsystem", c.subsystem)
+            if c.isSensor:
+                table = LiveWindow.changeOnlyTables[component] = _ChangeOnlyTable(table)
             component.initTable(table)
             if c.isSensor:
                 LiveWindow.sensors.add(component)
+        LiveWindow.sensorOrder = None
 
     @staticmethod
     def setEnabled(enabled):
@@ -93,6 +202,10 @@ class LiveWindow:
                         bad_components.append(component)
                 for component in bad_components:
                     del(LiveWindow.components[component])
+                # send everything at least once
+                for table in LiveWindow.changeOnlyTables.values():
+                    table._forget()
+                LiveWindow.nextUpdate.clear()
             else:
                 logger.info("Stopping live window mode.")
                 for component in LiveWindow.components.keys():
@@ -102,6 +215,7 @@ class LiveWindow:
             LiveWindow.statusTable.putBoolean("LW Enabled", enabled)
 
     @staticmethod
+    @profiled('LiveWindow.run')
     def run():
         """The run method is called repeatedly to keep the values refreshed
         on the screen in test mode.
@@ -121,6 +235,7 @@ class LiveWindow:
         LiveWindow.components[component] = \
                 _LiveWindowComponent(subsystem, name, True)
         LiveWindow.sensors.add(component)
+        LiveWindow.sensorOrder = None
 
     @staticmethod
     def addActuator(subsystem, name, component):
@@ -135,14 +250,57 @@ class LiveWindow:
         LiveWindow.components[component] = \
                 _LiveWindowComponent(subsystem, name, False)
 
+    @staticmethod
+    def setUpdatePeriod(component, period):
+        """Sets how often a sensor's values are sent to NetworkTables in
+        test mode.
+
+        :param component: A component that was added with :meth:`addSensor`
+        :param period: Time between updates in seconds, or None to use
+            :attr:`defaultUpdatePeriod`
+        """
+        if period is None:
+            LiveWindow.updatePeriods.pop(component, None)
+        else:
+            LiveWindow.updatePeriods[component] = period
+        LiveWindow.nextUpdate.pop(component, None)
+
     @staticmethod
     def updateValues():
-        """Puts all sensor values on the live window."""
-        # TODO: gross - needs to be sped up
-        for lws in LiveWindow.sensors:
+        """Puts sensor values on the live window. See :class:`LiveWindow`
+        for how often each sensor is updated."""
+        order = LiveWindow.sensorOrder
+        if order is None:
+            order = LiveWindow.sensorOrder = list(LiveWindow.sensors)
+            LiveWindow.sensorIndex = 0
+
+        count = len(order)
+        if count == 0:
+            return
+
+        now = Timer.getFPGATimestamp()
+        nextUpdate = LiveWindow.nextUpdate
+        updatePeriods = LiveWindow.updatePeriods
+        defaultUpdatePeriod = LiveWindow.defaultUpdatePeriod
+        remaining = LiveWindow.maxUpdatesPerLoop
+        idx = LiveWindow.sensorIndex % count
+
+        for _ in range(count):
+            lws = order[idx]
+            idx = (idx + 1) % count
+
+            if nextUpdate.get(lws, 0) > now:
+                continue
+
             lws.updateTable()
+            nextUpdate[lws] = now + updatePeriods.get(lws, defaultUpdatePeriod)
+
+            remaining -= 1
+            if remaining <= 0:
+                break
+
+        LiveWindow.sensorIndex = idx
         # TODO: Add actuators?
-        # TODO: Add better rate limiting.
 
     @staticmethod
     def addSensorChannel(moduleType, channel, component):
@@ -200,4 +358,8 @@ class LiveWindow:
         if component in LiveWindow.components:
             if LiveWindow.components[component].isSensor:
                 LiveWindow.sensors.remove(component)
+                LiveWindow.sensorOrder = None
             del(LiveWindow.components[component])
+        LiveWindow.updatePeriods.pop(component, None)
+        LiveWindow.nextUpdate.pop(component, None)
+        LiveWindow.changeOnlyTables.pop(component, None)
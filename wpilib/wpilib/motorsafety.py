@@ -6,6 +6,8 @@
 # the project.
 #----------------------------------------------------------------------------
 
+import heapq
+import itertools
 import weakref
 import threading
 
@@ -33,10 +35,28 @@ class MotorSafety:
     helpers = weakref.WeakSet()
     helpers_lock = threading.Lock()
     
+    # Heap of [stop time, sequence, weakref to helper] for each helper that
+    # has safety enabled. The stop time in the heap may be earlier than the
+    # helper's real stop time, because feed() doesn't touch the heap; such
+    # entries are pushed back with the real stop time when they come up.
+    # The heap is only used to find the helpers to check(), and is only
+    # accessed with helpers_lock held.
+    _heap = []
+    _seq = itertools.count()
+    
+    #: How often (in seconds) the motors are checked by a background task,
+    #: or None if they are only checked when driver station packets arrive
+    checkPeriod = None
+    _checkTask = None
+    
+    _safetyEntry = None
+    
     @staticmethod
     def _reset():
         with MotorSafety.helpers_lock:
             MotorSafety.helpers.clear()
+            MotorSafety._heap = []
+        MotorSafety.setCheckPeriod(None)
 
     def __init__(self):
         """The constructor for a MotorSafety object.
@@ -52,11 +72,17 @@ class MotorSafety:
         with MotorSafety.helpers_lock:
             MotorSafety.helpers.add(self)
 
-    def feed(self):
+    def feed(self, now=None):
         """Feed the motor safety object.
         Resets the timer on this object that is used to do the timeouts.
+
+        :param now: The current FPGA timestamp, if the caller already has
+                    it (such as when feeding many motors at once)
+        :type now: float
         """
-        self.safetyStopTime = Timer.getFPGATimestamp() + self.safetyExpiration
+        if now is None:
+            now = Timer.getFPGATimestamp()
+        self.safetyStopTime = now + self.safetyExpiration
 
     def setExpiration(self, expirationTime):
         """Set the expiration time for the corresponding motor safety object.
@@ -65,6 +91,12 @@ class MotorSafety:
         :type expirationTime: float
         """
         self.safetyExpiration = expirationTime
+        
+        # the next feed may expire sooner than the time that is in the heap
+        if self._safetyEntry is not None:
+            with MotorSafety.helpers_lock:
+                self._index(min(self.safetyStopTime,
+                                Timer.getFPGATimestamp() + expirationTime))
 
     def getExpiration(self):
         """Retrieve the timeout value for the corresponding motor safety
@@ -106,6 +138,11 @@ class MotorSafety:
         :type  enabled: bool
         """
         self.safetyEnabled = bool(enabled)
+        with MotorSafety.helpers_lock:
+            if self.safetyEnabled:
+                self._index(self.safetyStopTime)
+            else:
+                self._safetyEntry = None
 
     def isSafetyEnabled(self):
         """Return the state of the motor safety enabled flag.
@@ -116,12 +153,66 @@ class MotorSafety:
         """
         return self.safetyEnabled
 
+    def _index(self, stopTime):
+        # Must be called with helpers_lock held. Any entry that was
+        # previously in the heap for this helper is ignored from now on.
+        entry = [stopTime, next(MotorSafety._seq), weakref.ref(self)]
+        self._safetyEntry = entry
+        heapq.heappush(MotorSafety._heap, entry)
+
     @staticmethod
     def checkMotors():
         """Check the motors to see if any have timed out.
         This static method is called periodically to poll all the motors and
         stop any that have timed out.
+        
+        Only the motors whose stop time has passed are looked at, so this
+        is cheap to call often.
         """
+        if RobotState.isDisabled() or RobotState.isTest():
+            return
+        
+        due = []
         with MotorSafety.helpers_lock:
-            for msh in MotorSafety.helpers:
-                msh.check()
+            now = Timer.getFPGATimestamp()
+            heap = MotorSafety._heap
+            while heap and heap[0][0] < now:
+                entry = heapq.heappop(heap)
+                msh = entry[2]()
+                if msh is None or msh._safetyEntry is not entry:
+                    continue
+                
+                if msh.safetyStopTime < now:
+                    # expired motors are checked again after another
+                    # expiration period, unless they are fed before then
+                    due.append(msh)
+                    entry[0] = max(msh.safetyStopTime, now + msh.safetyExpiration)
+                else:
+                    # fed since it was put in the heap
+                    entry[0] = msh.safetyStopTime
+                heapq.heappush(heap, entry)
+        
+        for msh in due:
+            msh.check()
+
+    @staticmethod
+    def setCheckPeriod(period):
+        """Sets how often the motors are checked, independent of the driver
+        station. By default, the motors are only checked on every 4th
+        driver station packet, so a motor may keep running for up to 80ms
+        past its expiration (longer if packets are delayed).
+        
+        The checks are run by the shared :class:`.PeriodicExecutor`.
+        
+        :param period: Seconds between checks, or None to only check when
+                       driver station packets arrive
+        """
+        if MotorSafety._checkTask is not None:
+            MotorSafety._checkTask.cancel()
+            MotorSafety._checkTask = None
+        
+        MotorSafety.checkPeriod = period
+        if period is not None:
+            from ._impl.periodicexecutor import PeriodicExecutor
+            MotorSafety._checkTask = PeriodicExecutor.getInstance().schedule(
+                'MotorSafety', period, MotorSafety.checkMotors)
@@ -0,0 +1,148 @@
+# notrack
+#----------------------------------------------------------------------------
+# Copyright (c) FIRST 2008-2017. All Rights Reserved.
+# Open Source Software - may be modified and shared by FRC teams. The code
+# must be accompanied by the FIRST BSD license file in the root directory of
+# the project.
+#----------------------------------------------------------------------------
+
+import threading
+
+import hal
+
+from .resource import Resource
+from .timer import Timer
+
+__all__ = ["Notifier"]
+
+import logging
+logger = logging.getLogger('wpilib.notifier')
+
+class Notifier:
+    """Calls a function at a specified time, or periodically at a fixed rate.
+
+    Alarms are scheduled against the FPGA clock instead of by sleeping, so
+    a periodic notifier does not drift even if the handler takes a variable
+    amount of time to run.
+    """
+
+    def __init__(self, run):
+        """Create a Notifier for timer event notification.
+
+        :param run: The handler that is called at the notification time
+                    which is set using :meth:`startSingle` or
+                    :meth:`startPeriodic`.
+        """
+        self.processLock = threading.RLock()
+
+        # The time, in seconds, at which the handler should be called.
+        # Has the same zero as Timer.getFPGATimestamp().
+        self.expirationTime = 0.0
+        self.handler = run
+        # Whether we are calling the handler just once or periodically.
+        self.periodic = False
+        # If periodic, the period of the calling; if just once, stores how
+        # long it is until we call the handler.
+        self.period = 0.0
+
+        self.notifier = hal.initializeNotifier()
+
+        self.thread = threading.Thread(target=self._run, name="Notifier")
+        self.thread.daemon = True
+        hal.registerThread(self.thread)
+        self.thread.start()
+
+        # Need this to free on unit test wpilib reset
+        Resource._add_global_resource(self)
+
+    def free(self):
+        """Stops the notifier thread and releases the HAL notifier"""
+        with self.processLock:
+            notifier = self.notifier
+            self.notifier = None
+
+        if notifier is None:
+            return
+
+        hal.stopNotifier(notifier)
+        if self.thread is not threading.current_thread():
+            hal.joinThread(self.thread)
+        hal.cleanNotifier(notifier)
+
+    def _run(self):
+        while True:
+            notifier = self.notifier
+            if notifier is None:
+                break
+
+            curTime = hal.waitForNotifierAlarm(notifier)
+            if curTime == 0:
+                break
+
+            with self.processLock:
+                handler = self.handler
+                if self.periodic:
+                    self.expirationTime += self.period
+                    self._updateAlarm()
+
+            if handler is not None:
+                try:
+                    handler()
+                except Exception:
+                    logger.exception("Unhandled exception in Notifier handler")
+
+    def _updateAlarm(self):
+        """Update the alarm hardware to reflect the next alarm."""
+        notifier = self.notifier
+        if notifier is None:
+            return
+        hal.updateNotifierAlarm(notifier, int(self.expirationTime * 1e6))
+
+    def setHandler(self, handler):
+        """Change the handler function.
+
+        :param handler: Handler
+        """
+        with self.processLock:
+            self.handler = handler
+
+    def startSingle(self, delay):
+        """Register for single event notification. A timer event is queued
+        for a single event after the specified delay.
+
+        :param delay: Seconds to wait before the handler is called.
+        """
+        with self.processLock:
+            self.periodic = False
+            self.period = delay
+            self.expirationTime = Timer.getFPGATimestamp() + delay
+            self._updateAlarm()
+
+    def startPeriodic(self, period):
+        """Register for periodic event notification. A timer event is
+        queued for periodic event notification. Each time the interrupt
+        occurs, the event will be immediately requeued for the same time
+        interval.
+
+        :param period: Period in seconds to call the handler starting one
+                       period after the call to this method.
+        """
+        if period <= 0:
+            raise ValueError("Invalid period %s" % period)
+
+        with self.processLock:
+            self.periodic = True
+            self.period = period
+            self.expirationTime = Timer.getFPGATimestamp() + period
+            self._updateAlarm()
+
+    def stop(self):
+        """Stop timer events from occurring. Stop any repeating timer events
+        from occurring. This will also remove any single notification events
+        from the queue.
+        """
+        with self.processLock:
+            self.periodic = False
+            notifier = self.notifier
+            if notifier is not None:
+                hal.cancelNotifierAlarm(notifier)
@@ -18,6 +18,7 @@ from .interfaces import PIDSource
 from .livewindowsendable import LiveWindowSendable
 from .resource import Resource
 from .timer import Timer
+from ._impl.periodicexecutor import PeriodicExecutor
 from ._impl.timertask import TimerTask
 from ._impl.utils import match_arglist, HasAttribute
 
@@ -36,9 +37,26 @@ class PIDController(LiveWindowSendable):
     """
     kDefaultPeriod = .05
     instances = 0
+
+    #: If True, all PIDController objects run on a single shared thread
+    #: instead of creating their own thread. This can be overridden for
+    #: individual controllers via the ``useSharedExecutor`` argument.
+    useSharedExecutor = False
     
     PIDSourceType = PIDSource.PIDSourceType
 
+    # Argument templates for __init__, see match_arglist
+    f_arg = ("Kf", [float, int])
+    source_arg = ("source", [HasAttribute("pidGet"), HasAttribute("__call__")])
+    output_arg = ("output", [HasAttribute("pidWrite"), HasAttribute("__call__")])
+    period_arg = ("period", [float, int])
+
+    _templates = [[f_arg, source_arg, output_arg, period_arg],
+                  [source_arg, output_arg, period_arg],
+                  [source_arg, output_arg],
+                  [f_arg, source_arg, output_arg]]
+    del f_arg, source_arg, output_arg, period_arg
+
     # Tolerance is the type of tolerance used to specify if the PID controller
     # is on target.  The various implementations of this such as
     # PercentageTolerance and AbsoluteTolerance specify types of tolerance
@@ -52,7 +70,7 @@ class PIDController(LiveWindowSendable):
     def AbsoluteTolerance_onTarget(self, value):
         return self.isAvgErrorValid() and abs(self.getAvgError()) < value
 
-    def __init__(self, Kp, Ki, Kd, *args, **kwargs):
+    def __init__(self, Kp, Ki, Kd, *args, useSharedExecutor=None, **kwargs):
         """Allocate a PID object with the given constants for P, I, D, and F
 
         Arguments can be structured as follows:
@@ -78,20 +96,14 @@ class PIDController(LiveWindowSendable):
             effects calculations of the integral and differential terms.
             The default is 50ms.
         :type  period: float or int
+        :param useSharedExecutor: If True, run this controller on the thread
+            shared by all PID controllers instead of creating a new thread.
+            Defaults to :attr:`PIDController.useSharedExecutor`
+        :type  useSharedExecutor: bool
         """
 
-        f_arg = ("Kf", [float, int])
-        source_arg = ("source", [HasAttribute("pidGet"), HasAttribute("__call__")])
-        output_arg = ("output", [HasAttribute("pidWrite"), HasAttribute("__call__")])
-        period_arg = ("period", [float, int])
-
-        templates = [[f_arg, source_arg, output_arg, period_arg],
-                     [source_arg, output_arg, period_arg],
-                     [source_arg, output_arg],
-                     [f_arg, source_arg, output_arg]]
-
         _, results = match_arglist('PIDController.__init__',
-                                   args, kwargs, templates)
+                                   args, kwargs, self._templates)
 
         self.P = Kp  # factor for "proportional" control
         self.I = Ki  # factor for "integral" control
@@ -128,8 +140,15 @@ class PIDController(LiveWindowSendable):
         self.setpointEntry = None
         self.enabledEntry = None
 
-        self.pid_task = TimerTask('PIDTask%d' % PIDController.instances, self.period, self._calculate)
-        self.pid_task.start()
+        if useSharedExecutor is None:
+            useSharedExecutor = PIDController.useSharedExecutor
+
+        if useSharedExecutor:
+            self.pid_task = PeriodicExecutor.getInstance().schedule(
+                'PIDTask%d' % PIDController.instances, self.period, self._calculate)
+        else:
+            self.pid_task = TimerTask('PIDTask%d' % PIDController.instances, self.period, self._calculate)
+            self.pid_task.start()
         
         self.setpointTimer = Timer()
         self.setpointTimer.start()
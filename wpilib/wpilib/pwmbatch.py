@@ -0,0 +1,138 @@
+# notrack
+#----------------------------------------------------------------------------
+# Copyright (c) FIRST 2008-2017. All Rights Reserved.
+# Open Source Software - may be modified and shared by FRC teams. The code
+# must be accompanied by the FIRST BSD license file in the root directory of
+# the project.
+#----------------------------------------------------------------------------
+
+import array
+import threading
+
+import hal
+
+from .timer import Timer
+
+__all__ = ["PWMBatch"]
+
+class PWMBatch:
+    """Stages the outputs of a group of PWM speed controllers, and sends
+    them to the hardware all at once.
+
+    While a batch is open, calling ``set`` on one of its speed controllers
+    (directly, or via a drive class such as :class:`.RobotDrive`) only
+    stores the value. When the batch is committed, the stored values are
+    written out and all of the motor safety timers are fed using a single
+    timestamp. In simulation, listeners on ``hal_data`` are notified once
+    per changed value after all of the values have been written.
+
+    Example::
+
+        self.batch = wpilib.PWMBatch(frontLeft, rearLeft, frontRight, rearRight)
+
+        ...
+
+        def teleopPeriodic(self):
+            with self.batch:
+                self.drive.arcadeDrive(self.stick)
+
+    .. note:: Until the batch is committed, ``get`` returns the value that
+              was last sent to the hardware, not the staged value.
+
+    .. note:: Only ``set`` calls from the thread that opened the batch are
+              staged. Other threads (such as a :class:`.PIDController` or
+              a :class:`.Notifier` callback) still write immediately.
+    """
+
+    def __init__(self, *controllers):
+        """Constructor.
+
+        :param controllers: The :class:`.PWMSpeedController` objects to
+                            stage outputs for. A speed controller can only
+                            be part of one batch.
+        """
+        for controller in controllers:
+            if controller._batch is not None:
+                raise ValueError("%s is already part of a PWMBatch" %
+                                 controller.getDescription())
+
+        self.controllers = controllers
+        self.values = array.array('d', bytes(8*len(controllers)))
+        self.staged = bytearray(len(controllers))
+        # ident of the thread that is staging outputs, if any
+        self._owner = None
+
+        for i, controller in enumerate(controllers):
+            controller._batch = self
+            controller._batchIndex = i
+
+        self._batchNotifications = None
+        if hal.HALIsSimulation():
+            from hal_impl.data import batch_notifications
+            self._batchNotifications = batch_notifications()
+
+    def free(self):
+        """Removes the speed controllers from this batch, so that ``set``
+        writes to the hardware immediately again"""
+        for controller in self.controllers:
+            controller._batch = None
+        self.controllers = ()
+        self._owner = None
+
+    def begin(self):
+        """Starts staging outputs. Values that were staged but not
+        committed before this are discarded. Only outputs set from the
+        current thread are staged."""
+        self.staged[:] = bytes(len(self.staged))
+        self._owner = threading.get_ident()
+
+    def isStaging(self):
+        """:returns: True if ``set`` calls made from the current thread
+                  are being staged"""
+        owner = self._owner
+        return owner is not None and owner == threading.get_ident()
+
+    def stage(self, index, speed):
+        """Stores the output for a speed controller, to be written by
+        :meth:`commit`. The value has already been inverted, if needed.
+
+        :param index: Index of the speed controller in this batch
+        :param speed: The speed, between -1.0 and 1.0
+        """
+        self.values[index] = speed
+        self.staged[index] = 1
+
+    def commit(self):
+        """Writes all of the staged outputs, and feeds the motor safety
+        timers of the speed controllers that were set. Stops staging."""
+        self._owner = None
+
+        if self._batchNotifications is None:
+            self._write()
+        else:
+            with self._batchNotifications:
+                self._write()
+
+    def _write(self):
+        now = Timer.getFPGATimestamp()
+        values = self.values
+        staged = self.staged
+
+        i = 0
+        for controller in self.controllers:
+            if staged[i]:
+                staged[i] = 0
+                controller.setSpeed(values[i])
+                controller.feed(now)
+            i += 1
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            # Don't send out half of a loop's outputs
+            self._owner = None
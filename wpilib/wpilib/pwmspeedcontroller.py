@@ -16,6 +16,9 @@ class PWMSpeedController(SafePWM):
         Common base class for all PWM Speed Controllers.
     """
     
+    #: The :class:`.PWMBatch` that this is part of, if any
+    _batch = None
+    
     def __init__(self, channel):
         super().__init__(channel)
         self.isInverted = False
@@ -33,6 +36,10 @@ class PWMSpeedController(SafePWM):
         :param speed: The speed to set.  Value should be between -1.0 and 1.0.
         :type  speed: float
         """
+        batch = self._batch
+        if batch is not None and batch.isStaging():
+            batch.stage(self._batchIndex, -speed if self.isInverted else speed)
+            return
         self.setSpeed(-speed if self.isInverted else speed)
         self.feed()
 
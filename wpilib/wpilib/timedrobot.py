@@ -0,0 +1,132 @@
+# notrack
+#----------------------------------------------------------------------------
+# Copyright (c) FIRST 2008-2017. All Rights Reserved.
+# Open Source Software - may be modified and shared by FRC teams. The code
+# must be accompanied by the FIRST BSD license file in the root directory of
+# the project.
+#----------------------------------------------------------------------------
+
+import hal
+
+from .iterativerobot import IterativeRobot
+from .livewindow import LiveWindow
+
+__all__ = ["TimedRobot"]
+
+class TimedRobot(IterativeRobot):
+    """TimedRobot implements the IterativeRobot robot program framework,
+    but calls the periodic functions at a fixed rate instead of whenever
+    a packet is received from the driver station.
+
+    Loops are scheduled against absolute deadlines on the FPGA clock, so
+    the period does not drift even if the loop takes a variable amount of
+    time to run. When a loop takes longer than the period, the loops that
+    were missed are handled according to the :class:`OverrunPolicy`.
+
+    The init and periodic functions are called in the same way as in
+    :class:`.IterativeRobot`.
+    """
+
+    #: Default loop period, in seconds
+    DEFAULT_PERIOD = 0.02
+
+    class OverrunPolicy:
+        """What to do with the loops that are missed when a loop runs
+        longer than the period."""
+
+        #: Run the missed loops back to back, without waiting, until the
+        #: loop is back on schedule. At most :attr:`maxCatchUp` loops are
+        #: run this way, any others are skipped.
+        kCatchUp = 0
+
+        #: Don't run the missed loops, wait for the next deadline instead
+        kSkip = 1
+
+    #: The most loops that will be run back to back to catch up
+    maxCatchUp = 5
+
+    def __init__(self, period=DEFAULT_PERIOD, policy=OverrunPolicy.kSkip):
+        """Constructor for TimedRobot.
+
+        :param period: Period of the loop, in seconds
+        :param policy: A :class:`OverrunPolicy` value
+
+        .. warning:: If you override ``__init__`` in your robot class, you must call
+                     the base class constructor. This must be used to ensure that
+                     the communications code starts.
+        """
+        if period <= 0:
+            raise ValueError("Invalid period %s" % period)
+        if policy not in (self.OverrunPolicy.kCatchUp, self.OverrunPolicy.kSkip):
+            raise ValueError("Invalid overrun policy %s" % policy)
+
+        super().__init__()
+
+        self.period = period
+        self.policy = policy
+
+        #: Number of loops that were skipped because the loop ran late
+        self.skippedLoops = 0
+
+        self.profiler.budget = period
+        self.notifier = hal.initializeNotifier()
+
+    def free(self):
+        """Stops the loop and releases the HAL notifier"""
+        notifier = self.notifier
+        if notifier is not None:
+            self.notifier = None
+            hal.stopNotifier(notifier)
+            hal.cleanNotifier(notifier)
+        super().free()
+
+    def getPeriod(self):
+        """:returns: the period of the loop, in seconds"""
+        return self.period
+
+    def startCompetition(self):
+        """Provide an alternate "main loop" via startCompetition()."""
+        hal.report(hal.UsageReporting.kResourceType_Framework,
+                      hal.UsageReporting.kFramework_Timed)
+
+        self.robotInit()
+
+        # Tell the DS that the robot is ready to be enabled
+        hal.observeUserProgramStarting()
+
+        LiveWindow.setEnabled(False)
+
+        # Deadlines are kept in integer microseconds, so that adding the
+        # period over and over again doesn't accumulate rounding error
+        period = int(round(self.period * 1000000))
+        expirationTime = hal.getFPGATime() + period
+
+        while True:
+            notifier = self.notifier
+            if notifier is None:
+                break
+
+            now = hal.getFPGATime()
+            if expirationTime > now:
+                hal.updateNotifierAlarm(notifier, expirationTime)
+                if hal.waitForNotifierAlarm(notifier) == 0:
+                    break
+
+            self.loopFunc()
+
+            expirationTime += period
+            now = hal.getFPGATime()
+            if expirationTime <= now:
+                expirationTime = self._overrun(expirationTime, now, period)
+
+    def _overrun(self, expirationTime, now, period):
+        # Number of deadlines that have already passed
+        missed = (now - expirationTime) // period + 1
+
+        if self.policy == self.OverrunPolicy.kCatchUp:
+            skipped = max(missed - self.maxCatchUp, 0)
+        else:
+            skipped = missed
+
+        self.skippedLoops += skipped
+        return expirationTime + skipped*period
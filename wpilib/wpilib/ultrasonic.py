@@ -207,10 +207,11 @@ class Ultrasonic(SensorBase):
                     target=Ultrasonic.ultrasonicChecker,
                     name="ultrasonicChecker")
             Ultrasonic.daemon = True
+            hal.registerThread(Ultrasonic._thread)
             Ultrasonic._thread.start()
         else:
             # Wait for background task to stop running
-            Ultrasonic._thread.join()
+            hal.joinThread(Ultrasonic._thread)
             Ultrasonic._thread = None
             
             # Clear all the counters (data now invalid) since automatic mode is